@@ -13,7 +13,10 @@ BASE_SRC = os.path.join(BASE_DIR, 'src')
 if BASE_SRC not in sys.path:
     sys.path.append(BASE_SRC)
 
-from flask import Flask, jsonify, request, redirect, send_from_directory
+import itertools
+import threading
+
+from flask import Flask, Response, jsonify, request, redirect, send_from_directory, stream_with_context
 from flask_cors import CORS
 try:
     from flasgger import Swagger
@@ -36,17 +39,40 @@ if os.environ.get('EP_DISABLE_FIREBASE', '') not in ('1', 'true', 'True'):
 from src.config_pkg.firebase import init_firebase
 from src.middleware.auth import require_auth, optional_auth
 from src.routes.recipe_recomendation import recipe_recommendation_bp
+from src.services.json_codec import FastJSONProvider, iter_json_array
 
 # DB and models
 import db
-from src.models.users import create_user, list_users, authenticate_user
-from src.models.recipes import create_recipe, list_recipes
-from src.models.items import create_item, list_items
+from src.models.users import create_user, list_users, authenticate_user, page_users, iter_users
+from src.models.recipes import create_recipe, list_recipes, page_recipes, iter_recipes
+from src.models.items import create_item, create_items, list_items, page_items, iter_items
+from src.models.indexes import bootstrap_indexes
+from src.services.expiry_scanner import ExpiryScanner, collection_sink
 
 # Environment variables already loaded above
 
+# Declare / reconcile the collection indexes in the background, so an unreachable
+# server delays neither the startup nor the first requests
+if db.ENGINE != 'disabled' and os.environ.get('EP_DB_ENSURE_INDEXES', '1') not in ('0', 'false', 'False'):
+    threading.Thread(target=bootstrap_indexes, args=(db.mongo_db,), name='index-bootstrap', daemon=True).start()
+
+# Periodic expiring / expired item marking with batched notifications. Enable it in
+# one process only (e.g. a single worker or a separate instance): status-guarded
+# updates keep concurrent scanners correct, but each scan would still be repeated
+expiry_scanner = None
+if db.ENGINE != 'disabled' and os.environ.get('EP_EXPIRY_SCANNER', '0') in ('1', 'true', 'True'):
+    expiry_scanner = ExpiryScanner(
+        db.mongo_db['items'],
+        notify=collection_sink(db.mongo_db['notifications']),
+        warn_days=int(os.environ.get('EP_EXPIRY_WARN_DAYS', '3')),
+        batch_size=int(os.environ.get('EP_EXPIRY_SCAN_BATCH_SIZE', '1000')),
+    )
+    expiry_scanner.start(float(os.environ.get('EP_EXPIRY_SCAN_INTERVAL', '3600')))
+
 # Initialize Flask app
 app = Flask(__name__)
+# orjson-backed jsonify / get_json when orjson is installed (stdlib json otherwise)
+app.json = FastJSONProvider(app)
 csrf = CSRFProtect()
 csrf.init_app(app)
 
@@ -239,6 +265,13 @@ def test_db():
     except Exception as e:
         return jsonify({"error": "DB test failed", "detail": str(e)}), 500
 
+@app.route("/db/metrics")
+def db_metrics():
+    metrics = db.pool_metrics()
+    if expiry_scanner is not None:
+        metrics['expiry_scanner'] = expiry_scanner.stats()
+    return jsonify(metrics)
+
 @app.route("/users", methods=["POST"])
 def add_user():
     data = request.get_json() or {}
@@ -252,10 +285,34 @@ def add_user():
     except Exception as e:
         return jsonify({"error": "Could not create user", "detail": str(e)}), 500
 
+def _list_response(list_all, page, iterate, **filters):
+    """
+    GET list endpoints. Query parameters:
+      limit, after   keyset page {items, next_after}; pass next_after back as `after`
+      fields         comma-separated fields to return (projected in the database)
+      stream=1       the whole collection as a JSON array streamed from the cursor
+    Without any of them the full list is returned as before.
+    """
+    args = request.args
+    fields = args.get("fields") or None
+    if args.get("stream", "").lower() in ("1", "true", "yes"):
+        chunks = iter_json_array(iterate(fields=fields, **filters))
+        # the first chunk runs the query, so database errors still answer 500
+        first = next(chunks)
+        return Response(stream_with_context(itertools.chain([first], chunks)), mimetype="application/json")
+    if "limit" in args or "after" in args:
+        try:
+            return jsonify(page(limit=args.get("limit"), after=args.get("after"), fields=fields, **filters))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    if fields:
+        return jsonify(list(iterate(fields=fields, **filters)))
+    return jsonify(list_all(**filters))
+
 @app.route("/users", methods=["GET"])
 def get_users():
     try:
-        return jsonify(list_users())
+        return _list_response(list_users, page_users, iter_users)
     except Exception as e:
         return jsonify({"error": "Could not list users", "detail": str(e)}), 500
 
@@ -276,10 +333,44 @@ def add_recipe():
 @app.route("/recipes", methods=["GET"])
 def get_recipes():
     try:
-        return jsonify(list_recipes())
+        return _list_response(list_recipes, page_recipes, iter_recipes)
     except Exception as e:
         return jsonify({"error": "Could not list recipes", "detail": str(e)}), 500
 
+@app.route("/items/bulk", methods=["POST"])
+@require_auth
+def add_items_bulk(current_user):
+    """
+    Body: {"items": [{"name", "category", "expiration_date"}, ...]}
+    Items go to the authenticated user's fridge; a `user_email` in the body must match it.
+    """
+    data = request.get_json(silent=True) or {}
+    owner = (current_user.get("email") or "").strip().lower()
+    if not owner:
+        return jsonify({"error": "Authenticated user has no email"}), 403
+    claimed = data.get("user_email")
+    if claimed is not None and str(claimed).strip().lower() != owner:
+        return jsonify({"error": "user_email does not match the authenticated user"}), 403
+    try:
+        result = create_items(owner, data.get("items"))
+    except Exception as e:
+        return jsonify({"error": "Could not create items", "detail": str(e)}), 500
+    if "error" in result:
+        return jsonify(result), 400
+    # 207: some rows were rejected, the others were stored
+    return jsonify(result), 201 if not result["failed"] else 207
+
+@app.route("/items", methods=["GET"])
+def get_items():
+    # one user's fridge only: never list every user's items
+    user_email = (request.args.get("user_email") or "").strip()
+    if not user_email:
+        return jsonify({"error": "Missing user_email"}), 400
+    try:
+        return _list_response(list_items, page_items, iter_items, user_email=user_email)
+    except Exception as e:
+        return jsonify({"error": "Could not list items", "detail": str(e)}), 500
+
 # ---------- Error handlers ----------
 @app.errorhandler(404)
 def not_found(error):
@@ -0,0 +1,107 @@
+"""
+Benchmark: CPU per cache hit of /recipes/suggest when the response is
+rebuilt on every hit (json.dumps + ETag hash + gzip) versus served from the
+pre-encoded body (src/services/encoded_response.py), plus the 304 path.
+
+The first table times the encoding step alone on a suggest result of
+`--number` prefetched recipes; the second times whole hits through the
+Flask test client against the local fake Spoonacular server.
+
+    python benchmarks/bench_encoded_response.py --number 10 --requests 300
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from benchmarks.bench_prefetch import _percentile, build_app
+from benchmarks.fake_spoonacular import start_fake_server
+from src.services.encoded_response import EncodedBodyCache
+
+
+def _time_us(fn, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def bench_encoding(data, n):
+    cache = EncodedBodyCache()
+    body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    cache.put('k', body, version=1.0).variant('gzip')
+
+    def rebuild():
+        raw = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        hashlib.blake2b(raw, digest_size=16).hexdigest()
+        gzip.compress(raw, compresslevel=6, mtime=0)
+
+    def pre_encoded():
+        cache.get('k', 1.0).variant('gzip')
+
+    print(f'body={len(body)} bytes gzip={len(gzip.compress(body, 6, mtime=0))} bytes')
+    print(f"{'encoding step':>14} {'p50 us':>10} {'p99':>10}")
+    for name, fn in (('rebuild', rebuild), ('pre-encoded', pre_encoded)):
+        samples = _time_us(fn, n)
+        print(f'{name:>14} {statistics.median(samples):>10.1f} {_percentile(samples, 99):>10.1f}')
+
+
+def bench_route(number, n):
+    import src.controllers.recipe_controller as rc
+    import src.routes.recipe_recomendation as routes
+    from src.services.rate_limiter import QuotaLimiter
+
+    rc._limiter = QuotaLimiter(rate=1e9, burst=1e9)
+    server, base_url = start_fake_server(latency=0.0)
+    os.environ['EP_RECIPE_CACHE_DIR'] = os.devnull + '/no-cache'
+    app = build_app(base_url, concurrency=5, bulk=True)
+    client = app.test_client()
+    body = {'ingredients': ['chicken', 'tomato'], 'number': number, 'prefetch': number}
+    try:
+        first = client.post('/recipes/suggest', json=body)
+        assert first.status_code == 200
+        etag = first.headers['ETag']
+        modes = (
+            ('identity', {}, True),
+            ('gzip', {'Accept-Encoding': 'gzip'}, True),
+            ('gzip re-enc', {'Accept-Encoding': 'gzip'}, False),
+            ('304', {'If-None-Match': etag}, True),
+        )
+        print(f"{'route hit':>14} {'p50 us':>10} {'p99':>10}")
+        for name, headers, keep in modes:
+            def hit():
+                if not keep:
+                    # what every hit cost before the bodies were kept
+                    routes._encoded_bodies.clear()
+                resp = client.post('/recipes/suggest', json=body, headers=headers)
+                resp.get_data()
+            samples = _time_us(hit, n)
+            print(f'{name:>14} {statistics.median(samples):>10.1f} {_percentile(samples, 99):>10.1f}')
+    finally:
+        server.shutdown()
+    return first.get_json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args()
+
+    data = bench_route(args.number, args.requests)
+    print()
+    bench_encoding(data, args.requests)
+
+
+if __name__ == '__main__':
+    main()
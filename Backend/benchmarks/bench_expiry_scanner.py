@@ -0,0 +1,89 @@
+"""
+Benchmark: one ExpiryScanner.scan_once() over N items on the in-memory
+engine (memory_db.py), for several batch sizes. Reports items/s, database
+calls (one find per transition, one bulk_write per batch) and the peak
+Python memory allocated during the scan (tracemalloc). Besides the scanner's
+batch it includes the status fields the memory engine writes into each
+changed document, so compare batch sizes at the same item count.
+
+    python benchmarks/bench_expiry_scanner.py --items 10000 100000 --batch-size 100 1000 5000
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from memory_db import MemoryClient
+from src.models.indexes import ensure_indexes
+from src.services.expiry_scanner import ExpiryScanner
+
+TODAY = datetime.date(2024, 6, 10)
+
+
+class _Calls:
+    """Collection wrapper counting find / bulk_write calls."""
+
+    def __init__(self, collection):
+        self._collection = collection
+        self.calls = 0
+
+    def find(self, *args, **kwargs):
+        self.calls += 1
+        return self._collection.find(*args, **kwargs)
+
+    def bulk_write(self, *args, **kwargs):
+        self.calls += 1
+        return self._collection.bulk_write(*args, **kwargs)
+
+
+def _collection(n, users):
+    database = MemoryClient()['FridgeDB']
+    ensure_indexes(database)
+    # a third expired, a third expiring within the warning window, a third later
+    database['items'].insert_many(
+        {'user_email': f'user{i % users}@example.com', 'name': f'Item {i}', 'category': 'dairy',
+         'expiration_date': (TODAY + datetime.timedelta(days=(-1 - i % 5, i % 3, 30 + i % 60)[i % 3])).isoformat(),
+         'status': 'active'}
+        for i in range(n))
+    return database['items']
+
+
+def run(n, batch_size, users):
+    collection = _Calls(_collection(n, users))
+    events = []
+    scanner = ExpiryScanner(collection, notify=lambda batch: events.append(len(batch)), warn_days=3,
+                            batch_size=batch_size)
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = scanner.scan_once(TODAY)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, collection.calls, len(events), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--batch-size', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--users', type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'items':>7} {'batch':>6} {'changed':>8} {'ms':>9} {'items/s':>9} {'db calls':>9} "
+          f"{'notifies':>9} {'peak KiB':>9}")
+    for n in args.items:
+        for batch_size in args.batch_size:
+            result, elapsed, calls, notifies, peak = run(n, batch_size, args.users)
+            changed = result['expired'] + result['expiring']
+            print(f'{n:>7} {batch_size:>6} {changed:>8} {elapsed * 1000:>9.1f} {result["scanned"] / elapsed:>9.0f} '
+                  f'{calls:>9} {notifies:>9} {peak / 1024:>9.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark: per-call latency of bare `requests.get` versus the pooled
+UpstreamClient against a local fake Spoonacular server.
+
+Bare calls open a new TCP connection each time; the pooled client reuses
+keep-alive connections, which is where the per-call saving comes from (it is
+much larger against a TLS endpoint than against this plain-HTTP fake).
+
+    python benchmarks/bench_http_client.py --calls 500
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import requests
+
+from benchmarks.fake_spoonacular import start_fake_server
+from src.services.http_client import UpstreamClient
+
+
+def _time_calls(fn, url, calls):
+    samples = []
+    for i in range(calls):
+        start = time.perf_counter()
+        resp = fn(url, params={'includeNutrition': 'false', 'apiKey': 'bench'})
+        resp.content
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run(calls):
+    server, base_url = start_fake_server()
+    url = f'{base_url}/recipes/1001/information'
+    try:
+        bare = _time_calls(lambda u, params: requests.get(u, params=params, timeout=10), url, calls)
+        client = UpstreamClient()
+        pooled = _time_calls(client.get, url, calls)
+        stats = client.stats()
+    finally:
+        server.shutdown()
+
+    print(f'{calls} sequential calls')
+    print(f"{'client':>8} {'mean ms':>9} {'p50 ms':>9}")
+    print(f"{'bare':>8} {statistics.mean(bare):>9.3f} {statistics.median(bare):>9.3f}")
+    print(f"{'pooled':>8} {statistics.mean(pooled):>9.3f} {statistics.median(pooled):>9.3f}")
+    print(f"saving per call: {statistics.mean(bare) - statistics.mean(pooled):.3f} ms")
+    print(f"pool: created={stats['connections_created']} reused={stats['connections_reused']}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=300)
+    args = parser.parse_args()
+    run(args.calls)
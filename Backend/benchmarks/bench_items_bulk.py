@@ -0,0 +1,83 @@
+"""
+Benchmark: ingesting N items with one create_item call per item versus one
+create_items call (chunked unordered insert_many), on the in-memory engine
+(memory_db.py) with a simulated network round trip per database call.
+
+    python benchmarks/bench_items_bulk.py --items 1000 10000 --rtt-ms 0.5
+"""
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import src.models.items as items
+from memory_db import MemoryClient
+
+
+class _RoundTrips:
+    """Collection wrapper that waits one round trip per write call."""
+
+    def __init__(self, collection, rtt):
+        self._collection = collection
+        self._rtt = rtt
+        self.calls = 0
+
+    def _wait(self):
+        self.calls += 1
+        if self._rtt:
+            time.sleep(self._rtt)
+
+    def insert_one(self, doc, **kwargs):
+        self._wait()
+        return self._collection.insert_one(doc, **kwargs)
+
+    def insert_many(self, docs, **kwargs):
+        self._wait()
+        return self._collection.insert_many(docs, **kwargs)
+
+
+def _rows(n):
+    return [{'name': f'Item {i}', 'category': 'dairy', 'expiration_date': f'2024-12-{i % 28 + 1:02d}'}
+            for i in range(n)]
+
+
+def run(n, rtt, chunk_size):
+    results = []
+    for mode in ('per item', 'bulk'):
+        collection = MemoryClient()['FridgeDB']['items']
+        collection.create_index([('user_email', 1), ('name', 1)], unique=True)
+        wrapped = items.items_collection = _RoundTrips(collection, rtt)
+        rows = _rows(n)
+        start = time.perf_counter()
+        if mode == 'per item':
+            for row in rows:
+                items.create_item('bench@example.com', row['name'], row['category'], row['expiration_date'])
+        else:
+            result = items.create_items('bench@example.com', rows, chunk_size=chunk_size)
+            assert result['failed'] == 0, result['errors'][:3]
+        elapsed = time.perf_counter() - start
+        assert collection.count_documents({}) == n
+        results.append((mode, elapsed, wrapped.calls))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--rtt-ms', type=float, default=0.5, help='simulated round trip per database call')
+    parser.add_argument('--chunk-size', type=int, default=items.BULK_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    print(f'rtt={args.rtt_ms} ms chunk={args.chunk_size}')
+    print(f"{'items':>7} {'mode':>9} {'total ms':>10} {'items/s':>10} {'db calls':>9}")
+    for n in args.items:
+        for mode, elapsed, calls in run(n, args.rtt_ms / 1000.0, args.chunk_size):
+            print(f'{n:>7} {mode:>9} {elapsed * 1000:>10.1f} {n / elapsed:>10.0f} {calls:>9}')
+
+
+if __name__ == '__main__':
+    main()
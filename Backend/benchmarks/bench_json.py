@@ -0,0 +1,103 @@
+"""
+Benchmark: JSON encoding and decoding of recipe payloads, stdlib json versus
+orjson (src/services/json_codec.py), on the paths the app uses them:
+
+  encode / decode   one `information` payload and a 10-recipe suggest result
+  jsonify           Flask's default provider vs FastJSONProvider
+  sqlite cache      SQLiteCacheBackend set + get round trip of one payload
+
+Payloads come from fake_spoonacular.py recordings (`--fixtures DIR`) or are
+synthetic full `information` responses (benchmarks/recipe_payloads.py).
+
+    python benchmarks/bench_json.py --repeat 200
+    python benchmarks/bench_json.py --fixtures fixtures/ --repeat 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from flask import Flask, jsonify
+
+from benchmarks.bench_prefetch import _percentile
+from benchmarks.recipe_payloads import load_payloads
+from src.services import json_codec
+from src.services.json_codec import FastJSONProvider
+from src.services.shared_cache import SQLiteCacheBackend
+
+
+def _time_us(fn, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples), _percentile(samples, 99)
+
+
+def _cases(payloads, directory):
+    one, many = payloads[0], payloads[:10]
+    encoded_one, encoded_many = json_codec.dumps(one), json_codec.dumps(many)
+    default_app = Flask('default')
+    fast_app = Flask('fast')
+    fast_app.json = FastJSONProvider(fast_app)
+    backend = SQLiteCacheBackend(os.path.join(directory, f'cache-{json_codec.backend()}.sqlite3'))
+
+    def jsonify_with(app):
+        def run():
+            with app.app_context():
+                jsonify(many).get_data()
+        return run
+
+    def cache_round_trip():
+        backend.set('information:1', one)
+        backend.get('information:1')
+
+    return [
+        (f'encode 1 ({len(encoded_one) // 1024} KB)', lambda: json_codec.dumps(one)),
+        (f'encode 10 ({len(encoded_many) // 1024} KB)', lambda: json_codec.dumps(many)),
+        ('decode 1', lambda: json_codec.loads(encoded_one)),
+        ('decode 10', lambda: json_codec.loads(encoded_many)),
+        ('jsonify 10 default', jsonify_with(default_app)),
+        ('jsonify 10 provider', jsonify_with(fast_app)),
+        ('sqlite cache 1', cache_round_trip),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', help='fake_spoonacular.py recordings to use as payloads')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.fixtures)
+    if not payloads:
+        parser.error('no information payloads found')
+    orjson = json_codec.orjson
+    backends = [('json', None)] + ([('orjson', orjson)] if orjson is not None else [])
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, module in backends:
+            json_codec.orjson = module
+            for label, fn in _cases(payloads, directory):
+                results.setdefault(label, {})[name] = _time_us(fn, args.repeat)
+    json_codec.orjson = orjson
+
+    print(f'payloads={len(payloads)} repeat={args.repeat}')
+    header = ''.join(f'{name + " p50 us":>16} {"p99":>8}' for name, _ in backends)
+    print(f"{'case':>22}{header}")
+    for label, by_backend in results.items():
+        cells = ''.join(f'{by_backend[name][0]:>16.1f} {by_backend[name][1]:>8.1f}' for name, _ in backends)
+        print(f'{label:>22}{cells}')
+    if orjson is None:
+        print('orjson is not installed: only the stdlib fallback was measured')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: GET /items as the legacy full list, one keyset page
+(`limit`/`after`) and the streamed JSON array (`stream=1`), on the in-memory
+engine (memory_db.py): time to first byte, total time and peak Python
+memory while serving.
+
+    python benchmarks/bench_list_endpoints.py --items 50000
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from memory_db import MemoryClient
+
+
+def build_client(n_items):
+    import src.models.items as items
+    from app import app
+    collection = MemoryClient()['FridgeDB']['items']
+    now = datetime.datetime(2024, 1, 1)
+    collection.insert_many([{'user_email': f'user{i % 100}@x.com', 'name': f'Item {i}', 'category': 'dairy',
+                             'expiration_date': (now + datetime.timedelta(days=i % 30)).isoformat(),
+                             'created_at': now, 'status': 'active'} for i in range(n_items)])
+    items.items_collection = collection
+    return app.test_client()
+
+
+def measure(client, url):
+    tracemalloc.start()
+    start = time.perf_counter()
+    resp = client.get(url, buffered=False)
+    chunks = iter(resp.response)
+    size = len(next(chunks))
+    first = time.perf_counter() - start
+    for chunk in chunks:
+        size += len(chunk)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    resp.close()
+    return first * 1000, total * 1000, peak / 1e6, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=50000)
+    args = parser.parse_args()
+
+    client = build_client(args.items)
+    print(f'items={args.items}')
+    print(f"{'mode':>14} {'first byte ms':>14} {'total ms':>10} {'peak MB':>9} {'body KB':>9}")
+    for mode, url in (('full list', '/items'), ('page 50', '/items?limit=50'),
+                      ('stream', '/items?stream=1'), ('stream fields', '/items?stream=1&fields=name,status')):
+        first, total, peak, size = measure(client, url)
+        print(f'{mode:>14} {first:>14.1f} {total:>10.1f} {peak:>9.1f} {size / 1024:>9.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: /recipes/suggest latency as a function of `prefetch`.
+
+Runs the recipe blueprint against the local fake Spoonacular server, which
+delays every call by a configurable latency distribution, and reports p50/p99 for sequential prefetch
+(concurrency=1), the concurrent per-id prefetch stage and the single
+informationBulk call, plus the number of upstream calls per request.
+
+    python benchmarks/bench_prefetch.py --latency 0.05 --requests 30
+    python benchmarks/bench_prefetch.py --latency lognormal:0.05,0.5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from flask import Flask
+
+from benchmarks.fake_spoonacular import start_fake_server
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def build_app(base_url, concurrency, bulk):
+    from src.routes.recipe_recomendation import recipe_recommendation_bp
+    app = Flask(__name__)
+    app.config['SPOONACULAR_API_KEY'] = 'bench'
+    app.config['SPOONACULAR_URL_BASE'] = base_url
+    app.config['RECIPE_PREFETCH_CONCURRENCY'] = concurrency
+    app.config['RECIPE_PREFETCH_BULK'] = bulk
+    # every request must search upstream, not the local corpus it fills
+    app.config['RECIPE_LOCAL_CORPUS'] = False
+    app.register_blueprint(recipe_recommendation_bp)
+    return app
+
+
+def run(latency, n_requests, prefetch_values, modes):
+    import src.controllers.recipe_controller as rc
+    from src.services.rate_limiter import QuotaLimiter
+
+    # the point budget would otherwise throttle the benchmark itself
+    rc._limiter = QuotaLimiter(rate=1e9, burst=1e9)
+
+    server, base_url = start_fake_server(latency=latency)
+    # disable the file cache so every request reaches the fake upstream
+    os.environ['EP_RECIPE_CACHE_DIR'] = os.devnull + '/no-cache'
+    print(f'upstream latency={latency} requests={n_requests}')
+    print(f"{'prefetch':>8} {'mode':>14} {'p50 ms':>9} {'p99 ms':>9} {'calls/req':>10}")
+    try:
+        for concurrency, bulk in modes:
+            client = build_app(base_url, concurrency, bulk).test_client()
+            mode = 'bulk' if bulk else f'concurrency={concurrency}'
+            for prefetch in prefetch_values:
+                samples = []
+                hits_before = server.hits
+                for _ in range(n_requests):
+                    rc._recipe_cache.clear()
+                    start = time.perf_counter()
+                    resp = client.post('/recipes/suggest', json={
+                        'ingredients': ['chicken', 'tomato'], 'number': 10, 'prefetch': prefetch
+                    })
+                    samples.append((time.perf_counter() - start) * 1000)
+                    assert resp.status_code == 200, resp.data
+                calls = (server.hits - hits_before) / n_requests
+                print(f'{prefetch:>8} {mode:>14} {statistics.median(samples):>9.1f} '
+                      f'{_percentile(samples, 99):>9.1f} {calls:>10.1f}')
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', default='0.05',
+                        help='upstream latency per call: seconds or a distribution such as uniform:0.02,0.08')
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+    run(args.latency, args.requests, prefetch_values=[0, 1, 5, 10],
+        modes=[(1, False), (5, False), (10, False), (5, True)])
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark: ranking /recipes/suggest candidates at 50, 1k and 10k
+candidates, the previous `sorted(key=score)` closure versus Ranker with the
+default weights and with every built-in feature, on the Python and (when
+installed) the NumPy path.
+
+    python benchmarks/bench_ranking.py --sizes 50 1000 10000
+"""
+import argparse
+import random
+import sys
+import os
+import timeit
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from src.services import ranking
+from src.services.ranking import Ranker
+
+_NAMES = ['tomato', 'rice', 'onion', 'garlic', 'egg', 'milk', 'flour', 'butter', 'chicken', 'spinach']
+
+ALL_FEATURES = {'used': 2.0, 'used_ratio': 1.0, 'missed': -0.2, 'expiring': 1.5, 'ready_time': -0.01,
+                'calories': -0.001}
+
+
+def synthetic_candidates(n, seed=9):
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        used = rng.sample(_NAMES, rng.randint(0, 4))
+        c = {
+            'id': i,
+            'title': f'Recipe {i}',
+            'usedIngredientCount': len(used),
+            'missedIngredientCount': rng.randint(0, 8),
+            'usedIngredients': [{'name': name} for name in used],
+        }
+        if rng.random() < 0.7:
+            c['readyInMinutes'] = rng.randint(10, 120)
+        if rng.random() < 0.5:
+            c['nutrition'] = {'nutrients': [{'name': 'Calories', 'amount': rng.randint(150, 900)}]}
+        out.append(c)
+    return out
+
+
+def legacy_rank(candidates):
+    def score(item):
+        used = int(item.get('usedIngredientCount', 0))
+        missed = int(item.get('missedIngredientCount', 0))
+        total = used + missed if (used + missed) > 0 else 1
+        return (used, used / total)
+    return sorted(candidates, key=score, reverse=True)
+
+
+def _time_us(fn, candidates):
+    timer = timeit.Timer(lambda: fn(candidates))
+    loops, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=loops)) / loops * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 1000, 10000])
+    args = parser.parse_args()
+
+    context = {'expiring': {'tomato': 1, 'milk': 2, 'spinach': 0}}
+    variants = [('legacy closure', legacy_rank)]
+    paths = [('python', False)] + ([('numpy', True)] if ranking.np is not None else [])
+    for label, use_numpy in paths:
+        default = Ranker(use_numpy=use_numpy)
+        full = Ranker(ALL_FEATURES, use_numpy=use_numpy)
+        variants.append((f'default/{label}', default.rank))
+        variants.append((f'all features/{label}', lambda c, r=full: r.rank(c, context)))
+
+    print(f"{'ranker':>22}" + ''.join(f'{n:>12}' for n in args.sizes) + '   (us per ranking)')
+    data = {n: synthetic_candidates(n) for n in args.sizes}
+    for name, fn in variants:
+        print(f'{name:>22}' + ''.join(f'{_time_us(fn, data[n]):>12.0f}' for n in args.sizes))
+
+
+if __name__ == '__main__':
+    main()
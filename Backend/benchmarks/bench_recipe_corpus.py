@@ -0,0 +1,84 @@
+"""
+Benchmark: findByIngredients answered by the local RecipeCorpus at N
+synthetic recipes (query latency percentiles, build time and memory).
+
+Recipes draw 5-15 ingredients from a vocabulary with a Zipf-like
+popularity, so common items ("salt", "onion") have long posting lists as
+in real data; fridges hold 3-10 items.
+
+    python benchmarks/bench_recipe_corpus.py --recipes 10000 100000 --queries 2000
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from src.services.recipe_corpus import RecipeCorpus
+
+
+def _vocabulary(n):
+    return [f'ingredient {i}' for i in range(n)]
+
+
+def synthetic_payloads(n_recipes, vocab, seed=11):
+    rng = random.Random(seed)
+    cum_weights = list(itertools.accumulate(1.0 / (i + 1) for i in range(len(vocab))))
+    for rid in range(n_recipes):
+        names = set(rng.choices(vocab, cum_weights=cum_weights, k=rng.randint(5, 15)))
+        yield {
+            'id': rid,
+            'title': f'Recipe {rid}',
+            'image': f'https://img.example/{rid}.jpg',
+            'extendedIngredients': [{'id': i, 'name': n, 'original': n, 'amount': 1, 'unit': ''}
+                                    for i, n in enumerate(sorted(names))],
+        }
+
+
+def run(n_recipes, n_queries, vocab_size, number):
+    vocab = _vocabulary(vocab_size)
+    payloads = list(synthetic_payloads(n_recipes, vocab))
+    corpus = RecipeCorpus(max_recipes=n_recipes)
+    start = time.perf_counter()
+    for payload in payloads:
+        corpus.add_recipe(payload)
+    build_s = time.perf_counter() - start
+
+    # size of the index alone, measured on a second build (tracemalloc slows it down)
+    tracemalloc.start()
+    other = RecipeCorpus(max_recipes=n_recipes)
+    for payload in payloads:
+        other.add_recipe(payload)
+    mem_mb = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    del other
+
+    rng = random.Random(3)
+    fridges = [rng.sample(vocab[:200], rng.randint(3, 10)) for _ in range(n_queries)]
+    samples = []
+    for fridge in fridges:
+        t = time.perf_counter()
+        corpus.find_by_ingredients(fridge, number=number)
+        samples.append((time.perf_counter() - t) * 1e6)
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, int(0.99 * len(samples)))]
+    print(f'{n_recipes:>8} {build_s:>8.2f} {mem_mb:>8.1f} {statistics.median(samples):>10.0f} {p99:>10.0f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--vocabulary', type=int, default=2000)
+    parser.add_argument('--number', type=int, default=10)
+    args = parser.parse_args()
+    print(f"{'recipes':>8} {'build s':>8} {'mem MB':>8} {'p50 us':>10} {'p99 us':>10}")
+    for n in args.recipes:
+        run(n, args.queries, args.vocabulary, args.number)
@@ -0,0 +1,105 @@
+"""
+Benchmark: memory held per 10k cached recipes by the upstream `information`
+dicts versus the compact records of src/services/recipe_records.py.
+
+Each cached recipe is decoded from JSON (so, as in the caches, its strings
+are fresh objects) and kept as:
+
+  information dict    the whole payload, as RecipeCache holds it
+  ingredient dicts    id/title/image plus one dict per ingredient
+  RecipeRecord        slotted record, interned names, no details
+  RecipeCorpus        records plus the inverted ingredient index
+
+Retained memory is measured with tracemalloc on a separate build; build time
+per recipe is measured without it. Payloads come from fake_spoonacular.py
+recordings (`--fixtures DIR`) or benchmarks/recipe_payloads.py.
+
+    python benchmarks/bench_recipe_records.py --recipes 10000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from benchmarks.recipe_payloads import load_payloads
+from src.services import json_codec
+from src.services.recipe_corpus import RecipeCorpus
+from src.services.recipe_records import RecipeRecord
+
+
+def _decoded(templates, n):
+    encoded = [json_codec.dumps(t) for t in templates]
+    for rid in range(n):
+        payload = json_codec.loads(encoded[rid % len(encoded)])
+        payload['id'] = rid
+        yield payload
+
+
+def _ingredient_dicts(payload):
+    return {
+        'id': payload.get('id'), 'title': payload.get('title'), 'image': payload.get('image'),
+        'ingredients': [{'id': el.get('id'), 'name': el.get('name') or el.get('originalName') or '',
+                         'original': el.get('original'), 'amount': el.get('amount'), 'unit': el.get('unit')}
+                        for el in payload.get('extendedIngredients') or []],
+    }
+
+
+def _build(kind, payloads):
+    if kind == 'RecipeCorpus':
+        corpus = RecipeCorpus(max_recipes=10 ** 9)
+        for payload in payloads:
+            corpus.add_recipe(payload)
+        return corpus
+    build = {
+        'information dict': lambda p: p,
+        'ingredient dicts': _ingredient_dicts,
+        'RecipeRecord': lambda p: RecipeRecord.from_information(p, details=False),
+    }[kind]
+    return [build(p) for p in payloads]
+
+
+def run(templates, n):
+    kinds = ('information dict', 'ingredient dicts', 'RecipeRecord', 'RecipeCorpus')
+    decode_start = time.perf_counter()
+    for _ in _decoded(templates, n):
+        pass
+    decode_s = time.perf_counter() - decode_start
+    print(f'recipes={n} templates={len(templates)} (decode alone {decode_s / n * 1e6:.1f} us/recipe)')
+    print(f"{'representation':>18} {'MB per 10k':>11} {'bytes/recipe':>13} {'build us/recipe':>16}")
+    for kind in kinds:
+        gc.collect()
+        start = time.perf_counter()
+        held = _build(kind, _decoded(templates, n))
+        build_us = max(0.0, (time.perf_counter() - start - decode_s) / n * 1e6)
+        del held
+        gc.collect()
+
+        tracemalloc.start()
+        held = _build(kind, _decoded(templates, n))
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del held
+        per_recipe = size / n
+        print(f'{kind:>18} {per_recipe * 10000 / 1e6:>11.1f} {per_recipe:>13.0f} {build_us:>16.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', help='fake_spoonacular.py recordings to use as payloads')
+    parser.add_argument('--recipes', type=int, default=10000)
+    args = parser.parse_args()
+    templates = load_payloads(args.fixtures, count=20)
+    if not templates:
+        parser.error('no information payloads found')
+    run(templates, args.recipes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark: /recipes/suggest result caching at N keys, the previous
+one-JSON-file-per-key directory versus the single-file ResultStore.
+
+The file variant does what the route used to do: an atomic `.tmp` +
+`os.replace` write per key, and on a hit `exists` + `getmtime` + `json.load`
+followed by re-encoding the response. The store variant writes one row per
+key and answers hits with the stored bytes.
+
+    python benchmarks/bench_result_store.py --keys 100000 --reads 20000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from src.services.result_store import ResultStore
+
+
+def _payload(i, recipes):
+    return [{
+        'id': i * 100 + r,
+        'name': f'Recipe {i}-{r}',
+        'image': f'https://img.example/{i}-{r}.jpg',
+        'readyInMinutes': 30,
+        'servings': 2,
+        'summary': 'No detailed description available. This recipe was returned from a search result.',
+        'usedIngredientCount': 2,
+        'missedIngredientCount': 1,
+        'ingredients': [
+            {'id': 1, 'name': 'chicken', 'original': '1 lb chicken', 'amount': 1, 'unit': 'lb', 'available': True},
+            {'id': 2, 'name': 'tomato', 'original': '2 tomatoes', 'amount': 2, 'unit': '', 'available': False},
+        ],
+        'steps': [{'number': 1, 'step': 'Follow the source recipe steps.'}],
+        'nutrition': None,
+        'lightweight': True,
+    } for r in range(recipes)]
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            # allocated blocks, so small files are charged what they really occupy
+            total += os.stat(os.path.join(root, name)).st_blocks * 512
+    return total
+
+
+class FileCache:
+    """The previous per-key JSON file cache, reproduced for comparison."""
+
+    def __init__(self, directory, ttl):
+        self.directory = directory
+        self.ttl = ttl
+
+    def put(self, key, enriched):
+        path = os.path.join(self.directory, f'recipes_{key}.json')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(enriched, fh, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def get(self, key):
+        path = os.path.join(self.directory, f'recipes_{key}.json')
+        if not os.path.exists(path) or time.time() - os.path.getmtime(path) >= self.ttl:
+            return None
+        with open(path, 'r', encoding='utf-8') as fh:
+            cached = json.load(fh)
+        # the route then re-encoded the parsed list for the response
+        return json.dumps(cached).encode('utf-8')
+
+
+class StoreCache:
+    def __init__(self, directory, ttl):
+        self.store = ResultStore(os.path.join(directory, 'suggest_results.sqlite3'), max_bytes=1 << 40)
+        self.ttl = ttl
+
+    def put(self, key, enriched):
+        body = json.dumps(enriched, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        self.store.put(f'suggest:{key}', body, ttl=self.ttl)
+
+    def get(self, key):
+        hit = self.store.get(f'suggest:{key}')
+        return hit[0] if hit is not None else None
+
+
+def run(n_keys, n_reads, recipes):
+    rng = random.Random(7)
+    keys = [f'{i:040x}' for i in range(n_keys)]
+    reads = [rng.choice(keys) for _ in range(n_reads)]
+    payloads = [_payload(i, recipes) for i in range(min(n_keys, 1000))]
+
+    print(f'keys={n_keys} reads={n_reads} recipes/result={recipes}')
+    print(f"{'cache':>6} {'write s':>9} {'read p50 us':>12} {'read p99 us':>12} {'disk MB':>9}")
+    for name, cls in (('files', FileCache), ('store', StoreCache)):
+        directory = tempfile.mkdtemp(prefix=f'bench-{name}-')
+        try:
+            cache = cls(directory, ttl=3600)
+            start = time.perf_counter()
+            for i, key in enumerate(keys):
+                cache.put(key, payloads[i % len(payloads)])
+            write_s = time.perf_counter() - start
+
+            samples = []
+            for key in reads:
+                t = time.perf_counter()
+                body = cache.get(key)
+                samples.append((time.perf_counter() - t) * 1e6)
+                assert body
+            samples.sort()
+            p99 = samples[min(len(samples) - 1, int(0.99 * len(samples)))]
+            print(f'{name:>6} {write_s:>9.2f} {statistics.median(samples):>12.1f} {p99:>12.1f} '
+                  f'{_dir_size(directory) / 1e6:>9.1f}')
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--keys', type=int, default=100000)
+    parser.add_argument('--reads', type=int, default=20000)
+    parser.add_argument('--recipes', type=int, default=5, help='recipes per cached result')
+    args = parser.parse_args()
+    run(args.keys, args.reads, args.recipes)
@@ -0,0 +1,74 @@
+"""
+Benchmark: cache hit rate across 4 worker processes, per-process cache only
+versus per-process L1 in front of the shared SQLite (WAL) backend.
+
+Each worker replays the same skewed (Zipf-like) stream of recipe ids, in its
+own random order; on a miss it "fetches" the recipe and stores it. With a
+local-only cache every worker pays for its own misses; with the shared store
+a recipe fetched by any worker is a hit for the others.
+
+    python benchmarks/bench_shared_cache.py --workers 4 --lookups 5000 --keys 2000
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from src.services.recipe_cache import RecipeCache
+from src.services.shared_cache import SQLiteCacheBackend
+
+
+def _payload(rid):
+    return {'id': rid, 'title': f'Recipe {rid}', 'extendedIngredients': [{'name': 'x' * 20}] * 10}
+
+
+def _worker(args):
+    worker_id, mode, db_path, lookups, keys, l1_entries = args
+    rng = random.Random(worker_id)
+    weights = [1.0 / (i + 1) for i in range(keys)]
+    stream = rng.choices(range(keys), weights=weights, k=lookups)
+    backend = SQLiteCacheBackend(db_path) if mode == 'shared' else None
+    cache = RecipeCache(max_entries=l1_entries, backend=backend)
+    hits = 0
+    start = time.perf_counter()
+    for rid in stream:
+        key = f'information:{rid}:nutrition=True'
+        if cache.get(key) is not None:
+            hits += 1
+        else:
+            cache.set(key, _payload(rid), ttl=3600)
+    return hits, lookups, time.perf_counter() - start
+
+
+def run(workers, lookups, keys, l1_entries):
+    print(f'{workers} workers, {lookups} lookups each, {keys} distinct keys, L1 max_entries={l1_entries}')
+    print(f"{'mode':>8} {'hit rate':>9} {'upstream fetches':>17} {'lookups/s':>11}")
+    ctx = multiprocessing.get_context('spawn')
+    for mode in ('local', 'shared'):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'bench.sqlite3')
+            if mode == 'shared':
+                SQLiteCacheBackend(db_path)  # create the schema before the workers start
+            with ctx.Pool(workers) as pool:
+                results = pool.map(_worker, [(i, mode, db_path, lookups, keys, l1_entries) for i in range(workers)])
+        hits = sum(r[0] for r in results)
+        total = sum(r[1] for r in results)
+        elapsed = max(r[2] for r in results)
+        print(f'{mode:>8} {hits / total:>9.1%} {total - hits:>17} {total / elapsed:>11.0f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--lookups', type=int, default=5000)
+    parser.add_argument('--keys', type=int, default=2000)
+    parser.add_argument('--l1-entries', type=int, default=500)
+    args = parser.parse_args()
+    run(args.workers, args.lookups, args.keys, args.l1_entries)
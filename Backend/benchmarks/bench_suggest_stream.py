@@ -0,0 +1,71 @@
+"""
+Benchmark: time to first card of /recipes/suggest, the buffered JSON
+response versus the NDJSON stream (`"stream": "ndjson"`).
+
+Runs the recipe blueprint against the local fake Spoonacular server. For
+JSON the first card arrives with the whole body; for NDJSON it arrives with
+the `candidates` event, right after findByIngredients. Both report the time
+until the full result is known.
+
+    python benchmarks/bench_suggest_stream.py --latency 0.05 --requests 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from benchmarks.bench_prefetch import _percentile, build_app
+from benchmarks.fake_spoonacular import start_fake_server
+
+
+def run(latency, n_requests, prefetch, bulk):
+    import src.controllers.recipe_controller as rc
+    from src.services.rate_limiter import QuotaLimiter
+
+    # the point budget would otherwise throttle the benchmark itself
+    rc._limiter = QuotaLimiter(rate=1e9, burst=1e9)
+
+    server, base_url = start_fake_server(latency=latency)
+    os.environ['EP_RECIPE_CACHE_DIR'] = os.devnull + '/no-cache'
+    app = build_app(base_url, concurrency=5, bulk=bulk)
+    client = app.test_client()
+    print(f'upstream latency={latency} requests={n_requests} prefetch={prefetch} bulk={bulk}')
+    print(f"{'format':>7} {'first card p50 ms':>18} {'p99':>8} {'complete p50 ms':>16} {'p99':>8}")
+    try:
+        for fmt in ('json', 'ndjson'):
+            first, complete = [], []
+            for _ in range(n_requests):
+                rc._recipe_cache.clear()
+                body = {'ingredients': ['chicken', 'tomato'], 'number': 10, 'prefetch': prefetch}
+                if fmt != 'json':
+                    body['stream'] = fmt
+                start = time.perf_counter()
+                resp = client.post('/recipes/suggest', json=body, buffered=False)
+                chunks = iter(resp.response)
+                next(chunks)
+                first.append((time.perf_counter() - start) * 1000)
+                for _ in chunks:
+                    pass
+                complete.append((time.perf_counter() - start) * 1000)
+                resp.close()
+                assert resp.status_code == 200
+            print(f'{fmt:>7} {statistics.median(first):>18.1f} {_percentile(first, 99):>8.1f} '
+                  f'{statistics.median(complete):>16.1f} {_percentile(complete, 99):>8.1f}')
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', default='0.05',
+                        help='upstream latency per call: seconds or a distribution such as uniform:0.02,0.08')
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--prefetch', type=int, default=5)
+    parser.add_argument('--per-id', action='store_true', help='per-id detail calls instead of informationBulk')
+    args = parser.parse_args()
+    run(args.latency, args.requests, args.prefetch, bulk=not args.per_id)
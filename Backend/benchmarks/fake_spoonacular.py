@@ -0,0 +1,366 @@
+"""
+Local stand-in for the Spoonacular endpoints used by the backend.
+
+Serves `findByIngredients`, `{id}/information` and `informationBulk` so the
+whole backend can be load-tested offline: point `SPOONACULAR_URL_BASE` at it.
+
+Responses come from, in order:
+
+  1. recorded fixtures in `--fixtures DIR` (one JSON file per request, keyed
+     by path and query without `apiKey`; bulk requests are also answered by
+     combining per-id `information` fixtures),
+  2. the real API when `--record URL` is given (the response is saved as a
+     fixture, so a later run without `--record` replays it),
+  3. synthetic recipes generated from the request.
+
+Each request can be delayed by a latency distribution and failed with a
+configurable rate of 500s and 429s (with `Retry-After`). When a daily point
+budget is given the server also sends `X-API-Quota-*` headers and answers 402
+once it is spent, like the real API.
+
+    python benchmarks/fake_spoonacular.py --port 8089 --latency lognormal:0.08,0.5 \\
+        --error-rate 0.01 --rate-429 0.02
+    SPOONACULAR_URL_BASE=http://127.0.0.1:8089 python app.py
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qsl
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from src.services.rate_limiter import endpoint_cost
+
+
+# ---------- latency ----------
+class LatencyModel:
+    """
+    Per-request delay in seconds. Specs: `0.05` or `fixed:0.05`,
+    `uniform:LOW,HIGH`, `normal:MEAN,STDDEV`, `lognormal:MEDIAN,SIGMA`.
+    """
+
+    def __init__(self, kind='fixed', params=(0.0,)):
+        self.kind = kind
+        self.params = tuple(float(p) for p in params)
+
+    @classmethod
+    def parse(cls, spec):
+        if isinstance(spec, LatencyModel):
+            return spec
+        if spec is None or spec == '':
+            return cls()
+        if isinstance(spec, (int, float)):
+            return cls('fixed', (spec,))
+        kind, _, args = str(spec).partition(':')
+        if not args:
+            return cls('fixed', (float(kind),))
+        params = [float(x) for x in args.split(',')]
+        expected = {'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2}
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(f'Invalid latency spec: {spec}')
+        return cls(kind, params)
+
+    def sample(self, rng):
+        if self.kind == 'fixed':
+            value = self.params[0]
+        elif self.kind == 'uniform':
+            value = rng.uniform(*self.params)
+        elif self.kind == 'normal':
+            value = rng.gauss(*self.params)
+        else:
+            median, sigma = self.params
+            value = median * rng.lognormvariate(0.0, sigma) if median > 0 else 0.0
+        return max(0.0, value)
+
+
+# ---------- fixtures ----------
+def _endpoint(path):
+    if path.endswith('/recipes/findByIngredients'):
+        return 'findByIngredients'
+    if path.endswith('/recipes/informationBulk'):
+        return 'informationBulk'
+    if path.endswith('/information'):
+        return 'information'
+    return None
+
+
+def fixture_key(path, query):
+    """Stable key for a request: path plus sorted query, without the API key."""
+    items = sorted((k, v) for k, v in query.items() if k != 'apiKey')
+    return path.rstrip('/') + '?' + '&'.join(f'{k}={v}' for k, v in items)
+
+
+class FixtureStore:
+    """Recorded responses, one JSON file per request key."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _file(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest()[:20] + '.json')
+
+    def load(self, path, query):
+        try:
+            with open(self._file(fixture_key(path, query)), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return record.get('status', 200), record.get('body')
+
+    def save(self, path, query, status, body):
+        key = fixture_key(path, query)
+        record = {'key': key, 'status': status, 'body': body}
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self._file(key) + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(tmp, self._file(key))
+
+    def __len__(self):
+        try:
+            return sum(1 for name in os.listdir(self.directory) if name.endswith('.json'))
+        except OSError:
+            return 0
+
+
+# ---------- synthetic payloads ----------
+def _candidate(i, ingredients=('chicken', 'tomato')):
+    used = ingredients[0] if ingredients else 'chicken'
+    missed = ingredients[1] if len(ingredients) > 1 else 'tomato'
+    return {
+        'id': 1000 + i,
+        'title': f'Stub Recipe {i}',
+        'image': f'https://img.example/{i}.jpg',
+        'usedIngredientCount': 10 - (i % 10),
+        'missedIngredientCount': i % 4,
+        'usedIngredients': [{'id': 1, 'name': used, 'original': f'1 lb {used}', 'amount': 1, 'unit': 'lb'}],
+        'missedIngredients': [{'id': 2, 'name': missed, 'original': f'2 {missed}', 'amount': 2, 'unit': ''}],
+    }
+
+
+def _information(recipe_id, include_nutrition=True):
+    body = {
+        'id': recipe_id,
+        'title': f'Stub Recipe {recipe_id}',
+        'image': f'https://img.example/{recipe_id}.jpg',
+        'readyInMinutes': 25,
+        'servings': 2,
+        'summary': 'A stub recipe.',
+        'dishTypes': ['main course'],
+        'extendedIngredients': [
+            {'id': 1, 'name': 'chicken', 'original': '1 lb chicken', 'amount': 1, 'unit': 'lb'},
+            {'id': 2, 'name': 'tomato', 'original': '2 tomatoes', 'amount': 2, 'unit': ''},
+        ],
+        'analyzedInstructions': [{'steps': [{'number': 1, 'step': 'Cook.'}]}],
+        'sourceUrl': 'https://example.com',
+    }
+    if include_nutrition:
+        body['nutrition'] = {'nutrients': [{'name': 'Calories', 'amount': 420, 'unit': 'kcal'}]}
+    return body
+
+
+def _synthetic(endpoint, path, query):
+    if endpoint == 'findByIngredients':
+        n = int(query.get('number') or 5)
+        ingredients = tuple(x.strip() for x in query.get('ingredients', '').split(',') if x.strip())
+        return [_candidate(i, ingredients or ('chicken', 'tomato')) for i in range(n)]
+    nutrition = query.get('includeNutrition', 'false') == 'true'
+    if endpoint == 'informationBulk':
+        ids = [int(x) for x in query.get('ids', '').split(',') if x]
+        return [_information(rid, nutrition) for rid in ids]
+    return _information(int(path.rstrip('/').split('/')[-2]), nutrition)
+
+
+# ---------- server ----------
+class _Handler(BaseHTTPRequestHandler):
+    # keep-alive so clients that pool connections can reuse them
+    protocol_version = 'HTTP/1.1'
+    # headers and body are separate writes; avoid Nagle/delayed-ACK stalls on keep-alive
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=None, headers=None):
+        raw = b'' if body is None else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(raw)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(raw)
+        with self.server.lock:
+            self.server.status_counts[status] = self.server.status_counts.get(status, 0) + 1
+
+    def do_GET(self):
+        server = self.server
+        parsed = urlparse(self.path)
+        path = parsed.path.rstrip('/')
+        query = dict(parse_qsl(parsed.query))
+        endpoint = _endpoint(path)
+        with server.lock:
+            server.hits += 1
+            delay = server.latency.sample(server.rng)
+            roll = server.rng.random()
+        if delay:
+            time.sleep(delay)
+
+        if endpoint is None:
+            self._send(404, {'status': 'failure', 'code': 404, 'message': 'Not found'})
+            return
+        if roll < server.rate_429:
+            self._send(429, {'status': 'failure', 'code': 429, 'message': 'Too many requests'},
+                       {'Retry-After': str(server.retry_after)})
+            return
+        if roll < server.rate_429 + server.error_rate:
+            self._send(500, {'status': 'failure', 'code': 500, 'message': 'Injected error'})
+            return
+
+        quota_headers = {}
+        if server.daily_points is not None:
+            results = len(query.get('ids', '').split(',')) if endpoint == 'informationBulk' else \
+                int(query.get('number') or 1)
+            cost = endpoint_cost(endpoint, results)
+            with server.lock:
+                if server.points_used + cost > server.daily_points:
+                    exhausted = True
+                else:
+                    exhausted = False
+                    server.points_used += cost
+                used = server.points_used
+            if exhausted:
+                self._send(402, {'status': 'failure', 'code': 402, 'message': 'Daily points limit reached'})
+                return
+            quota_headers = {
+                'X-API-Quota-Request': f'{cost:g}',
+                'X-API-Quota-Used': f'{used:g}',
+                'X-API-Quota-Left': f'{max(0.0, server.daily_points - used):g}',
+            }
+
+        status, body = self._resolve(endpoint, path, query)
+        self._send(status, body, quota_headers)
+
+    def _resolve(self, endpoint, path, query):
+        server = self.server
+        if server.fixtures is not None:
+            found = server.fixtures.load(path, query)
+            if found is None and endpoint == 'informationBulk':
+                found = self._bulk_from_fixtures(path, query)
+            if found is not None:
+                with server.lock:
+                    server.replayed += 1
+                return found
+        if server.record_from:
+            return self._record(endpoint, path, query)
+        return 200, _synthetic(endpoint, path, query)
+
+    def _bulk_from_fixtures(self, path, query):
+        # answer a bulk request from recorded single-recipe responses
+        base = path[:-len('/informationBulk')]
+        body = []
+        for rid in (x for x in query.get('ids', '').split(',') if x):
+            found = self.server.fixtures.load(f'{base}/{rid}/information',
+                                              {'includeNutrition': query.get('includeNutrition', 'false')})
+            if found is None or found[0] != 200:
+                return None
+            body.append(found[1])
+        return 200, body
+
+    def _record(self, endpoint, path, query):
+        import requests
+
+        server = self.server
+        params = dict(query, apiKey=server.api_key or query.get('apiKey', ''))
+        try:
+            response = requests.get(server.record_from.rstrip('/') + path, params=params, timeout=30)
+            body = response.json()
+        except Exception as e:
+            return 502, {'status': 'failure', 'code': 502, 'message': f'Recording failed: {e}'}
+        if response.status_code == 200 and server.fixtures is not None:
+            server.fixtures.save(path, query, 200, body)
+            if endpoint == 'informationBulk':
+                # keep per-id copies so single lookups replay too
+                base = path[:-len('/informationBulk')]
+                for item in body:
+                    if isinstance(item, dict) and 'id' in item:
+                        server.fixtures.save(f"{base}/{item['id']}/information",
+                                             {'includeNutrition': query.get('includeNutrition', 'false')}, 200, item)
+            with server.lock:
+                server.recorded += 1
+        return response.status_code, body
+
+
+def start_fake_server(latency=0.0, error_rate=0.0, rate_429=0.0, fixtures_dir=None, record_from=None,
+                      api_key=None, daily_points=None, retry_after=1, seed=None, host='127.0.0.1', port=0):
+    """Start the fake server in a daemon thread. Returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.latency = LatencyModel.parse(latency)
+    server.error_rate = float(error_rate)
+    server.rate_429 = float(rate_429)
+    server.retry_after = retry_after
+    server.fixtures = FixtureStore(fixtures_dir) if fixtures_dir else None
+    server.record_from = record_from
+    server.api_key = api_key
+    server.daily_points = float(daily_points) if daily_points else None
+    server.points_used = 0.0
+    server.rng = random.Random(seed)
+    server.lock = threading.Lock()
+    server.hits = 0
+    server.replayed = 0
+    server.recorded = 0
+    server.status_counts = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', default='0', help="e.g. 0.05, uniform:0.02,0.1 or lognormal:0.08,0.5")
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 500')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='fraction of requests answered with 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--daily-points', type=float, default=None, help='simulate the daily point quota')
+    parser.add_argument('--fixtures', default=None, help='directory of recorded responses to replay')
+    parser.add_argument('--record', default=None, metavar='URL',
+                        help='forward fixture misses to this upstream and save them (needs --fixtures)')
+    parser.add_argument('--api-key', default=os.environ.get('SPOONACULAR_API_KEY'))
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+    if args.record and not args.fixtures:
+        parser.error('--record needs --fixtures')
+
+    server, base_url = start_fake_server(
+        latency=args.latency, error_rate=args.error_rate, rate_429=args.rate_429,
+        fixtures_dir=args.fixtures, record_from=args.record, api_key=args.api_key,
+        daily_points=args.daily_points, retry_after=args.retry_after, seed=args.seed,
+        host=args.host, port=args.port,
+    )
+    print(f'Fake Spoonacular listening; set SPOONACULAR_URL_BASE={base_url}')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print(f'hits={server.hits} replayed={server.replayed} recorded={server.recorded} '
+              f'statuses={server.status_counts}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Recipe payloads for serialization benchmarks.
+
+`recorded_payloads(directory)` loads the `information` responses recorded by
+fake_spoonacular.py (`--record`), so benchmarks can run on real data.
+`synthetic_information(recipe_id)` builds a payload shaped like a full
+Spoonacular `information` response with nutrition (about 25 KB: ingredients
+with measures, analyzed instructions, nutrients, an HTML summary), for use
+when no recordings are available.
+"""
+import json
+import os
+import random
+
+_INGREDIENTS = ['chicken breast', 'tomato', 'garlic', 'olive oil', 'onion', 'basil', 'parmesan cheese',
+                'spaghetti', 'salt', 'black pepper', 'butter', 'lemon', 'spinach', 'heavy cream',
+                'mushrooms', 'red pepper flakes', 'white wine', 'chicken broth']
+_NUTRIENTS = ['Calories', 'Fat', 'Saturated Fat', 'Carbohydrates', 'Net Carbohydrates', 'Sugar',
+              'Cholesterol', 'Sodium', 'Protein', 'Vitamin K', 'Vitamin C', 'Selenium', 'Vitamin A',
+              'Manganese', 'Vitamin B6', 'Phosphorus', 'Vitamin B3', 'Potassium', 'Folate',
+              'Vitamin B2', 'Copper', 'Magnesium', 'Iron', 'Fiber', 'Vitamin B1', 'Vitamin E',
+              'Calcium', 'Zinc', 'Vitamin B5', 'Vitamin B12', 'Vitamin D']
+
+
+def _ingredient(rng, i, name):
+    amount = round(rng.uniform(0.25, 4), 2)
+    measure = {'amount': amount, 'unitShort': 'tbsp', 'unitLong': 'tablespoons'}
+    return {
+        'id': 10000 + i, 'aisle': 'Produce', 'image': name.replace(' ', '-') + '.png', 'consistency': 'SOLID',
+        'name': name, 'nameClean': name, 'original': f'{amount} tablespoons {name}, chopped',
+        'originalName': f'{name}, chopped', 'amount': amount, 'unit': 'tablespoons',
+        'meta': ['chopped', 'fresh'], 'measures': {'us': measure, 'metric': dict(measure, amount=amount * 15)},
+    }
+
+
+def _step(rng, number, names):
+    used = rng.sample(names, 3)
+    return {
+        'number': number,
+        'step': f'Add the {used[0]} and {used[1]} to the pan and cook for {rng.randint(2, 15)} minutes, '
+                f'stirring occasionally, until the {used[2]} is soft and fragrant.',
+        'ingredients': [{'id': 10000 + names.index(n), 'name': n, 'localizedName': n, 'image': n + '.jpg'} for n in used],
+        'equipment': [{'id': 404645, 'name': 'frying pan', 'localizedName': 'frying pan', 'image': 'pan.png'}],
+        'length': {'number': rng.randint(2, 15), 'unit': 'minutes'},
+    }
+
+
+def synthetic_information(recipe_id, seed=None):
+    """A full `information` payload with nutrition, about 25 KB encoded."""
+    rng = random.Random(recipe_id if seed is None else seed)
+    names = rng.sample(_INGREDIENTS, 12)
+    ingredients = [_ingredient(rng, i, name) for i, name in enumerate(names)]
+    return {
+        'id': recipe_id, 'title': f'Creamy Garlic Chicken Pasta {recipe_id}',
+        'image': f'https://img.spoonacular.com/recipes/{recipe_id}-556x370.jpg', 'imageType': 'jpg',
+        'servings': 4, 'readyInMinutes': 45, 'cookingMinutes': 30, 'preparationMinutes': 15,
+        'sourceName': 'Example Kitchen', 'sourceUrl': f'https://example.com/recipes/{recipe_id}',
+        'spoonacularSourceUrl': f'https://spoonacular.com/recipe-{recipe_id}',
+        'healthScore': rng.randint(0, 100), 'spoonacularScore': rng.uniform(0, 100), 'pricePerServing': rng.uniform(50, 500),
+        'cheap': False, 'vegetarian': False, 'vegan': False, 'glutenFree': False, 'dairyFree': False,
+        'veryHealthy': False, 'veryPopular': True, 'sustainable': False, 'lowFodmap': False,
+        'weightWatcherSmartPoints': 12, 'aggregateLikes': rng.randint(0, 5000),
+        'cuisines': ['Italian', 'Mediterranean', 'European'], 'dishTypes': ['lunch', 'main course', 'dinner'],
+        'diets': [], 'occasions': [],
+        'summary': ' '.join(f'<b>{n}</b> brings <a href="https://example.com/{i}">flavor</a> to this dish.'
+                            for i, n in enumerate(names)) * 2,
+        'instructions': ' '.join(f'<li>{s}</li>' for s in ('Boil the pasta.', 'Cook the sauce.', 'Combine.')),
+        'extendedIngredients': ingredients,
+        'analyzedInstructions': [{'name': '', 'steps': [_step(rng, n, names) for n in range(1, 9)]}],
+        'nutrition': {
+            'nutrients': [{'name': n, 'amount': round(rng.uniform(0, 900), 2), 'unit': 'mg',
+                           'percentOfDailyNeeds': round(rng.uniform(0, 100), 2)} for n in _NUTRIENTS],
+            'ingredients': [{'id': el['id'], 'name': el['name'], 'amount': el['amount'], 'unit': el['unit'],
+                             'nutrients': [{'name': n, 'amount': round(rng.uniform(0, 50), 2), 'unit': 'g',
+                                            'percentOfDailyNeeds': round(rng.uniform(0, 10), 2)}
+                                           for n in _NUTRIENTS[:8]]} for el in ingredients],
+            'caloricBreakdown': {'percentProtein': 21.5, 'percentFat': 38.2, 'percentCarbs': 40.3},
+            'weightPerServing': {'amount': 412, 'unit': 'g'},
+        },
+        'winePairing': {'pairedWines': ['chardonnay', 'pinot grigio'],
+                        'pairingText': 'Chardonnay and Pinot Grigio are great choices for this pasta.'},
+    }
+
+
+def recorded_payloads(directory):
+    """`information` bodies recorded by fake_spoonacular.py in `directory` (bulk records are flattened)."""
+    payloads = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.json'):
+            continue
+        with open(os.path.join(directory, name), 'r', encoding='utf-8') as fh:
+            record = json.load(fh)
+        if '/information' not in record.get('key', '') or record.get('status', 200) != 200:
+            continue
+        body = record.get('body')
+        payloads.extend(b for b in (body if isinstance(body, list) else [body]) if isinstance(b, dict))
+    return payloads
+
+
+def load_payloads(directory=None, count=10):
+    """Recorded payloads from `directory` when given, otherwise `count` synthetic ones."""
+    if directory:
+        return recorded_payloads(directory)
+    return [synthetic_information(716000 + i) for i in range(count)]
@@ -0,0 +1,132 @@
+"""
+Report: cache hit rate of /recipes/suggest keys over a replayed request log,
+raw keys (lowercased + sorted, `prefetch` in the route key) versus canonical
+keys (src/services/ingredients.py, `prefetch` served by any entry built with
+at least as much prefetch).
+
+The log is JSON lines, one /recipes/suggest request body per line
+(`{"ingredients": [...], "number": 10, "prefetch": 5}`). Without `--log` a
+synthetic log is generated: users re-asking for their fridge with the
+usual noise (casing, plurals, trailing spaces, varieties, duplicates, a
+different `prefetch`). The cache is unbounded and never expires, so the
+numbers isolate the effect of the key.
+
+    python benchmarks/report_suggest_hit_rate.py --requests 20000
+    python benchmarks/report_suggest_hit_rate.py --log suggest_requests.jsonl
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from src.services.ingredients import ingredient_key
+
+# canonical name -> spellings users actually type
+_VARIANTS = {
+    'tomato': ['tomato', 'Tomatoes', 'tomatoes', 'roma tomato', 'Tomato '],
+    'green onion': ['green onion', 'scallions', 'Spring onions', 'green onions'],
+    'egg': ['egg', 'eggs', 'Eggs', 'egg '],
+    'potato': ['potato', 'potatoes', 'Potatoes'],
+    'chickpea': ['chickpeas', 'garbanzo beans', 'chickpea'],
+    'bell pepper': ['bell pepper', 'bell peppers', 'capsicum'],
+    'cheese': ['cheese', 'Cheese', 'cheeses'],
+    'chicken': ['chicken', 'Chicken', 'chicken '],
+    'rice': ['rice', 'Rice'],
+    'onion': ['onion', 'onions', 'Onion'],
+    'garlic': ['garlic', 'Garlic'],
+    'carrot': ['carrot', 'carrots', 'Carrots'],
+    'zucchini': ['zucchini', 'courgette', 'Zucchini'],
+    'milk': ['milk', 'whole milk', 'Milk'],
+    'butter': ['butter', 'unsalted butter', 'Butter'],
+    'flour': ['flour', 'all-purpose flour', 'plain flour'],
+    'spinach': ['spinach', 'Spinach'],
+    'mushroom': ['mushrooms', 'mushroom', 'Mushrooms'],
+    'lemon': ['lemon', 'lemons'],
+    'ground beef': ['ground beef', 'minced beef', 'beef mince'],
+}
+
+
+def synthetic_log(n_requests, n_users, seed=42):
+    rng = random.Random(seed)
+    pool = sorted(_VARIANTS)
+    fridges = [rng.sample(pool, rng.randint(2, 5)) for _ in range(n_users)]
+    weights = [1.0 / (i + 1) for i in range(n_users)]
+    log = []
+    for _ in range(n_requests):
+        fridge = rng.choices(fridges, weights=weights)[0]
+        names = [rng.choice(_VARIANTS[item]) for item in fridge]
+        if rng.random() < 0.1:
+            names.append(rng.choice(_VARIANTS[rng.choice(fridge)]))
+        rng.shuffle(names)
+        body = {'ingredients': names, 'prefetch': rng.choice([0, 3, 5, 5, 10])}
+        if rng.random() < 0.3:
+            body['number'] = 10
+        log.append(body)
+    return log
+
+
+def read_log(path):
+    with open(path, 'r', encoding='utf-8') as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def _raw_route_key(body):
+    return (tuple(sorted(str(x).lower() for x in body.get('ingredients') or [])),
+            body.get('number'), body.get('prefetch', 5))
+
+
+def replay(log):
+    raw_route, raw_search = set(), set()
+    canon_route, canon_search = {}, set()
+    hits = {'raw_route': 0, 'raw_search': 0, 'canon_route': 0, 'canon_search': 0}
+    for body in log:
+        ings = body.get('ingredients') or []
+        prefetch = body.get('prefetch', 5)
+
+        key = _raw_route_key(body)
+        hits['raw_route'] += key in raw_route
+        raw_route.add(key)
+        key = ','.join(sorted(str(i).lower() for i in ings))
+        hits['raw_search'] += key in raw_search
+        raw_search.add(key)
+
+        key = (ingredient_key(ings), body.get('number'))
+        if key in canon_route and canon_route[key] >= prefetch:
+            hits['canon_route'] += 1
+        else:
+            canon_route[key] = prefetch
+        key = ingredient_key(ings)
+        hits['canon_search'] += key in canon_search
+        canon_search.add(key)
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--log', help='JSON lines of /recipes/suggest bodies (default: synthetic)')
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--write-log', help='save the synthetic log here for later replays')
+    args = parser.parse_args()
+
+    log = read_log(args.log) if args.log else synthetic_log(args.requests, args.users)
+    if args.write_log:
+        with open(args.write_log, 'w', encoding='utf-8') as fh:
+            for body in log:
+                fh.write(json.dumps(body) + '\n')
+
+    hits = replay(log)
+    n = len(log) or 1
+    print(f'requests={len(log)}')
+    print(f"{'cache':>22} {'raw':>8} {'canonical':>10}")
+    print(f"{'route (suggest result)':>22} {hits['raw_route'] / n:>8.1%} {hits['canon_route'] / n:>10.1%}")
+    print(f"{'findByIngredients':>22} {hits['raw_search'] / n:>8.1%} {hits['canon_search'] / n:>10.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,683 @@
+"""
+In-process stand-in for MongoDB.
+
+`MemoryClient` / `MemoryDatabase` / `MemoryCollection` implement the part of
+the PyMongo surface the models use (find / find_one with filters,
+projections, sort, skip and limit; insert_one / insert_many; update_one /
+update_many / replace_one with upserts; delete_*; bulk_write with PyMongo's
+operation classes; count_documents; unique indexes) and return PyMongo's own
+result and error types, so code and tests run against realistic semantics
+without a server. Select it with `EP_DB_ENGINE=memory` (see db.py).
+
+Documents are copied on the way in and out, like a real round trip, and
+every collection has its own lock. Supported query operators: $eq, $ne,
+$gt, $gte, $lt, $lte, $in, $nin, $exists, $regex, $size, $and, $or, $nor;
+update operators: $set, $unset, $inc, $push, $addToSet, $setOnInsert.
+`cursor.explain()` reports the plan MongoDB would choose from the declared
+indexes (IXSCAN on the longest matching key prefix, else COLLSCAN).
+"""
+import datetime
+import re
+import threading
+
+from bson import ObjectId
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.operations import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+_MISSING = object()
+
+
+def _copy(value):
+    # documents only hold JSON-like containers; everything else is immutable
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+# ---------- paths ----------
+def _resolve(doc, parts):
+    """Values at a dotted path; arrays along the way are traversed element-wise."""
+    if not parts:
+        return [doc]
+    if isinstance(doc, dict):
+        if parts[0] not in doc:
+            return [_MISSING]
+        return _resolve(doc[parts[0]], parts[1:])
+    if isinstance(doc, list):
+        if parts[0].isdigit():
+            index = int(parts[0])
+            return _resolve(doc[index], parts[1:]) if index < len(doc) else [_MISSING]
+        values = [v for el in doc if isinstance(el, (dict, list)) for v in _resolve(el, parts)]
+        return values or [_MISSING]
+    return [_MISSING]
+
+
+def _get(doc, path):
+    node = doc
+    for part in path.split('.'):
+        if isinstance(node, dict) and part in node:
+            node = node[part]
+        elif isinstance(node, list) and part.isdigit() and int(part) < len(node):
+            node = node[int(part)]
+        else:
+            return _MISSING
+    return node
+
+
+def _set(doc, path, value):
+    parts = path.split('.')
+    node = doc
+    for part in parts[:-1]:
+        child = node.get(part)
+        if not isinstance(child, dict):
+            child = node[part] = {}
+        node = child
+    node[parts[-1]] = value
+
+
+def _unset(doc, path):
+    parts = path.split('.')
+    node = doc
+    for part in parts[:-1]:
+        node = node.get(part)
+        if not isinstance(node, dict):
+            return
+    node.pop(parts[-1], None)
+
+
+# ---------- matching ----------
+def _bracket(value):
+    # BSON comparison order between types; values of different brackets never compare
+    if value is None or value is _MISSING:
+        return 0
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 1
+    if isinstance(value, str):
+        return 2
+    if isinstance(value, dict):
+        return 3
+    if isinstance(value, list):
+        return 4
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, datetime.datetime):
+        return 9
+    return 10
+
+
+def _candidates(values):
+    # a condition on an array field matches the array itself or any element
+    out = []
+    for v in values:
+        out.append(v)
+        if isinstance(v, list):
+            out.extend(v)
+    return out
+
+
+def _equals(values, expected):
+    for v in _candidates(values):
+        if v is _MISSING:
+            if expected is None:
+                return True
+        elif v == expected and _bracket(v) == _bracket(expected):
+            return True
+    return False
+
+
+_COMPARE = {
+    '$gt': lambda a, b: a > b,
+    '$gte': lambda a, b: a >= b,
+    '$lt': lambda a, b: a < b,
+    '$lte': lambda a, b: a <= b,
+}
+
+
+def _operator(values, op, arg):
+    if op == '$eq':
+        return _equals(values, arg)
+    if op == '$ne':
+        return not _equals(values, arg)
+    if op in _COMPARE:
+        cmp = _COMPARE[op]
+        return any(v is not _MISSING and _bracket(v) == _bracket(arg) and cmp(v, arg) for v in _candidates(values))
+    if op == '$in':
+        return any(_equals(values, a) for a in arg)
+    if op == '$nin':
+        return not any(_equals(values, a) for a in arg)
+    if op == '$exists':
+        return any(v is not _MISSING for v in values) == bool(arg)
+    if op == '$regex':
+        pattern = arg if hasattr(arg, 'search') else re.compile(arg)
+        return any(isinstance(v, str) and pattern.search(v) for v in _candidates(values))
+    if op == '$size':
+        return any(isinstance(v, list) and len(v) == arg for v in values)
+    raise OperationFailure(f'unknown operator: {op}')
+
+
+def _match_field(doc, path, condition):
+    values = _resolve(doc, path.split('.'))
+    if isinstance(condition, dict) and condition and all(k.startswith('$') for k in condition):
+        options = condition.get('$options', '')
+        for op, arg in condition.items():
+            if op == '$options':
+                continue
+            if op == '$regex' and options and isinstance(arg, str):
+                flags = re.IGNORECASE if 'i' in options else 0
+                arg = re.compile(arg, flags | (re.MULTILINE if 'm' in options else 0))
+            if not _operator(values, op, arg):
+                return False
+        return True
+    if hasattr(condition, 'search'):
+        return _operator(values, '$regex', condition)
+    return _equals(values, condition)
+
+
+def matches(doc, query):
+    """True if `doc` satisfies the MongoDB `query` document."""
+    for key, condition in (query or {}).items():
+        if key == '$and':
+            if not all(matches(doc, q) for q in condition):
+                return False
+        elif key == '$or':
+            if not any(matches(doc, q) for q in condition):
+                return False
+        elif key == '$nor':
+            if any(matches(doc, q) for q in condition):
+                return False
+        elif not _match_field(doc, key, condition):
+            return False
+    return True
+
+
+# ---------- projection, sort, update ----------
+def _project(doc, projection):
+    if not projection:
+        return _copy(doc)
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+    include_id = projection.get('_id', 1)
+    fields = {k: v for k, v in projection.items() if k != '_id'}
+    # {'_id': 1} alone is an inclusion projection: only `_id` comes back
+    if (fields and all(fields.values())) or (not fields and '_id' in projection and include_id):
+        out = {}
+        if include_id and '_id' in doc:
+            out['_id'] = doc['_id']
+        for path in fields:
+            value = _get(doc, path)
+            if value is not _MISSING:
+                _set(out, path, _copy(value))
+        return out
+    if any(fields.values()):
+        raise OperationFailure('cannot mix inclusion and exclusion in a projection')
+    out = _copy(doc)
+    for path in fields:
+        _unset(out, path)
+    if not include_id:
+        out.pop('_id', None)
+    return out
+
+
+def _sort_key(doc, path):
+    value = _get(doc, path)
+    if isinstance(value, list):
+        value = min(value, key=lambda v: (_bracket(v), v)) if value else None
+    return (_bracket(value), None if value is _MISSING else value)
+
+
+def _sort_spec(key_or_list, direction=None):
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction if direction is not None else ASCENDING)]
+    return [(k, d) for k, d in key_or_list]
+
+
+def _sort(docs, spec):
+    for path, direction in reversed(spec):
+        docs.sort(key=lambda d: _sort_key(d, path), reverse=direction < 0)
+    return docs
+
+
+def _apply_update(doc, update, inserting=False):
+    """Apply an update document in place; returns True if `doc` changed."""
+    before = _freeze(doc)
+    for op, fields in update.items():
+        if op == '$setOnInsert' and not inserting:
+            continue
+        for path, value in fields.items():
+            if path == '_id' and op in ('$set', '$unset') and _get(doc, '_id') != value:
+                raise OperationFailure("Performing an update on the path '_id' would modify the immutable field '_id'")
+            if op in ('$set', '$setOnInsert'):
+                _set(doc, path, _copy(value))
+            elif op == '$unset':
+                _unset(doc, path)
+            elif op == '$inc':
+                current = _get(doc, path)
+                _set(doc, path, (0 if current is _MISSING else current) + value)
+            elif op in ('$push', '$addToSet'):
+                current = _get(doc, path)
+                items = list(current) if isinstance(current, list) else []
+                new = value['$each'] if isinstance(value, dict) and '$each' in value else [value]
+                for item in new:
+                    if op == '$push' or item not in items:
+                        items.append(_copy(item))
+                _set(doc, path, items)
+            else:
+                raise OperationFailure(f'unknown update operator: {op}')
+    return _freeze(doc) != before
+
+
+def _is_operator_update(update):
+    return bool(update) and all(k.startswith('$') for k in update)
+
+
+def _upsert_base(query):
+    # equality conditions of the filter seed the inserted document
+    doc = {}
+    for key, condition in (query or {}).items():
+        if key.startswith('$'):
+            continue
+        if isinstance(condition, dict) and condition and all(k.startswith('$') for k in condition):
+            if '$eq' in condition:
+                _set(doc, key, _copy(condition['$eq']))
+            continue
+        _set(doc, key, _copy(condition))
+    return doc
+
+
+def _index_name(keys):
+    return '_'.join(f'{field}_{direction}' for field, direction in keys)
+
+
+class MemoryCursor:
+    """Lazy result of `find`: sort / skip / limit are applied when iterated."""
+
+    def __init__(self, collection, query, projection, sort=None, skip=0, limit=0):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort = list(sort) if sort else []
+        self._skip = skip
+        self._limit = limit
+        self._results = None
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = _sort_spec(key_or_list, direction)
+        return self
+
+    def skip(self, n):
+        self._skip = int(n)
+        return self
+
+    def limit(self, n):
+        self._limit = int(n)
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def _run(self):
+        if self._results is None:
+            # without a sort only skip + limit documents are needed
+            limit = self._skip + self._limit if self._limit and not self._sort else 0
+            docs = self._collection._select(self._query, limit=limit)
+            if self._sort:
+                _sort(docs, self._sort)
+            docs = docs[self._skip:]
+            if self._limit:
+                docs = docs[:self._limit]
+            # documents are copied as they are consumed, like batches from a server
+            self._results = (_project(d, self._projection) for d in docs)
+        return self._results
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._run())
+
+    def close(self):
+        self._results = iter(())
+
+    def explain(self):
+        """Query plan in the shape of MongoDB's explain output (queryPlanner.winningPlan)."""
+        return {'queryPlanner': {'namespace': f'{self._collection.database.name}.{self._collection.name}',
+                                 'winningPlan': self._collection._plan(self._query, self._sort)}}
+
+
+class MemoryCollection:
+    """Collection stored as a dict of documents by _id (insertion order is natural order)."""
+
+    def __init__(self, database, name):
+        self.database = database
+        self.name = name
+        self._lock = threading.RLock()
+        self._docs = {}
+        # index name -> {'key': [(field, direction)], 'unique': bool}
+        self._indexes = {'_id_': {'key': [('_id', ASCENDING)], 'unique': True}}
+        # unique index name -> {frozen key values: _id}
+        self._unique = {}
+
+    # ---------- indexes ----------
+    def create_index(self, keys, unique=False, name=None, **kwargs):
+        keys = _sort_spec(keys)
+        name = name or _index_name(keys)
+        with self._lock:
+            self._indexes[name] = {'key': keys, 'unique': bool(unique)}
+            if unique:
+                seen = {}
+                for doc in self._docs.values():
+                    value = self._index_value(keys, doc)
+                    if value in seen:
+                        del self._indexes[name]
+                        raise DuplicateKeyError(f'E11000 duplicate key error index: {name}', 11000)
+                    seen[value] = doc['_id']
+                self._unique[name] = seen
+        return name
+
+    def index_information(self):
+        with self._lock:
+            return {name: {'key': list(spec['key']), **({'unique': True} if spec['unique'] and name != '_id_' else {})}
+                    for name, spec in self._indexes.items()}
+
+    def drop_index(self, name):
+        with self._lock:
+            self._indexes.pop(name, None)
+            self._unique.pop(name, None)
+
+    @staticmethod
+    def _index_value(keys, doc):
+        values = []
+        for field, _ in keys:
+            value = _get(doc, field)
+            values.append(None if value is _MISSING else _freeze(value))
+        return tuple(values)
+
+    def _check_unique(self, doc, old=None):
+        for name, seen in self._unique.items():
+            keys = self._indexes[name]['key']
+            value = self._index_value(keys, doc)
+            owner = seen.get(value)
+            if owner is not None and owner != doc['_id']:
+                raise DuplicateKeyError(
+                    f'E11000 duplicate key error collection: {self.name} index: {name} dup key: {value}',
+                    11000, {'keyPattern': dict(keys), 'keyValue': dict(zip((k for k, _ in keys), value))})
+        if doc['_id'] in self._docs and old is None:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: _id_", 11000,
+                                    {'keyPattern': {'_id': 1}, 'keyValue': {'_id': doc['_id']}})
+
+    def _store(self, doc, old=None):
+        self._check_unique(doc, old)
+        for name, seen in self._unique.items():
+            keys = self._indexes[name]['key']
+            if old is not None:
+                seen.pop(self._index_value(keys, old), None)
+            seen[self._index_value(keys, doc)] = doc['_id']
+        self._docs[doc['_id']] = doc
+
+    def _remove(self, doc):
+        for name, seen in self._unique.items():
+            seen.pop(self._index_value(self._indexes[name]['key'], doc), None)
+        del self._docs[doc['_id']]
+
+    def _plan(self, query, sort=None):
+        # The index whose leading fields are constrained by the most filter
+        # fields wins (the prefix rule); without one, an index matching the
+        # sort still avoids the scan. Otherwise the collection is scanned.
+        # Only reported by explain(): reads here always walk the documents.
+        query = query or {}
+        if '_id' in query and not isinstance(query['_id'], dict):
+            return {'stage': 'IDHACK'}
+        constrained = {k for k in query if not k.startswith('$')}
+        best = None
+        for name, spec in self._indexes.items():
+            prefix = 0
+            for field, _ in spec['key']:
+                if field not in constrained:
+                    break
+                prefix += 1
+            if prefix and (best is None or prefix > best[0]):
+                best = (prefix, name, spec)
+        if best is None and sort:
+            sort_fields = [field for field, _ in sort]
+            for name, spec in self._indexes.items():
+                if [field for field, _ in spec['key']][:len(sort_fields)] == sort_fields:
+                    best = (0, name, spec)
+                    break
+        if best is None:
+            return {'stage': 'COLLSCAN', 'filter': query}
+        _, name, spec = best
+        return {'stage': 'FETCH', 'inputStage': {'stage': 'IXSCAN', 'indexName': name,
+                                                 'keyPattern': dict(spec['key']), 'isUnique': spec['unique']}}
+
+    # ---------- reads ----------
+    def _select(self, query, limit=0):
+        with self._lock:
+            _id = (query or {}).get('_id', _MISSING)
+            if _id is not _MISSING and not isinstance(_id, dict):
+                doc = self._docs.get(_id)
+                return [doc] if doc is not None and matches(doc, query) else []
+            out = []
+            for doc in self._docs.values():
+                if matches(doc, query):
+                    out.append(doc)
+                    if limit and len(out) >= limit:
+                        break
+            return out
+
+    def find(self, filter=None, projection=None, sort=None, skip=0, limit=0, **kwargs):
+        return MemoryCursor(self, filter, projection, sort=sort, skip=skip, limit=limit)
+
+    def find_one(self, filter=None, projection=None, sort=None, **kwargs):
+        if filter is not None and not isinstance(filter, dict):
+            filter = {'_id': filter}
+        for doc in MemoryCursor(self, filter, projection, sort=sort, limit=1):
+            return doc
+        return None
+
+    def count_documents(self, filter, **kwargs):
+        return len(self._select(filter))
+
+    def estimated_document_count(self, **kwargs):
+        return len(self._docs)
+
+    def distinct(self, key, filter=None):
+        out = []
+        for doc in self._select(filter):
+            for value in _candidates(_resolve(doc, key.split('.'))):
+                if value is not _MISSING and not isinstance(value, list) and value not in out:
+                    out.append(value)
+        return out
+
+    # ---------- writes ----------
+    def _insert_locked(self, document):
+        if not isinstance(document, dict):
+            raise TypeError('document must be a dict')
+        if '_id' not in document:
+            # PyMongo sets the generated _id on the caller's document
+            document['_id'] = ObjectId()
+        self._store(_copy(document))
+        return document['_id']
+
+    def _update_locked(self, query, update, many=False, upsert=False, replace=False):
+        """Returns (matched, modified, upserted_id)."""
+        if replace:
+            if _is_operator_update(update):
+                raise ValueError('replacement can not include $ operators')
+        elif not _is_operator_update(update):
+            raise ValueError('update only works with $ operators')
+        targets = self._select(query, limit=0 if many else 1)
+        modified = 0
+        for doc in targets:
+            new = _copy(doc)
+            if replace:
+                new = dict(_copy(update), _id=doc['_id'])
+                changed = new != doc
+            else:
+                changed = _apply_update(new, update)
+            if changed:
+                self._store(new, old=doc)
+                modified += 1
+        if targets or not upsert:
+            return len(targets), modified, None
+        new = _upsert_base(query)
+        if replace:
+            new.update(_copy(update))
+        else:
+            _apply_update(new, update, inserting=True)
+        return 0, 0, self._insert_locked(new)
+
+    def _delete_locked(self, query, many=False):
+        targets = self._select(query, limit=0 if many else 1)
+        for doc in targets:
+            self._remove(doc)
+        return len(targets)
+
+    def insert_one(self, document, **kwargs):
+        with self._lock:
+            return InsertOneResult(self._insert_locked(document), True)
+
+    def insert_many(self, documents, ordered=True, **kwargs):
+        documents = list(documents)
+        if not documents:
+            raise TypeError('documents must be a non-empty list')
+        self.bulk_write([InsertOne(doc) for doc in documents], ordered=ordered)
+        return InsertManyResult([doc['_id'] for doc in documents if '_id' in doc], True)
+
+    def update_one(self, filter, update, upsert=False, **kwargs):
+        with self._lock:
+            matched, modified, upserted = self._update_locked(filter, update, upsert=upsert)
+        return UpdateResult({'n': matched + (upserted is not None), 'nModified': modified,
+                             **({'upserted': upserted} if upserted is not None else {})}, True)
+
+    def update_many(self, filter, update, upsert=False, **kwargs):
+        with self._lock:
+            matched, modified, upserted = self._update_locked(filter, update, many=True, upsert=upsert)
+        return UpdateResult({'n': matched + (upserted is not None), 'nModified': modified,
+                             **({'upserted': upserted} if upserted is not None else {})}, True)
+
+    def replace_one(self, filter, replacement, upsert=False, **kwargs):
+        with self._lock:
+            matched, modified, upserted = self._update_locked(filter, replacement, upsert=upsert, replace=True)
+        return UpdateResult({'n': matched + (upserted is not None), 'nModified': modified,
+                             **({'upserted': upserted} if upserted is not None else {})}, True)
+
+    def delete_one(self, filter, **kwargs):
+        with self._lock:
+            return DeleteResult({'n': self._delete_locked(filter)}, True)
+
+    def delete_many(self, filter, **kwargs):
+        with self._lock:
+            return DeleteResult({'n': self._delete_locked(filter, many=True)}, True)
+
+    def bulk_write(self, requests, ordered=True, **kwargs):
+        """Apply PyMongo write operations; errors are reported like the server (BulkWriteError)."""
+        result = {'writeErrors': [], 'writeConcernErrors': [], 'nInserted': 0, 'nUpserted': 0,
+                  'nMatched': 0, 'nModified': 0, 'nRemoved': 0, 'upserted': []}
+        with self._lock:
+            for index, request in enumerate(requests):
+                try:
+                    self._bulk_one(request, index, result)
+                except (DuplicateKeyError, OperationFailure, ValueError, TypeError) as exc:
+                    code = getattr(exc, 'code', None) or 2
+                    result['writeErrors'].append({'index': index, 'code': code, 'errmsg': str(exc),
+                                                  'op': getattr(request, '_doc', None) or getattr(request, '_filter', None)})
+                    if ordered:
+                        break
+        if result['writeErrors']:
+            raise BulkWriteError(result)
+        return BulkWriteResult(result, True)
+
+    def _bulk_one(self, request, index, result):
+        if isinstance(request, InsertOne):
+            self._insert_locked(request._doc)
+            result['nInserted'] += 1
+            return
+        if isinstance(request, (DeleteOne, DeleteMany)):
+            result['nRemoved'] += self._delete_locked(request._filter, many=isinstance(request, DeleteMany))
+            return
+        if isinstance(request, (UpdateOne, UpdateMany, ReplaceOne)):
+            matched, modified, upserted = self._update_locked(
+                request._filter, request._doc, many=isinstance(request, UpdateMany),
+                upsert=bool(request._upsert), replace=isinstance(request, ReplaceOne))
+            result['nMatched'] += matched
+            result['nModified'] += modified
+            if upserted is not None:
+                result['nUpserted'] += 1
+                result['upserted'].append({'index': index, '_id': upserted})
+            return
+        raise TypeError(f'unsupported bulk operation: {request!r}')
+
+    def drop(self):
+        with self._lock:
+            self._docs.clear()
+            self._indexes = {'_id_': self._indexes['_id_']}
+            self._unique.clear()
+
+
+class MemoryDatabase:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = self._collections[name] = MemoryCollection(self, name)
+            return collection
+
+    def get_collection(self, name, **kwargs):
+        return self[name]
+
+    def list_collection_names(self):
+        return list(self._collections)
+
+    def drop_collection(self, name):
+        with self._lock:
+            self._collections.pop(name, None)
+
+    def command(self, command, *args, **kwargs):
+        if command == 'ping' or command == {'ping': 1}:
+            return {'ok': 1.0}
+        raise OperationFailure(f'command not supported by the memory engine: {command}')
+
+
+class MemoryClient:
+    """Stand-in for MongoClient: databases are created on first access."""
+
+    def __init__(self, *args, **kwargs):
+        self._databases = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        with self._lock:
+            database = self._databases.get(name)
+            if database is None:
+                database = self._databases[name] = MemoryDatabase(self, name)
+            return database
+
+    def get_database(self, name, **kwargs):
+        return self[name]
+
+    @property
+    def admin(self):
+        return self['admin']
+
+    def close(self):
+        pass
@@ -6,4 +6,10 @@ load_dotenv()
 class Config:
     
     SPOONACULAR_API_KEY = os.getenv("SPOONACULAR_API_KEY")
-    SPOONACULAR_URL_BASE = os.getenv("SPOONACULAR_URL_BASE")
\ No newline at end of file
+    SPOONACULAR_URL_BASE = os.getenv("SPOONACULAR_URL_BASE")
+    RECIPE_PREFETCH_CONCURRENCY = int(os.getenv("EP_RECIPE_PREFETCH_CONCURRENCY", "5"))
+    RECIPE_CACHE_SOFT_TTL = int(os.getenv("EP_RECIPE_MEMCACHE_SOFT_TTL")) if os.getenv("EP_RECIPE_MEMCACHE_SOFT_TTL") else None
+    RECIPE_NEGATIVE_CACHE_TTL = int(os.getenv("EP_RECIPE_NEGATIVE_CACHE_TTL", "10"))
+    RECIPE_PREFETCH_BULK = os.getenv("EP_RECIPE_PREFETCH_BULK", "1") not in ("0", "false", "False")
+    RECIPE_LOCAL_CORPUS = os.getenv("EP_RECIPE_LOCAL_CORPUS", "1") not in ("0", "false", "False")
+    RECIPE_RANKING_WEIGHTS = os.getenv("EP_RECIPE_RANKING_WEIGHTS", "")
@@ -1,38 +1,297 @@
 import os
-import time
 import threading
-import requests
 from flask import current_app
 
-def get_recipes_by_ingredients(ingredients, number=5):
+from ..services.circuit_breaker import CircuitBreaker
+from ..services.http_client import UpstreamClient
+from ..services.ingredients import canonicalize_ingredients
+from ..services.rate_limiter import PRIORITY_INTERACTIVE, PRIORITY_PREFETCH, QuotaLimiter, endpoint_cost
+from ..services.recipe_cache import RecipeCache
+from ..services.recipe_corpus import RecipeCorpus
+from ..services.refresher import BackgroundRefresher
+from ..services.shared_cache import make_cache_backend
+from ..services.singleflight import SingleFlight
 
-    if not ingredients:
-        return {"error": "No ingredients provided"}, 400
 
-    # Simple in-memory TTL cache to avoid repeated identical requests to Spoonacular
-    cache_ttl = int(current_app.config.get('RECIPE_CACHE_TTL', 60 * 60 * 24))  # default 24h
-    cache_key = f"findByIngredients:{','.join(sorted([str(i).lower() for i in ingredients]))}"
+def _shared_cache_backend():
+    # Optional host-wide L2 shared by all worker processes (EP_RECIPE_CACHE_BACKEND=sqlite).
+    # A misconfigured backend must not take the worker down: fall back to L1 only.
+    try:
+        return make_cache_backend(os.environ.get('EP_RECIPE_CACHE_BACKEND'), os.environ.get('EP_RECIPE_CACHE_DB'))
+    except Exception as e:
+        print('Warning: shared recipe cache disabled:', e)
+        return None
+
 
-    # ensure globals exist on module
-    global _recipe_cache, _recipe_cache_lock
-    if '_recipe_cache' not in globals():
-        _recipe_cache = {}
-        _recipe_cache_lock = threading.Lock()
+# Process-wide cache for upstream payloads. Bounded by entry count and an
+# approximate byte budget so long-running workers don't grow without limit.
+_recipe_cache = RecipeCache(
+    max_entries=int(os.environ.get('EP_RECIPE_MEMCACHE_MAX_ENTRIES', '5000')),
+    max_bytes=int(os.environ.get('EP_RECIPE_MEMCACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+    sweep_interval=int(os.environ.get('EP_RECIPE_MEMCACHE_SWEEP_INTERVAL', '60')),
+    backend=_shared_cache_backend(),
+    # expired entries are kept this long to be served while Spoonacular is failing
+    stale_if_error=int(os.environ.get('EP_RECIPE_CACHE_STALE_IF_ERROR', str(60 * 60 * 24))),
+)
 
-    now = int(time.time())
-    with _recipe_cache_lock:
-        entry = _recipe_cache.get(cache_key)
-        if entry and now - entry['ts'] < cache_ttl:
-            return entry['value']
+# Short-lived memory of upstream failures per cache key, so a failing lookup is
+# not retried by every request that asks for it.
+_negative_cache = RecipeCache(max_entries=2000, max_bytes=1024 * 1024, sweep_interval=30)
 
-    api_key = current_app.config["SPOONACULAR_API_KEY"]
-    url = f"{current_app.config['SPOONACULAR_URL_BASE']}/recipes/findByIngredients"
+# Stops calling Spoonacular for a while after repeated failures.
+_breaker = CircuitBreaker(
+    failure_threshold=int(os.environ.get('EP_SPOONACULAR_BREAKER_FAILURES', '5')),
+    reset_timeout=float(os.environ.get('EP_SPOONACULAR_BREAKER_RESET_TIMEOUT', '30')),
+)
+
+# One pooled keep-alive client shared by every Spoonacular call in this process.
+# Every answered request costs points, so only connection errors are retried:
+# a retried 429/5xx would spend points the limiter below never reserved.
+upstream_client = UpstreamClient(
+    pool_maxsize=int(os.environ.get('EP_SPOONACULAR_POOL_SIZE', '16')),
+    connect_timeout=float(os.environ.get('EP_SPOONACULAR_CONNECT_TIMEOUT', '3.05')),
+    read_timeout=float(os.environ.get('EP_SPOONACULAR_READ_TIMEOUT', '10')),
+    retries=int(os.environ.get('EP_SPOONACULAR_RETRIES', '2')),
+    max_retry_wait=float(os.environ.get('EP_SPOONACULAR_MAX_RETRY_WAIT', '0.5')),
+    status_retries=0,
+)
+
+# Point budget in front of the client: smooths bursts, tracks the daily quota and
+# keeps a reserve that speculative prefetches may not use.
+_limiter = QuotaLimiter(
+    rate=float(os.environ.get('EP_SPOONACULAR_POINTS_PER_SEC', '10')),
+    burst=float(os.environ.get('EP_SPOONACULAR_POINTS_BURST', '20')),
+    daily_points=float(os.environ.get('EP_SPOONACULAR_DAILY_POINTS', '0')) or None,
+    prefetch_reserve=float(os.environ.get('EP_SPOONACULAR_PREFETCH_RESERVE', '0.2')),
+)
+
+# Every recipe fetched from Spoonacular, indexed by ingredient so /suggest can
+# answer findByIngredients locally. EP_RECIPE_CORPUS_FILE seeds it on first use.
+_corpus = RecipeCorpus(max_recipes=int(os.environ.get('EP_RECIPE_CORPUS_MAX_RECIPES', '50000')))
+_corpus_state = {'seeded': False, 'local_hits': 0, 'local_misses': 0}
+# guards _corpus_state: request threads seed once and count concurrently
+_corpus_lock = threading.Lock()
+
+# Concurrent misses on the same cache key share one upstream request.
+_inflight = SingleFlight()
+
+# Refreshes stale entries in the background (stale-while-revalidate).
+_refresher = BackgroundRefresher(max_workers=int(os.environ.get('EP_RECIPE_REFRESH_WORKERS', '2')))
+
+
+def get_cache_stats():
+    """Return size and hit/miss/eviction counters of the in-process recipe cache."""
+    return _recipe_cache.stats()
+
+
+def get_upstream_metrics():
+    """Return all operational counters of the upstream recipe layer."""
+    return {
+        'cache': get_cache_stats(),
+        'http': upstream_client.stats(),
+        'singleflight': _inflight.stats(),
+        'refresh': _refresher.stats(),
+        'quota': _limiter.stats(),
+        'breaker': _breaker.stats(),
+        'negative_cache': _negative_cache.stats(),
+        'corpus': dict(_corpus.stats(), **_corpus_counters()),
+    }
+
+
+def _corpus_counters():
+    with _corpus_lock:
+        return {'local_hits': _corpus_state['local_hits'], 'local_misses': _corpus_state['local_misses']}
+
+
+def schedule_refresh(key, fn):
+    """Run `fn` on the shared background refresher, at most once per pending `key`."""
+    return _refresher.schedule(key, fn)
+
+
+def _cache_ttls():
+    # hard TTL bounds how long an entry may be served at all; past the soft TTL
+    # it is still served but refreshed in the background
+    hard = int(current_app.config.get('RECIPE_CACHE_TTL', 60 * 60 * 24))  # default 24h
+    soft = current_app.config.get('RECIPE_CACHE_SOFT_TTL')
+    try:
+        soft = int(soft) if soft is not None else None
+    except Exception:
+        soft = None
+    return hard, soft
+
+
+def _is_error(res):
+    return isinstance(res, tuple) and len(res) == 2 and isinstance(res[1], int)
+
+
+def _is_upstream_failure(res):
+    # errors that say nothing about the recipe itself: transport errors, 5xx, open circuit
+    return _is_error(res) and res[1] >= 500
+
+
+def _negative_ttl():
+    return int(current_app.config.get('RECIPE_NEGATIVE_CACHE_TTL', 10))
+
+
+def _quota_denied():
+    return {"error": "Spoonacular quota exhausted, try again later", "status": 429}, 429
+
+
+def _circuit_open():
+    return {"error": "Spoonacular temporarily unavailable", "status": 503}, 503
+
+
+def _retry_after(response):
+    """Seconds from a 429's Retry-After header (EP_SPOONACULAR_429_BACKOFF when absent or a date)."""
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return max(0.0, float(headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        return float(os.environ.get('EP_SPOONACULAR_429_BACKOFF', '1'))
+
+
+def _upstream_get(endpoint, url, params, priority=PRIORITY_INTERACTIVE, results=1):
+    """
+    Send one call through the circuit breaker, the quota limiter and the shared client.
+    Returns the response, or an error tuple when the breaker is open or the
+    limiter refuses the call. Transport errors are raised to the caller.
+    """
+    if not _breaker.allow():
+        return _circuit_open()
+    if not _limiter.acquire(endpoint, endpoint_cost(endpoint, results), priority):
+        _breaker.release()
+        return _quota_denied()
+    try:
+        response = upstream_client.get(url, params=params)
+    except Exception:
+        _breaker.record_failure()
+        raise
+    if response.status_code == 429:
+        # rate limited, not down: pause the limiter instead of opening the breaker
+        _breaker.release()
+        _limiter.backoff(_retry_after(response))
+    elif response.status_code >= 500:
+        _breaker.record_failure()
+    else:
+        _breaker.record_success()
+    _limiter.update_from_headers(getattr(response, 'headers', None) or {})
+    if response.status_code == 402:
+        # Spoonacular answers 402 once the daily points are used up
+        _limiter.exhaust()
+    return response
+
+
+def _fallback(cache_key, res, remember=True):
+    """
+    On an upstream failure serve the expired cached value if one is still in its
+    grace period, otherwise remember the failure for a few seconds.
+    """
+    if not _is_upstream_failure(res):
+        return res
+    expired = _recipe_cache.lookup_expired(cache_key)
+    if expired is not None:
+        return expired
+    if remember:
+        _negative_cache.set(cache_key, res, ttl=_negative_ttl())
+    return res
+
+
+def _serve_cached(cache_key, load):
+    """
+    Return the cached value for `cache_key`, or None on a miss.
+    A stale value is returned as well, and `load` is queued on the background
+    refresher (at most one pending refresh per key).
+    """
+    hit = _recipe_cache.lookup(cache_key)
+    if hit is None:
+        return None
+    value, stale = hit
+    if stale:
+        app = current_app._get_current_object()
+
+        def refresh():
+            with app.app_context():
+                return not _is_error(_inflight.do(cache_key, load))
+
+        _refresher.schedule(cache_key, refresh)
+    return value
+
+
+def _load_once(cache_key, load):
+    """Run `load` for a cache miss, sharing one upstream request between concurrent callers."""
+    def fetch():
+        # another caller may have filled the cache while we were queued
+        hit = _recipe_cache.lookup(cache_key)
+        if hit is not None and not hit[1]:
+            return hit[0]
+        failed = _negative_cache.get(cache_key)
+        if failed is not None:
+            return _fallback(cache_key, failed, remember=False)
+        return _fallback(cache_key, load())
+
+    return _inflight.do(cache_key, fetch)
+
+
+def _bounded_number(number):
     # enforce sensible bounds for number to avoid accidental large queries
     try:
         n = int(number)
     except Exception:
         n = 5
-    n = max(1, min(n, int(current_app.config.get('SPOONACULAR_MAX_RESULTS', 50))))
+    return max(1, min(n, int(current_app.config.get('SPOONACULAR_MAX_RESULTS', 50))))
+
+
+def _seed_corpus():
+    if _corpus_state['seeded']:
+        return
+    # concurrent first requests wait for the seed instead of searching an empty corpus
+    with _corpus_lock:
+        if _corpus_state['seeded']:
+            return
+        path = os.environ.get('EP_RECIPE_CORPUS_FILE')
+        if path:
+            try:
+                _corpus.load_file(path)
+            except Exception as e:
+                print('Warning: could not import recipe corpus:', e)
+        _corpus_state['seeded'] = True
+
+
+def search_local_recipes(ingredients, number=5):
+    """
+    Answer a findByIngredients query from the local recipe corpus.
+    Returns findByIngredients-shaped candidates when the corpus has at least
+    `number` recipes using one of the ingredients, otherwise None so the caller
+    can go to Spoonacular.
+    """
+    if not current_app.config.get('RECIPE_LOCAL_CORPUS', True):
+        return None
+    ingredients = canonicalize_ingredients(ingredients)
+    if not ingredients:
+        return None
+    n = _bounded_number(number)
+    _seed_corpus()
+    found = _corpus.find_by_ingredients(ingredients, number=n)
+    hit = len(found) >= n
+    with _corpus_lock:
+        _corpus_state['local_hits' if hit else 'local_misses'] += 1
+    return found if hit else None
+
+
+def get_recipes_by_ingredients(ingredients, number=5):
+
+    # "Tomatoes", "tomato " and "roma tomato" are one query and one cache entry
+    ingredients = sorted(canonicalize_ingredients(ingredients))
+    if not ingredients:
+        return {"error": "No ingredients provided"}, 400
+
+    # In-memory TTL cache to avoid repeated identical requests to Spoonacular
+    cache_ttl, stale_ttl = _cache_ttls()
+    cache_key = f"findByIngredients:{','.join(ingredients)}"
+
+    api_key = current_app.config["SPOONACULAR_API_KEY"]
+    url = f"{current_app.config['SPOONACULAR_URL_BASE']}/recipes/findByIngredients"
+    n = _bounded_number(number)
 
     params = {
         "ingredients": ",".join(ingredients),
@@ -40,61 +299,196 @@ def get_recipes_by_ingredients(ingredients, number=5):
         "apiKey": api_key
     }
 
-    try:
-        response = requests.get(url, params=params, timeout=10)
-    except Exception as e:
-        return {"error": f"Request failed: {e}"}, 502
+    def load():
+        try:
+            response = _upstream_get('findByIngredients', url, params, results=n)
+        except Exception as e:
+            return {"error": f"Request failed: {e}"}, 502
+        if _is_error(response):
+            return response
 
-    if response.status_code == 200:
-        payload = response.json()
-        with _recipe_cache_lock:
-            _recipe_cache[cache_key] = {'ts': now, 'value': payload}
-        return payload
-    else:
-        return {"error": "Failed to fetch recipes"}, response.status_code
+        if response.status_code == 200:
+            payload = response.json()
+            _recipe_cache.set(cache_key, payload, ttl=cache_ttl, stale_ttl=stale_ttl)
+            return payload
+        else:
+            return {"error": "Failed to fetch recipes"}, response.status_code
+
+    cached = _serve_cached(cache_key, load)
+    if cached is not None:
+        return cached
+    return _load_once(cache_key, load)
 
 
-def get_recipe_information(recipe_id, include_nutrition=True):
+def _information_key(recipe_id, include_nutrition):
+    return f"information:{recipe_id}:nutrition={bool(include_nutrition)}"
+
+
+def _cached_with_nutrition(recipe_id):
+    # a fresh payload fetched with nutrition also answers a lookup without it
+    hit = _recipe_cache.lookup(_information_key(recipe_id, True))
+    if hit is not None and not hit[1]:
+        return hit[0]
+    return None
+
+
+def information_stamp(recipe_id, include_nutrition, payload):
+    """
+    Cache stamp of a payload returned by get_recipe_information, or None if it is
+    not (or no longer) the cached one. The stamp changes whenever the payload is
+    refetched, so responses derived from it can be cached under it.
+    """
+    stamp = _recipe_cache.stamp(_information_key(recipe_id, include_nutrition), payload)
+    if stamp is None and not include_nutrition:
+        stamp = _recipe_cache.stamp(_information_key(recipe_id, True), payload)
+    return stamp
+
+
+def _information_loader(recipe_id, include_nutrition, priority=PRIORITY_INTERACTIVE):
+    # returns a zero-arg callable that fetches one recipe and caches it
+    cache_ttl, stale_ttl = _cache_ttls()
+    cache_key = _information_key(recipe_id, include_nutrition)
+    api_key = current_app.config["SPOONACULAR_API_KEY"]
+    base = current_app.config.get('SPOONACULAR_URL_BASE')
+    url = f"{base}/recipes/{recipe_id}/information"
+    params = {
+        "includeNutrition": 'true' if include_nutrition else 'false',
+        "apiKey": api_key
+    }
+
+    def load():
+        try:
+            response = _upstream_get('information', url, params, priority)
+        except Exception as e:
+            return {"error": f"Request failed: {e}"}, 502
+        if _is_error(response):
+            return response
+
+        if response.status_code == 200:
+            payload = response.json()
+            _recipe_cache.set(cache_key, payload, ttl=cache_ttl, stale_ttl=stale_ttl)
+            _corpus.add_recipe(payload)
+            return payload
+        else:
+            # propagate status
+            return {"error": "Failed to fetch recipe information", "status": response.status_code}, response.status_code
+
+    return load
+
+
+def get_recipe_information(recipe_id, include_nutrition=True, priority=PRIORITY_INTERACTIVE):
     """
     Fetch full recipe information by id from Spoonacular.
     Returns JSON on success or tuple (dict, status_code) on error.
+    `priority` is PRIORITY_INTERACTIVE for user-facing lookups or PRIORITY_PREFETCH
+    for speculative ones, which are refused first when the quota runs low.
+    Lookups without nutrition are served from a cached payload with nutrition
+    when there is one.
     """
     if not recipe_id:
         return {"error": "No recipe id provided"}, 400
 
     # In-memory TTL cache for recipe information
-    cache_ttl = int(current_app.config.get('RECIPE_CACHE_TTL', 60 * 60 * 24))  # default 24h
-    cache_key = f"information:{recipe_id}:nutrition={bool(include_nutrition)}"
+    if not include_nutrition:
+        full = _cached_with_nutrition(recipe_id)
+        if full is not None:
+            return full
+    cache_key = _information_key(recipe_id, include_nutrition)
+    load = _information_loader(recipe_id, include_nutrition, priority)
 
-    global _recipe_cache, _recipe_cache_lock
-    if '_recipe_cache' not in globals():
-        _recipe_cache = {}
-        _recipe_cache_lock = threading.Lock()
+    cached = _serve_cached(cache_key, load)
+    if cached is not None:
+        return cached
+    return _load_once(cache_key, load)
 
-    now = int(time.time())
-    with _recipe_cache_lock:
-        entry = _recipe_cache.get(cache_key)
-        if entry and now - entry['ts'] < cache_ttl:
-            return entry['value']
+
+def get_recipes_information_bulk(recipe_ids, include_nutrition=True, priority=PRIORITY_PREFETCH):
+    """
+    Fetch full information for several recipes at once.
+    Ids already in the cache are served from it; the remaining ones are requested
+    with a single informationBulk call (chunked by SPOONACULAR_BULK_MAX_IDS) and
+    each returned recipe is cached under the same key get_recipe_information uses.
+    Returns a dict {recipe_id: payload or (dict, status_code)} with one entry per
+    requested id. Bulk lookups default to PRIORITY_PREFETCH.
+    """
+    ids = []
+    for rid in (recipe_ids or []):
+        if rid and rid not in ids:
+            ids.append(rid)
+    if not ids:
+        return {}
+
+    cache_ttl, stale_ttl = _cache_ttls()
+
+    def key_for(rid):
+        return _information_key(rid, include_nutrition)
+
+    results = {}
+    missing = []
+    for rid in ids:
+        if not include_nutrition:
+            full = _cached_with_nutrition(rid)
+            if full is not None:
+                results[rid] = full
+                continue
+        # stale entries are served and refreshed one by one in the background
+        cached = _serve_cached(key_for(rid), _information_loader(rid, include_nutrition, priority))
+        if cached is not None:
+            results[rid] = cached
+            continue
+        failed = _negative_cache.get(key_for(rid))
+        if failed is not None:
+            results[rid] = _fallback(key_for(rid), failed, remember=False)
+        else:
+            missing.append(rid)
+    if not missing:
+        return results
 
     api_key = current_app.config["SPOONACULAR_API_KEY"]
     base = current_app.config.get('SPOONACULAR_URL_BASE')
-    url = f"{base}/recipes/{recipe_id}/information"
-    params = {
-        "includeNutrition": 'true' if include_nutrition else 'false',
-        "apiKey": api_key
-    }
+    url = f"{base}/recipes/informationBulk"
+    chunk_size = max(1, int(current_app.config.get('SPOONACULAR_BULK_MAX_IDS', 50)))
 
-    try:
-        response = requests.get(url, params=params, timeout=10)
-    except Exception as e:
-        return {"error": f"Request failed: {e}"}, 502
+    for start in range(0, len(missing), chunk_size):
+        chunk = missing[start:start + chunk_size]
+        params = {
+            "ids": ",".join(str(rid) for rid in chunk),
+            "includeNutrition": 'true' if include_nutrition else 'false',
+            "apiKey": api_key
+        }
 
-    if response.status_code == 200:
-        payload = response.json()
-        with _recipe_cache_lock:
-            _recipe_cache[cache_key] = {'ts': now, 'value': payload}
-        return payload
-    else:
-        # propagate status
-        return {"error": "Failed to fetch recipe information", "status": response.status_code}, response.status_code
\ No newline at end of file
+        def fetch(chunk=chunk, params=params):
+            try:
+                response = _upstream_get('informationBulk', url, params, priority, results=len(chunk))
+            except Exception as e:
+                return {"error": f"Request failed: {e}"}, 502
+            if _is_error(response):
+                return response
+            if response.status_code != 200:
+                return {"error": "Failed to fetch recipe information", "status": response.status_code}, response.status_code
+            payload = response.json()
+            by_id = {}
+            for item in (payload if isinstance(payload, list) else []):
+                if isinstance(item, dict) and item.get('id') is not None:
+                    by_id[str(item['id'])] = item
+            found = {}
+            for rid in chunk:
+                item = by_id.get(str(rid))
+                if item is not None:
+                    _recipe_cache.set(key_for(rid), item, ttl=cache_ttl, stale_ttl=stale_ttl)
+                    _corpus.add_recipe(item)
+                    found[rid] = item
+            return found
+
+        res = _inflight.do(f"informationBulk:{params['ids']}:nutrition={bool(include_nutrition)}", fetch)
+        if isinstance(res, tuple):
+            for rid in chunk:
+                results[rid] = _fallback(key_for(rid), res)
+            continue
+        for rid in chunk:
+            if rid in res:
+                results[rid] = res[rid]
+            else:
+                results[rid] = {"error": "Recipe not found", "status": 404}, 404
+
+    return results
@@ -0,0 +1,120 @@
+"""
+Index declarations for the users, items and recipes collections.
+
+`INDEXES` lists the indexes every model query relies on; `ensure_indexes()`
+runs at startup and reconciles each collection with it: missing indexes are
+created, an index whose options changed (e.g. it became unique) is dropped
+and rebuilt, and with `drop_unknown=True` undeclared indexes are removed.
+A failure on one index (duplicate emails blocking the unique index, an
+unreachable server...) is reported and never stops the startup.
+
+`explain_plan()` / `index_backed()` read a query plan (MongoDB's `explain`
+output, or the memory engine's equivalent) so tests can fail when a model
+query would scan the whole collection.
+"""
+INDEXES = {
+    'users': [
+        {'key': [('email', 1)], 'name': 'email_1', 'unique': True},
+    ],
+    'items': [
+        # list_items by user, soonest expiration first
+        {'key': [('user_email', 1), ('expiration_date', 1)], 'name': 'user_email_1_expiration_date_1'},
+        # one user's item by name (update_item_status)
+        {'key': [('user_email', 1), ('name', 1)], 'name': 'user_email_1_name_1'},
+        # expiry scanner: items of a status by expiration range, across users
+        {'key': [('status', 1), ('expiration_date', 1)], 'name': 'status_1_expiration_date_1'},
+    ],
+    'recipes': [
+        {'key': [('user_email', 1)], 'name': 'user_email_1'},
+    ],
+}
+
+
+def _key(key):
+    # the server may report directions as floats
+    return [(field, int(d) if isinstance(d, (int, float)) else d) for field, d in key]
+
+
+def _same_index(info, spec):
+    return _key(info.get('key', [])) == _key(spec['key']) and bool(info.get('unique')) == bool(spec.get('unique'))
+
+
+def ensure_indexes(database, specs=None, drop_unknown=False):
+    """
+    Create / rebuild the declared indexes of every collection in `specs`
+    (default INDEXES). Returns {collection: {'created', 'rebuilt', 'dropped',
+    'kept', 'failed'}} with index names (failed: (name, error) pairs).
+    """
+    specs = INDEXES if specs is None else specs
+    report = {}
+    for collection_name, indexes in specs.items():
+        result = report[collection_name] = {'created': [], 'rebuilt': [], 'dropped': [], 'kept': [], 'failed': []}
+        collection = database[collection_name]
+        try:
+            existing = collection.index_information()
+        except Exception as e:
+            result['failed'].append((None, str(e)))
+            continue
+        declared, replaced = set(), set()
+        for spec in indexes:
+            name = spec['name']
+            declared.add(name)
+            # an index with the same keys under another name counts as the same index
+            current = existing.get(name) or next(
+                (info for info in existing.values() if _key(info.get('key', [])) == _key(spec['key'])), None)
+            try:
+                if current is not None and _same_index(current, spec):
+                    result['kept'].append(name)
+                    continue
+                if current is not None:
+                    old_name = name if name in existing else next(n for n, i in existing.items() if i is current)
+                    collection.drop_index(old_name)
+                    replaced.add(old_name)
+                collection.create_index(spec['key'], name=name, unique=bool(spec.get('unique')))
+                result['rebuilt' if current is not None else 'created'].append(name)
+            except Exception as e:
+                result['failed'].append((name, str(e)))
+        if drop_unknown:
+            for name in existing:
+                if name != '_id_' and name not in declared and name not in replaced:
+                    try:
+                        collection.drop_index(name)
+                        result['dropped'].append(name)
+                    except Exception as e:
+                        result['failed'].append((name, str(e)))
+    return report
+
+
+def bootstrap_indexes(database, drop_unknown=False):
+    """Startup step: ensure_indexes() with a one-line summary per collection that changed or failed."""
+    report = ensure_indexes(database, drop_unknown=drop_unknown)
+    for collection_name, result in report.items():
+        changes = {k: v for k, v in result.items() if v and k != 'kept'}
+        if changes:
+            print(f'Indexes on {collection_name}: {changes}')
+    return report
+
+
+def explain_plan(collection, query, sort=None):
+    """The winning plan of `find(query)` (optionally sorted) on `collection`."""
+    cursor = collection.find(query or {}, sort=sort) if sort else collection.find(query or {})
+    explained = cursor.explain()
+    planner = explained.get('queryPlanner', explained)
+    return planner.get('winningPlan', planner)
+
+
+def _stages(plan):
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _stages(value)
+
+
+def index_backed(plan):
+    """True if `plan` reads through an index and never scans the collection."""
+    stages = [s['stage'] for s in _stages(plan)]
+    return 'COLLSCAN' not in stages and any(s in ('IXSCAN', 'IDHACK', 'EXPRESS_IXSCAN') for s in stages)
@@ -1,5 +1,14 @@
-from datetime import datetime
+import re
+from datetime import date, datetime
+from pymongo.errors import BulkWriteError
 from db import mongo_db
+from src.models.pagination import find_page, iter_documents
+
+# Bulk ingest limits: rows per request and documents per insert_many round trip
+MAX_BULK_ITEMS = 10000
+BULK_CHUNK_SIZE = 500
+# YYYY-MM-DD, optionally followed by an ISO time: stored strings must sort by date
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}(T.+)?")
 
 # Safe collection lookup (DB may be disabled during development)
 try:
@@ -22,6 +31,85 @@ def create_item(user_email, name, category, expiration_date):
     items_collection.insert_one(item)
     return {"message": "Item agregado exitosamente."}
 
+def _validate_item(row):
+    """Devuelve el mensaje de error de una fila, o None si es válida."""
+    if not isinstance(row, dict):
+        return "Cada item debe ser un objeto."
+    name = row.get("name")
+    if not isinstance(name, str) or not name.strip():
+        return "Falta name."
+    if len(name.strip()) > 200:
+        return "name demasiado largo (máx. 200 caracteres)."
+    category = row.get("category")
+    if category is not None and not isinstance(category, str):
+        return "category debe ser texto."
+    expiration = row.get("expiration_date")
+    if not isinstance(expiration, str):
+        return "Falta expiration_date (YYYY-MM-DD)."
+    try:
+        if not _ISO_DATE.fullmatch(expiration):
+            raise ValueError(expiration)
+        if len(expiration) == 10:
+            date.fromisoformat(expiration)
+        else:
+            datetime.fromisoformat(expiration)
+    except ValueError:
+        return "expiration_date no es una fecha válida (YYYY-MM-DD)."
+    return None
+
+def create_items(user_email, rows, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Inserta varios items de un usuario. Valida todas las filas antes de escribir,
+    inserta las válidas en bloques con insert_many sin orden (un duplicado o un
+    fallo no detiene el resto) y devuelve
+    {"inserted": n, "failed": n, "errors": [{"index": fila, "error": mensaje}]}.
+    """
+    if items_collection is None:
+        return {"error": "DB no disponible: no se pueden crear items en entorno de desarrollo."}
+    if not isinstance(user_email, str) or "@" not in user_email:
+        return {"error": "Falta user_email."}
+    if not isinstance(rows, list) or not rows:
+        return {"error": "items debe ser una lista no vacía."}
+    if len(rows) > MAX_BULK_ITEMS:
+        return {"error": f"Máximo {MAX_BULK_ITEMS} items por petición."}
+
+    errors = []
+    docs, positions = [], []
+    created_at = datetime.utcnow()
+    email = user_email.lower()
+    for index, row in enumerate(rows):
+        problem = _validate_item(row)
+        if problem:
+            errors.append({"index": index, "error": problem})
+            continue
+        docs.append({
+            "user_email": email,
+            "name": row["name"].strip(),
+            "category": row.get("category"),
+            "expiration_date": row["expiration_date"],
+            "created_at": created_at,
+            "status": "active"
+        })
+        positions.append(index)
+
+    inserted = 0
+    for start in range(0, len(docs), max(1, chunk_size)):
+        chunk = docs[start:start + chunk_size]
+        try:
+            items_collection.insert_many(chunk, ordered=False)
+            inserted += len(chunk)
+        except BulkWriteError as e:
+            details = e.details or {}
+            inserted += details.get("nInserted", 0)
+            for err in details.get("writeErrors", []):
+                errors.append({"index": positions[start + err["index"]], "error": err.get("errmsg", "write error")})
+        except Exception as e:
+            # the whole chunk failed (connection, disabled DB...): report each of its rows
+            errors.extend({"index": positions[start + i], "error": str(e)} for i in range(len(chunk)))
+
+    errors.sort(key=lambda err: err["index"])
+    return {"inserted": inserted, "failed": len(errors), "errors": errors}
+
 def list_items(user_email=None):
     query = {"user_email": user_email.lower()} if user_email else {}
     if items_collection is None:
@@ -29,11 +117,25 @@ def list_items(user_email=None):
     items = list(items_collection.find(query, {"_id": 0}))
     return items
 
-def update_item_status(item_name, new_status):
+def page_items(user_email=None, limit=None, after=None, fields=None):
+    """Página de items (del usuario si se indica) ordenada por _id: {'items': [...], 'next_after': id o None}."""
+    query = {"user_email": user_email.lower()} if user_email else {}
+    return find_page(items_collection, query, limit, after, fields)
+
+def iter_items(user_email=None, fields=None):
+    """Itera los items (del usuario si se indica) a medida que los entrega el cursor."""
+    query = {"user_email": user_email.lower()} if user_email else {}
+    return iter_documents(items_collection, query, fields)
+
+def update_item_status(item_name, new_status, user_email):
     if items_collection is None:
         return {"error": "DB no disponible: no se puede actualizar item en entorno de desarrollo."}
+    # always scoped to the owner: the lookup uses the (user_email, name) index
+    if not user_email:
+        return {"error": "Falta user_email."}
+    query = {"user_email": user_email.lower(), "name": item_name}
     try:
-        result = items_collection.update_one({"name": item_name}, {"$set": {"status": new_status}})
+        result = items_collection.update_one(query, {"$set": {"status": new_status}})
     except Exception as e:
         return {"error": "DB error during update", "detail": str(e)}
 
@@ -0,0 +1,82 @@
+"""
+Keyset pagination and projections shared by the list_* model functions.
+
+Pages are ordered by `_id` and the cursor (`after`) is the hex `_id` of the
+last document sent: the next page is `{_id: {$gt: after}}`, which an index
+seek answers directly no matter how deep the page is (unlike skip/limit).
+`fields` ("name,email") becomes a server-side projection, so unrequested
+fields never leave the database; `hidden` fields are never returned.
+"""
+from bson import ObjectId
+from bson.errors import InvalidId
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# documents fetched per round trip while streaming
+STREAM_BATCH_SIZE = 200
+
+
+def parse_after(after):
+    """ObjectId of an `after` cursor (None for the first page); ValueError if malformed."""
+    if after in (None, ''):
+        return None
+    try:
+        return ObjectId(after)
+    except (InvalidId, TypeError):
+        raise ValueError('after must be the id returned as next_after')
+
+
+def parse_limit(limit):
+    """Page size clamped to [1, MAX_PAGE_SIZE]; ValueError if not an integer."""
+    if limit in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        return max(1, min(int(limit), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+
+
+def projection_for(fields, hidden=()):
+    """Mongo projection for `fields` (comma-separated string or list); `_id` is always fetched for the cursor."""
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(',')]
+    wanted = [f for f in fields or [] if f and f != '_id' and f not in hidden]
+    if wanted:
+        return dict.fromkeys(wanted, 1)
+    if fields and any(f.strip() for f in fields):
+        # only hidden or unknown names were asked for
+        return {'_id': 1}
+    return dict.fromkeys(hidden, 0) or None
+
+
+def _public(doc):
+    doc.pop('_id', None)
+    return doc
+
+
+def find_page(collection, query=None, limit=None, after=None, fields=None, hidden=()):
+    """
+    One page of `collection`: {'items': [...], 'next_after': str or None}.
+    `next_after` is None on the last page.
+    """
+    limit = parse_limit(limit)
+    after_id = parse_after(after)
+    if collection is None:
+        return {'items': [], 'next_after': None}
+    query = dict(query or {})
+    if after_id is not None:
+        query['_id'] = {'$gt': after_id}
+    # one extra document tells whether another page exists
+    docs = list(collection.find(query, projection_for(fields, hidden), sort=[('_id', 1)], limit=limit + 1))
+    next_after = str(docs[limit - 1]['_id']) if len(docs) > limit else None
+    return {'items': [_public(d) for d in docs[:limit]], 'next_after': next_after}
+
+
+def iter_documents(collection, query=None, fields=None, hidden=()):
+    """Yield every matching document (without `_id`) as the cursor fetches them, in `_id` order."""
+    if collection is None:
+        return
+    cursor = collection.find(query or {}, projection_for(fields, hidden), sort=[('_id', 1)],
+                             batch_size=STREAM_BATCH_SIZE)
+    for doc in cursor:
+        yield _public(doc)
@@ -1,5 +1,6 @@
 from datetime import datetime
-from db import mongo_db  
+from db import mongo_db
+from src.models.pagination import find_page, iter_documents
 
 # Safe collection lookup (DB may be disabled during development)
 try:
@@ -25,3 +26,11 @@ def list_recipes():
     if recipes_collection is None:
         return []
     return list(recipes_collection.find({}, {"_id": 0}))
+
+def page_recipes(limit=None, after=None, fields=None):
+    """Página de recetas ordenada por _id: {'items': [...], 'next_after': id o None}."""
+    return find_page(recipes_collection, {}, limit, after, fields)
+
+def iter_recipes(fields=None):
+    """Itera todas las recetas a medida que las entrega el cursor."""
+    return iter_documents(recipes_collection, {}, fields)
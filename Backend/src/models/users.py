@@ -1,6 +1,7 @@
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 from db import mongo_db
+from src.models.pagination import find_page, iter_documents
 
 # Colección principal (safe lookup: mongo_db may be None while DB is disabled)
 try:
@@ -70,3 +71,13 @@ def list_users():
         return []
     users = list(users_collection.find({}, {"_id": 0, "password_hash": 0}))
     return users
+
+
+def page_users(limit=None, after=None, fields=None):
+    """Página de usuarios ordenada por _id: {'items': [...], 'next_after': id o None}. Nunca incluye el hash."""
+    return find_page(users_collection, {}, limit, after, fields, hidden=("password_hash",))
+
+
+def iter_users(fields=None):
+    """Itera todos los usuarios a medida que los entrega el cursor (sin hash de contraseña)."""
+    return iter_documents(users_collection, {}, fields, hidden=("password_hash",))
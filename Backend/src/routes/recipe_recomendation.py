@@ -1,24 +1,585 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, stream_with_context
 import os
 import json
+import base64
 import hashlib
+import threading
 import time
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 
-from ..controllers.recipe_controller import get_recipes_by_ingredients, get_recipe_information
+from ..controllers.recipe_controller import (
+    get_recipes_by_ingredients,
+    get_recipe_information,
+    get_recipes_information_bulk,
+    get_upstream_metrics,
+    information_stamp,
+    schedule_refresh,
+    search_local_recipes,
+)
+from ..services.encoded_response import MIN_COMPRESS_SIZE, EncodedBody, EncodedBodyCache, available_encodings
+from ..services import json_codec
+from ..services.ingredients import canonical_ingredient, canonicalize_ingredients
+from ..services.projection import fields_key, parse_fields, project, wants
+from ..services.ranking import Ranker, parse_weights
+from ..services.rate_limiter import PRIORITY_PREFETCH
+from ..services.recipe_records import RecipeRecord, search_ingredients
+from ..services.result_store import ResultStore
 
 recipe_recommendation_bp = Blueprint('recipe_recommendation', __name__, url_prefix='/recipes')
 
+# counters for the on-disk suggest cache (exposed on /recipes/metrics)
+_suggest_cache_stats = {'hits': 0, 'stale_serves': 0, 'streams': 0}
+
+# One result store per cache directory, opened on first use and shared by all
+# requests of this process (False marks a directory that could not be opened).
+_result_stores = {}
+_result_stores_lock = threading.Lock()
+
+# Rankers by RECIPE_RANKING_WEIGHTS value, so the weights are parsed once.
+_rankers = {}
+
+# Encoded suggest and information bodies of this process, with their ETags and
+# compressed variants, so repeated hits are sent without re-encoding.
+_encoded_bodies = EncodedBodyCache(
+    max_entries=int(os.environ.get('EP_ENCODED_CACHE_MAX_ENTRIES', '2000')),
+    max_bytes=int(os.environ.get('EP_ENCODED_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+)
+
+
+def _fetch_information_safe(app, recipe_id, include_nutrition=True):
+    # Runs inside a worker thread: the controller reads current_app.config so we
+    # need to push an app context, and any exception is turned into the same
+    # (payload, status) error shape the controller uses so the caller can fall
+    # back to a lightweight object.
+    with app.app_context():
+        try:
+            return get_recipe_information(recipe_id, include_nutrition=include_nutrition, priority=PRIORITY_PREFETCH)
+        except Exception as e:
+            return {"error": f"Request failed: {e}"}, 502
+
+
+def prefetch_recipe_information(recipe_ids, max_workers=None, include_nutrition=True):
+    """
+    Fetch full information for `recipe_ids` concurrently.
+    Returns a list of controller results in the same order as `recipe_ids`.
+    At most `max_workers` upstream calls run at the same time
+    (default: RECIPE_PREFETCH_CONCURRENCY from app config).
+    """
+    ids = list(recipe_ids or [])
+    if not ids:
+        return []
+    app = current_app._get_current_object()
+    if max_workers is None:
+        max_workers = app.config.get('RECIPE_PREFETCH_CONCURRENCY', 5)
+    try:
+        workers = max(1, min(int(max_workers), len(ids)))
+    except Exception:
+        workers = 1
+
+    if workers == 1:
+        return [_fetch_information_safe(app, rid, include_nutrition) for rid in ids]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='recipe-prefetch') as pool:
+        # map() yields results in submission order, which keeps the ranking intact
+        return list(pool.map(lambda rid: _fetch_information_safe(app, rid, include_nutrition), ids))
+
+
+def _is_error_result(res):
+    return isinstance(res, tuple) and len(res) == 2 and isinstance(res[1], int)
+
+
+def fetch_prefetch_details(recipe_ids, include_nutrition=True):
+    """
+    Fetch full information for the prefetched candidates of /recipes/suggest.
+    Uses one informationBulk call (cache hits are served locally) and falls back to
+    concurrent per-id lookups only for ids the bulk call could not serve because of
+    a transport/5xx failure. Returns results in the same order as `recipe_ids`.
+    """
+    ids = list(recipe_ids or [])
+    if not ids:
+        return []
+    results, retry = _bulk_prefetch(ids, include_nutrition)
+    for rid, res in zip(retry, prefetch_recipe_information(retry, include_nutrition=include_nutrition)):
+        results[rid] = res
+    return [results[rid] for rid in ids]
+
+
+def _bulk_prefetch(ids, include_nutrition=True):
+    # one informationBulk call; returns its results and the ids left to retry one by one
+    results = {}
+    if current_app.config.get('RECIPE_PREFETCH_BULK', True):
+        try:
+            results = get_recipes_information_bulk(ids, include_nutrition=include_nutrition,
+                                                   priority=PRIORITY_PREFETCH) or {}
+        except Exception:
+            results = {}
+
+    retry = [rid for rid in ids if rid not in results or (_is_error_result(results[rid]) and results[rid][1] >= 500)]
+    return results, retry
+
+
+def iter_prefetch_details(recipe_ids, include_nutrition=True):
+    """
+    Like fetch_prefetch_details, but yields `(recipe_id, result)` pairs as the
+    results arrive instead of waiting for all of them.
+    """
+    ids = list(dict.fromkeys(recipe_ids or []))
+    if not ids:
+        return
+    results, retry = _bulk_prefetch(ids, include_nutrition)
+    pending = set(retry)
+    for rid in ids:
+        if rid not in pending:
+            yield rid, results[rid]
+    if not retry:
+        return
+    app = current_app._get_current_object()
+    try:
+        workers = max(1, min(int(app.config.get('RECIPE_PREFETCH_CONCURRENCY', 5)), len(retry)))
+    except Exception:
+        workers = 1
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='recipe-prefetch') as pool:
+        futures = {pool.submit(_fetch_information_safe, app, rid, include_nutrition): rid for rid in retry}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def _get_ranker():
+    spec = current_app.config.get('RECIPE_RANKING_WEIGHTS') or ''
+    ranker = _rankers.get(spec)
+    if ranker is None:
+        try:
+            ranker = Ranker(parse_weights(spec) or None)
+        except ValueError as e:
+            print('Warning: invalid RECIPE_RANKING_WEIGHTS, using the defaults:', e)
+            ranker = Ranker()
+        _rankers[spec] = ranker
+    return ranker
+
+
+def _parse_expiring(value):
+    # {ingredient name: days until it expires} -> {canonical name: days}
+    if not isinstance(value, dict):
+        return None
+    expiring = {}
+    for name, days in value.items():
+        canon = canonical_ingredient(name)
+        try:
+            days = float(days)
+        except (TypeError, ValueError):
+            continue
+        if canon and (canon not in expiring or days < expiring[canon]):
+            expiring[canon] = days
+    return expiring or None
+
+
+def _search_ingredient_dicts(c):
+    # used then missed ingredients of the search result, flagged available / not
+    return [ing.to_dict(available) for ing, available in search_ingredients(c)]
+
+
+def _merge_candidate(c, info, fridge):
+    """
+    Enriched object for a prefetched candidate: `info` is its controller result
+    (payload dict or (payload, status) error tuple), `fridge` the canonical
+    fridge items used for the availability flags.
+    """
+    # controller may return (payload, status)
+    if isinstance(info, tuple) and len(info) == 2 and isinstance(info[1], int):
+        payload, status = info
+        # Build a lightweight ingredients list from the search result so the frontend
+        # can still compute totals and availability even if detailed info failed.
+        return {
+            'id': c.get('id'),
+            'name': c.get('title') or c.get('name'),
+            'image': c.get('image'),
+            'usedIngredientCount': c.get('usedIngredientCount', 0),
+            'missedIngredientCount': c.get('missedIngredientCount', 0),
+            'ingredients': _search_ingredient_dicts(c),
+            # defaults for missing fields so frontend can compute and display non-empty cards
+            'readyInMinutes': 30,
+            'servings': 1,
+            'summary': 'No detailed description available. This recipe was returned from a search result.',
+            'steps': [{'number': 1, 'step': 'Follow the source recipe steps.'}],
+            'nutrition': None,
+            'error': payload
+        }
+
+    # Normalize info to a dict for safe attribute access. The controller
+    # may return either a payload dict or a (payload, status) tuple.
+    if isinstance(info, tuple):
+        # Extract payload if present and is a dict
+        payload = info[0] if len(info) > 0 else None
+        data_info = payload if isinstance(payload, dict) else {}
+    elif isinstance(info, dict):
+        data_info = info
+    else:
+        data_info = {}
+    record = RecipeRecord.from_information(data_info)
+
+    # safe defaults if upstream returned incomplete info
+    return {
+        'id': record.id or c.get('id'),
+        'name': record.title or c.get('title') or c.get('name'),
+        'image': record.image or c.get('image'),
+        'readyInMinutes': record.ready_in_minutes or 30,
+        'servings': record.servings or 1,
+        'summary': record.summary or 'No detailed description available.',
+        'dishTypes': record.dish_types or [],
+        'usedIngredientCount': c.get('usedIngredientCount', 0),
+        'missedIngredientCount': c.get('missedIngredientCount', 0),
+        # availability flags from extendedIngredients
+        'ingredients': [ing.to_dict(ing.canonical in fridge) for ing in record.ingredients],
+        'steps': record.steps or [{'number': 1, 'step': 'Follow the source recipe steps.'}],
+        'nutrition': record.nutrition or None,
+        'sourceUrl': record.source_url
+    }
+
+
+def _lightweight_candidate(c):
+    """Lightweight object derived from the search result alone (no details fetched)."""
+    # Spoonacular's findByIngredients typically returns 'usedIngredients' and 'missedIngredients' arrays.
+    return {
+        'id': c.get('id'),
+        'name': c.get('title') or c.get('name'),
+        'image': c.get('image'),
+        # set sane defaults so UI shows something useful when details are not available
+        'readyInMinutes': 30,
+        'servings': 1,
+        'summary': 'No detailed description available. This recipe was returned from a search result.',
+        'dishTypes': [],
+        'usedIngredientCount': c.get('usedIngredientCount', 0),
+        'missedIngredientCount': c.get('missedIngredientCount', 0),
+        'ingredients': _search_ingredient_dicts(c),
+        'steps': [{'number': 1, 'step': 'Follow the source recipe steps.'}],
+        'nutrition': None,
+        'sourceUrl': None,
+        'lightweight': True
+    }
+
+
+def search_candidates(ingredients, req_number=None, expiring=None):
+    """
+    First stage of the suggest pipeline: search and rank. Returns the ranked
+    findByIngredients-shaped candidates, or the controller's (payload, status)
+    tuple when the search fails. `expiring` ({canonical name: days left}) feeds
+    the `expiring` ranking feature.
+    """
+    # first-level search (this returns lightweight candidate objects): the local
+    # recipe corpus answers when it knows enough matching recipes, Spoonacular otherwise.
+    # Ensure we pass an int for `number` (controller expects int)
+    number = req_number if req_number is not None else 5
+    res = search_local_recipes(ingredients, number=number)
+    if res is None:
+        res = get_recipes_by_ingredients(ingredients, number=number)
+    # controller may return (payload, status) on error
+    if isinstance(res, tuple) and len(res) == 2 and isinstance(res[1], int):
+        return res
+
+    candidates = res or []
+
+    # rank by the weighted features of RECIPE_RANKING_WEIGHTS (default: usedIngredientCount
+    # desc, then by usedIngredientCount/total ratio)
+    return _get_ranker().rank(candidates, {'expiring': expiring})
+
+
+def build_suggestions(ingredients, req_number=None, prefetch_n=5, expiring=None, fields=None):
+    """
+    Run the suggest pipeline (search, rank, prefetch details, merge) for one
+    ingredient list. Returns the list of enriched recipe objects, or the
+    controller's (payload, status) tuple when the search itself fails.
+    `fields` is a parse_fields() projection applied to every object.
+    Needs an app context but no request context, so it can also run from the
+    background refresher.
+    """
+    candidates_sorted = search_candidates(ingredients, req_number, expiring)
+    if _is_error_result(candidates_sorted):
+        return candidates_sorted
+    return enrich_candidates(ingredients, candidates_sorted, prefetch_n, fields)
+
+
+def enrich_candidates(ingredients, candidates_sorted, prefetch_n=5, fields=None):
+    """
+    Merge stage of the suggest pipeline: full details for the first `prefetch_n`
+    ranked candidates, lightweight objects for the rest, projected on `fields`.
+    Details are fetched without nutrition when the projection drops it.
+    """
+    enriched = []
+    # We'll prefetch full information only for the first `prefetch_n` candidates.
+    # For the remaining candidates we return lightweight objects derived from the
+    # initial search (so the frontend can show image/title/ingredient counts and
+    # compute availability from used/missed ingredient names without extra API calls).
+    fridge = set(canonicalize_ingredients(ingredients))
+    # Fetch details for the top N candidates up front (one bulk call, concurrent
+    # per-id fallback) so one slow upstream call doesn't serialize the request.
+    prefetch_ids = [c.get('id') for idx, c in enumerate(candidates_sorted) if idx < prefetch_n and c.get('id')]
+    prefetched = dict(zip(prefetch_ids, fetch_prefetch_details(prefetch_ids, wants(fields, 'nutrition'))))
+    for idx, c in enumerate(candidates_sorted):
+        rid = c.get('id')
+        if not rid:
+            continue
+
+        if idx < prefetch_n:
+            enriched.append(project(_merge_candidate(c, prefetched.get(rid), fridge), fields))
+        else:
+            enriched.append(project(_lightweight_candidate(c), fields))
+
+    return enriched
+
+
+def _get_result_store():
+    """Return the ResultStore for EP_RECIPE_CACHE_DIR, or None if it cannot be opened."""
+    cache_dir = os.environ.get('EP_RECIPE_CACHE_DIR') or os.path.join(os.getcwd(), 'cache')
+    path = os.path.join(cache_dir, 'suggest_results.sqlite3')
+    store = _result_stores.get(path)
+    if store is None:
+        with _result_stores_lock:
+            store = _result_stores.get(path)
+            if store is None:
+                try:
+                    store = ResultStore(path, max_bytes=int(os.environ.get('EP_RECIPE_CACHE_MAX_BYTES',
+                                                                           str(256 * 1024 * 1024))))
+                except Exception:
+                    # unusable directory: run uncached instead of failing the request
+                    store = False
+                _result_stores[path] = store
+    return store if store is not False else None
+
+
+def _encode_suggestions(enriched):
+    # encoded once: the same bytes are stored and sent, and later hits are sent as-is
+    return json_codec.dumps(enriched)
+
+
+def _is_cacheable(enriched):
+    # only keep results with at least one item carrying an 'ingredients' list
+    return isinstance(enriched, list) and any(isinstance(it, dict) and isinstance(it.get('ingredients'), list) for it in enriched)
+
+
+def _encoded_response(encoded):
+    """
+    Send an EncodedBody: 304 when If-None-Match carries its ETag, otherwise the
+    best compressed variant the client accepts (bodies over MIN_COMPRESS_SIZE).
+    """
+    if request.if_none_match and request.if_none_match.contains_weak(encoded.etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(encoded.etag)
+        return response
+    encoding = None
+    if len(encoded.body) >= MIN_COMPRESS_SIZE:
+        encoding = request.accept_encodings.best_match(available_encodings())
+    response = current_app.response_class(encoded.variant(encoding), mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.set_etag(encoded.etag)
+    return response
+
+
+# opt-in streaming formats of /recipes/suggest
+_STREAM_MIMETYPES = {'ndjson': 'application/x-ndjson', 'sse': 'text/event-stream'}
+
+
+def _stream_format(data):
+    # `stream` in the body wins; otherwise an Accept header preferring a streaming type
+    fmt = data.get('stream') if isinstance(data, dict) else None
+    if isinstance(fmt, str) and fmt.lower() in _STREAM_MIMETYPES:
+        return fmt.lower()
+    best = request.accept_mimetypes.best_match(['application/json'] + list(_STREAM_MIMETYPES.values()))
+    for name, mimetype in _STREAM_MIMETYPES.items():
+        if best == mimetype:
+            return name
+    return None
+
+
+def _stream_event(fmt, event, data=None, raw=None):
+    # `raw` is data already encoded as JSON bytes (a stored result)
+    data = raw if raw is not None else json_codec.dumps(data)
+    if fmt == 'sse':
+        return b'event: ' + event.encode('ascii') + b'\ndata: ' + data + b'\n\n'
+    return b'{"event":"' + event.encode('ascii') + b'","data":' + data + b'}\n'
+
+
+def _stream_response(fmt, events):
+    _suggest_cache_stats['streams'] += 1
+    response = current_app.response_class(stream_with_context(events), mimetype=_STREAM_MIMETYPES[fmt])
+    response.headers['Cache-Control'] = 'no-cache'
+    # keep reverse proxies from buffering the events
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _stream_stored(fmt, body, count):
+    # same terminal event as a live stream, flagged as served from the store;
+    # the count is stored with the body (only rows written before that are decoded)
+    if count is None:
+        count = len(json_codec.loads(body))
+    yield _stream_event(fmt, 'candidates', raw=body)
+    yield _stream_event(fmt, 'done', {'count': count, 'cached': True})
+
+
+def stream_suggestions(fmt, ingredients, candidates_sorted, prefetch_n=5, on_complete=None, fields=None):
+    """
+    Streaming variant of build_suggestions for already searched and ranked
+    candidates. Yields encoded events:
+
+      candidates  every candidate as a lightweight object, right away
+      recipe      {"index": i, "recipe": {...}} as the details of a prefetched candidate arrive
+      done        {"count": n}; the full list then equals the non-streaming response
+
+    `on_complete(enriched)` receives the final list, so it can be stored.
+    Every object is projected on `fields`.
+    """
+    items = [c for c in candidates_sorted if c.get('id')]
+    enriched = [project(_lightweight_candidate(c), fields) for c in items]
+    yield _stream_event(fmt, 'candidates', enriched)
+
+    fridge = set(canonicalize_ingredients(ingredients))
+    positions = {}
+    pos = 0
+    for idx, c in enumerate(candidates_sorted):
+        if not c.get('id'):
+            continue
+        if idx < prefetch_n:
+            positions.setdefault(c['id'], []).append(pos)
+        pos += 1
+    try:
+        for rid, info in iter_prefetch_details(list(positions), wants(fields, 'nutrition')):
+            for i in positions.get(rid, ()):
+                enriched[i] = project(_merge_candidate(items[i], info, fridge), fields)
+                yield _stream_event(fmt, 'recipe', {'index': i, 'recipe': enriched[i]})
+    except Exception as e:
+        yield _stream_event(fmt, 'error', {'error': f'Request failed: {e}'})
+        return
+    yield _stream_event(fmt, 'done', {'count': len(enriched)})
+    if on_complete is not None:
+        on_complete(enriched)
+
+
+def _suggest_key(ingredients, req_number, expiring=None, fields=None):
+    key_fields = {
+        'ings': sorted(canonicalize_ingredients(ingredients)),
+        'number': int(req_number) if req_number is not None else None,
+    }
+    if expiring:
+        key_fields['expiring'] = expiring
+    if fields:
+        key_fields['fields'] = fields_key(fields)
+    key_src = json.dumps(key_fields, separators=(',', ':'), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(key_src.encode('utf-8')).hexdigest()
+
+
+def _encode_cursor(key, offset, page_size, prefetch_n):
+    raw = json.dumps([key, offset, page_size, prefetch_n], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor):
+    # returns (key, offset, page_size, prefetch_n) or None for anything malformed
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key, offset, page_size, prefetch_n = json.loads(raw)
+    except Exception:
+        return None
+    if not isinstance(key, str) or not all(isinstance(v, int) and v >= 0 for v in (offset, page_size, prefetch_n)):
+        return None
+    if page_size < 1:
+        return None
+    return key, offset, page_size, prefetch_n
+
+
+def _paged_suggestions(data):
+    """
+    Cursor-paginated /recipes/suggest. The first request ({ingredients, page_size})
+    searches once and keeps the whole ranked candidate list in the result store;
+    it and every later request ({cursor}) enrich only the items of their page.
+    Responds { results: [...], next_cursor: str | null, total: int }; every request
+    may pass its own `fields` projection.
+    """
+    try:
+        fields = parse_fields(data.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    store = _get_result_store()
+    ttl = int(os.environ.get('EP_RECIPE_CACHE_TTL', str(60 * 60 * 24)))
+
+    if data.get('cursor') is not None:
+        decoded = _decode_cursor(data['cursor']) if isinstance(data['cursor'], str) else None
+        if decoded is None:
+            return jsonify({"error": "Invalid cursor"}), 400
+        key, offset, page_size, prefetch_n = decoded
+        hit = store.get(f'candidates:{key}') if store is not None else None
+        if hit is None:
+            return jsonify({"error": "Cursor expired, start a new search"}), 410
+        stored = json_codec.loads(hit[0])
+        ingredients, candidates = stored['ingredients'], stored['candidates']
+    else:
+        ingredients = data.get('ingredients')
+        if not ingredients:
+            return jsonify({"error": "No ingredients provided"}), 400
+        max_results = int(current_app.config.get('SPOONACULAR_MAX_RESULTS', 50))
+        try:
+            page_size = max(1, min(int(data.get('page_size')), max_results))
+            # the pool defaults to the largest search the backend allows
+            req_number = int(data['number']) if data.get('number') is not None else max_results
+            prefetch_n = max(0, int(data['prefetch'])) if data.get('prefetch') is not None else 5
+        except (TypeError, ValueError):
+            return jsonify({"error": "page_size, number and prefetch must be integers"}), 400
+        expiring = _parse_expiring(data.get('expiring'))
+        offset = 0
+        key = _suggest_key(ingredients, req_number, expiring)
+        ingredients = canonicalize_ingredients(ingredients)
+        hit = store.get(f'candidates:{key}') if store is not None else None
+        if hit is not None:
+            candidates = json_codec.loads(hit[0])['candidates']
+        else:
+            candidates = search_candidates(ingredients, req_number, expiring)
+            if _is_error_result(candidates):
+                payload, status = candidates
+                return jsonify(payload), status
+            if store is not None and candidates:
+                body = json_codec.dumps({'ingredients': ingredients, 'candidates': candidates})
+                if not store.put(f'candidates:{key}', body, ttl=ttl):
+                    store = None
+
+    page = candidates[offset:offset + page_size]
+    end = offset + len(page)
+    # without the result store there is nowhere to keep the list for the next page
+    next_cursor = None
+    if store is not None and end < len(candidates):
+        next_cursor = _encode_cursor(key, end, page_size, prefetch_n)
+    return jsonify({
+        'results': enrich_candidates(ingredients, page, prefetch_n, fields),
+        'next_cursor': next_cursor,
+        'total': len(candidates),
+    })
+
+
+def _refresh_result(app, store, cache_key, ttl, ingredients, req_number, prefetch_n, expiring=None, fields=None):
+    # background job for a stale stored result: rebuild and overwrite it
+    with app.app_context():
+        result = build_suggestions(ingredients, req_number, prefetch_n, expiring, fields)
+        if _is_error_result(result) or not _is_cacheable(result):
+            return False
+        return store.put(cache_key, _encode_suggestions(result), ttl=ttl, tag=prefetch_n, count=len(result))
+
+
 def get_ingredients_from_request():
     """
-    Accepts JSON { ingredients: [...] }
-    Returns an array of enriched recipe objects. Workflow:
+    Accepts JSON { ingredients: [...], expiring?: {ingredient: days left}, stream?: "ndjson" | "sse",
+                   fields?: "id,name,..." }
+    Returns an array of enriched recipe objects, or with `stream` the events of
+    stream_suggestions (lightweight candidates first, then each detail). With
+    `page_size` or `cursor` the response is paginated (see _paged_suggestions). Workflow:
       - call findByIngredients
-      - sort candidates by usedIngredientCount desc (prioritize recipes that use more of the fridge items)
+      - rank candidates (default: usedIngredientCount desc, to prioritize recipes that use more of the fridge items)
       - for each candidate call information with include_nutrition=True and merge results
     Responses are cached in controller layer to reduce external requests.
     """
     data = request.get_json()
+    if isinstance(data, dict) and ('cursor' in data or 'page_size' in data):
+        return _paged_suggestions(data)
     if not data or 'ingredients' not in data:
         return jsonify({"error": "No ingredients provided"}), 400
 
@@ -36,231 +597,75 @@ def get_ingredients_from_request():
         prefetch_n = int(prefetch_n) if prefetch_n is not None else 5
     except Exception:
         prefetch_n = 5
-    # default prefetch_n is an integer now; prepare optional file-backed cache
-    CACHE_DIR = os.environ.get('EP_RECIPE_CACHE_DIR') or os.path.join(os.getcwd(), 'cache')
-    CACHE_TTL = int(os.environ.get('EP_RECIPE_CACHE_TTL', str(60 * 60 * 24)))  # default 24h
+    # optional: {ingredient: days until it expires}, to favour recipes using those first
+    expiring = _parse_expiring(data.get('expiring'))
+    # optional: "ndjson" or "sse" (or a matching Accept header) streams the response
+    stream_fmt = _stream_format(data)
+    # optional: keep only these fields of each recipe ("id,name,ingredients.name")
     try:
-        Path(CACHE_DIR).mkdir(parents=True, exist_ok=True)
-    except Exception:
-        CACHE_DIR = None
+        fields = parse_fields(data.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    # results are kept in an indexed on-disk store shared by the worker processes
+    CACHE_TTL = int(os.environ.get('EP_RECIPE_CACHE_TTL', str(60 * 60 * 24)))  # default 24h
+    # past the soft TTL a stored result is still served, but rebuilt in the background
+    CACHE_SOFT_TTL = int(os.environ.get('EP_RECIPE_CACHE_SOFT_TTL', str(CACHE_TTL)))
+    store = _get_result_store()
 
-    cache_path = None
-    if CACHE_DIR:
+    cache_key = None
+    if store is not None:
         try:
-            key_src = json.dumps({
-                'ings': sorted([str(x).lower() for x in (ingredients or [])]),
-                'number': int(req_number) if req_number is not None else None,
-                'prefetch': int(prefetch_n)
-            }, separators=(',', ':'), ensure_ascii=False)
-            cache_key = hashlib.sha1(key_src.encode('utf-8')).hexdigest()
-            cache_path = os.path.join(CACHE_DIR, f'recipes_{cache_key}.json')
-            if os.path.exists(cache_path):
-                mtime = os.path.getmtime(cache_path)
-                if (time.time() - mtime) < CACHE_TTL:
-                    try:
-                        with open(cache_path, 'r', encoding='utf-8') as fh:
-                            cached = json.load(fh)
-                        # validate cached payload: accept only if at least one item has an 'ingredients' list
-                        if isinstance(cached, list) and any(isinstance(it, dict) and isinstance(it.get('ingredients'), list) for it in cached):
-                            return jsonify(cached)
-                        # otherwise treat cache as stale/invalid and regenerate
-                    except Exception:
-                        cache_path = None
+            # `prefetch` is not part of the key: the entry is tagged with the prefetch
+            # it was built with and serves every request asking for that many or fewer
+            cache_key = _suggest_key(ingredients, req_number, expiring, fields)
+            now = time.time()
+            hit = store.get(f'suggest:{cache_key}', now)
+            if hit is not None and (hit[2] is None or hit[2] >= prefetch_n):
+                body, created_at, stored_prefetch, count = hit
+                if now - created_at >= CACHE_SOFT_TTL:
+                    _suggest_cache_stats['stale_serves'] += 1
+                    schedule_refresh(f'suggest:{cache_key}', partial(
+                        _refresh_result, current_app._get_current_object(), store, f'suggest:{cache_key}',
+                        CACHE_TTL, ingredients, req_number, max(prefetch_n, stored_prefetch or 0), expiring, fields))
+                else:
+                    _suggest_cache_stats['hits'] += 1
+                if stream_fmt:
+                    return _stream_response(stream_fmt, _stream_stored(stream_fmt, body, count))
+                # one EncodedBody per stored version: its ETag and variants are computed once
+                store_key = f'suggest:{cache_key}'
+                encoded = _encoded_bodies.get(store_key, created_at)
+                if encoded is None:
+                    encoded = _encoded_bodies.put(store_key, body, created_at)
+                return _encoded_response(encoded)
         except Exception:
-            cache_path = None
-
-    # first-level search (this returns lightweight candidate objects from Spoonacular)
-    # Ensure we pass an int for `number` (controller expects int)
-    res = get_recipes_by_ingredients(ingredients, number=(req_number if req_number is not None else 5))
-    # controller may return (payload, status) on error
-    if isinstance(res, tuple) and len(res) == 2 and isinstance(res[1], int):
-        payload, status = res
-        return jsonify(payload), status
+            cache_key = None
 
-    candidates = res or []
+    if stream_fmt:
+        candidates = search_candidates(ingredients, req_number, expiring)
+        if _is_error_result(candidates):
+            payload, status = candidates
+            return jsonify(payload), status
 
-    # sort by usedIngredientCount desc, then by usedIngredientCount/total ratio
-    def score(item):
-        used = int(item.get('usedIngredientCount', 0))
-        missed = int(item.get('missedIngredientCount', 0))
-        total = used + missed if (used + missed) > 0 else 1
-        return (used, used / total)
+        def store_result(enriched):
+            if cache_key and _is_cacheable(enriched):
+                store.put(f'suggest:{cache_key}', _encode_suggestions(enriched), ttl=CACHE_TTL, tag=prefetch_n,
+                          count=len(enriched))
 
-    candidates_sorted = sorted(candidates, key=score, reverse=True)
+        return _stream_response(stream_fmt, stream_suggestions(
+            stream_fmt, ingredients, candidates, prefetch_n, on_complete=store_result, fields=fields))
 
-    enriched = []
-    # We'll prefetch full information only for the first `prefetch_n` candidates.
-    # For the remaining candidates we return lightweight objects derived from the
-    # initial search (so the frontend can show image/title/ingredient counts and
-    # compute availability from used/missed ingredient names without extra API calls).
-    lower_ings = set([str(x).lower() for x in (ingredients or [])])
-    for idx, c in enumerate(candidates_sorted):
-        rid = c.get('id')
-        if not rid:
-            continue
+    result = build_suggestions(ingredients, req_number, prefetch_n, expiring, fields)
+    if _is_error_result(result):
+        payload, status = result
+        return jsonify(payload), status
 
-        # Prefetch detailed info only for top N
-        if idx < prefetch_n:
-            info = get_recipe_information(rid, include_nutrition=True)
-            # controller may return (payload, status)
-            if isinstance(info, tuple) and len(info) == 2 and isinstance(info[1], int):
-                payload, status = info
-                # Build a lightweight ingredients list from the search result so the frontend
-                # can still compute totals and availability even if detailed info failed.
-                lightweight_ings = []
-                for el in (c.get('usedIngredients') or []):
-                    name = el.get('name') or el.get('original') or ''
-                    lightweight_ings.append({
-                        'id': el.get('id'),
-                        'name': name,
-                        'original': el.get('original') if 'original' in el else None,
-                        'amount': el.get('amount') if 'amount' in el else None,
-                        'unit': el.get('unit') if 'unit' in el else None,
-                        'available': True
-                    })
-                for el in (c.get('missedIngredients') or []):
-                    name = el.get('name') or el.get('original') or ''
-                    lightweight_ings.append({
-                        'id': el.get('id'),
-                        'name': name,
-                        'original': el.get('original') if 'original' in el else None,
-                        'amount': el.get('amount') if 'amount' in el else None,
-                        'unit': el.get('unit') if 'unit' in el else None,
-                        'available': False
-                    })
-
-                enriched.append({
-                    'id': c.get('id'),
-                    'name': c.get('title') or c.get('name'),
-                    'image': c.get('image'),
-                    'usedIngredientCount': c.get('usedIngredientCount', 0),
-                    'missedIngredientCount': c.get('missedIngredientCount', 0),
-                    'ingredients': lightweight_ings,
-                    # defaults for missing fields so frontend can compute and display non-empty cards
-                    'readyInMinutes': 30,
-                    'servings': 1,
-                    'summary': 'No detailed description available. This recipe was returned from a search result.',
-                    'steps': [{'number': 1, 'step': 'Follow the source recipe steps.'}],
-                    'nutrition': None,
-                    'error': payload
-                })
-                continue
-
-            # Normalize info to a dict for safe attribute access. The controller
-            # may return either a payload dict or a (payload, status) tuple.
-            if isinstance(info, tuple):
-                # Extract payload if present and is a dict
-                payload = info[0] if len(info) > 0 else None
-                data_info = payload if isinstance(payload, dict) else {}
-            elif isinstance(info, dict):
-                data_info = info
-            else:
-                data_info = {}
-            # use extendedIngredients to build availability flags
-            extended = data_info.get('extendedIngredients') or []
-            mapped_ings = []
-            for el in extended:
-                # some upstream data may be strings or malformed; guard for dicts
-                if not isinstance(el, dict):
-                    continue
-                name = el.get('name') or el.get('originalName') or ''
-                mapped_ings.append({
-                    'id': el.get('id'),
-                    'name': name,
-                    'original': el.get('original'),
-                    'amount': el.get('amount'),
-                    'unit': el.get('unit'),
-                    'available': (name.lower() in lower_ings)
-                })
-
-            # safe defaults if upstream returned incomplete info
-            ready = data_info.get('readyInMinutes') or 30
-            serv = data_info.get('servings') or 1
-            summ = data_info.get('summary') or 'No detailed description available.'
-            # Safely extract steps from analyzedInstructions if present
-            ai = data_info.get('analyzedInstructions')
-            if isinstance(ai, list) and len(ai) > 0 and isinstance(ai[0], dict):
-                steps_payload = ai[0].get('steps') or []
-            else:
-                steps_payload = []
-            if not steps_payload:
-                steps_payload = [{'number': 1, 'step': 'Follow the source recipe steps.'}]
-
-            enriched.append({
-                'id': data_info.get('id') or c.get('id'),
-                'name': data_info.get('title') or c.get('title') or c.get('name'),
-                'image': data_info.get('image') or c.get('image'),
-                'readyInMinutes': ready,
-                'servings': serv,
-                'summary': summ,
-                'dishTypes': data_info.get('dishTypes') or [],
-                'usedIngredientCount': c.get('usedIngredientCount', 0),
-                'missedIngredientCount': c.get('missedIngredientCount', 0),
-                'ingredients': mapped_ings,
-                'steps': steps_payload,
-                'nutrition': data_info.get('nutrition') or None,
-                'sourceUrl': data_info.get('sourceUrl') or data_info.get('spoonacularSourceUrl')
-            })
-        else:
-            # Lightweight candidate payload derived from the search result.
-            # Spoonacular's findByIngredients typically returns 'usedIngredients' and 'missedIngredients' arrays.
-            lightweight_ings = []
-            for el in (c.get('usedIngredients') or []):
-                name = el.get('name') or el.get('original') or ''
-                lightweight_ings.append({
-                    'id': el.get('id'),
-                    'name': name,
-                    'original': el.get('original') if 'original' in el else None,
-                    'amount': el.get('amount') if 'amount' in el else None,
-                    'unit': el.get('unit') if 'unit' in el else None,
-                    'available': True
-                })
-            for el in (c.get('missedIngredients') or []):
-                name = el.get('name') or el.get('original') or ''
-                lightweight_ings.append({
-                    'id': el.get('id'),
-                    'name': name,
-                    'original': el.get('original') if 'original' in el else None,
-                    'amount': el.get('amount') if 'amount' in el else None,
-                    'unit': el.get('unit') if 'unit' in el else None,
-                    'available': False
-                })
-
-            enriched.append({
-                'id': c.get('id'),
-                'name': c.get('title') or c.get('name'),
-                'image': c.get('image'),
-                # set sane defaults so UI shows something useful when details are not available
-                'readyInMinutes': 30,
-                'servings': 1,
-                'summary': 'No detailed description available. This recipe was returned from a search result.',
-                'dishTypes': [],
-                'usedIngredientCount': c.get('usedIngredientCount', 0),
-                'missedIngredientCount': c.get('missedIngredientCount', 0),
-                'ingredients': lightweight_ings,
-                'steps': [{'number': 1, 'step': 'Follow the source recipe steps.'}],
-                'nutrition': None,
-                'sourceUrl': None,
-                'lightweight': True
-            })
-
-    # persist enriched result to file cache (atomic write) so subsequent identical
-    # requests can be served without refetching external APIs
-    if cache_path:
-        try:
-            tmp_path = cache_path + '.tmp'
-            with open(tmp_path, 'w', encoding='utf-8') as fh:
-                json.dump(enriched, fh, ensure_ascii=False)
-            try:
-                os.replace(tmp_path, cache_path)
-            except Exception:
-                # fallback to os.rename for older Python/FS
-                os.rename(tmp_path, cache_path)
-        except Exception:
-            # ignore cache write errors
-            pass
+    body = _encode_suggestions(result)
+    if cache_key and _is_cacheable(result):
+        now = time.time()
+        if store.put(f'suggest:{cache_key}', body, ttl=CACHE_TTL, now=now, tag=prefetch_n, count=len(result)):
+            return _encoded_response(_encoded_bodies.put(f'suggest:{cache_key}', body, now))
 
-    return jsonify(enriched)
+    return _encoded_response(EncodedBody(body))
 
 
 recipe_recommendation_bp.add_url_rule('/suggest', 'get_recipes_by_ingredients', get_ingredients_from_request, methods=['POST'])
@@ -269,9 +674,8 @@ recipe_recommendation_bp.add_url_rule('/suggest', 'get_recipes_by_ingredients',
 def get_recipe_info_by_id(id):
     # proxy route to fetch full recipe information by id
     # We accept string ids to support static/front-end ids, but only numeric ids are
-    # proxied to Spoonacular. We force include_nutrition=True regardless of query params
-    from ..controllers.recipe_controller import get_recipe_information
-
+    # proxied to Spoonacular. Nutrition is always included unless a `fields=`
+    # projection leaves it out, in which case it is not even requested upstream.
     # try to coerce numeric id
     numeric_id = None
     try:
@@ -282,14 +686,42 @@ def get_recipe_info_by_id(id):
     if numeric_id is None:
         return jsonify({"error": "Invalid recipe id for external lookup"}), 400
 
-    # ignore incoming includeNutrition query param and force true
-    res = get_recipe_information(numeric_id, include_nutrition=True)
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # ignore incoming includeNutrition query param
+    include_nutrition = wants(fields, 'nutrition')
+    res = get_recipe_information(numeric_id, include_nutrition=include_nutrition)
     # controller may return (payload, status) or payload
     if isinstance(res, tuple) and len(res) == 2 and isinstance(res[1], int):
         payload, status = res
         return jsonify(payload), status
-    else:
-        return jsonify(res)
+    # the encoded body is reused as long as the cache entry it was built from is
+    # current; a payload that is not cached (any more) is encoded for this response only
+    stamp = information_stamp(numeric_id, include_nutrition, res)
+    if stamp is None:
+        return _encoded_response(EncodedBody(json_codec.dumps(project(res, fields))))
+    body_key = ('information', numeric_id, include_nutrition, fields_key(fields))
+    encoded = _encoded_bodies.get(body_key, stamp)
+    if encoded is None:
+        body = json_codec.dumps(project(res, fields))
+        encoded = _encoded_bodies.put(body_key, body, stamp)
+    return _encoded_response(encoded)
+
+
+recipe_recommendation_bp.add_url_rule('/<id>/information', 'get_recipe_information', get_recipe_info_by_id, methods=['GET'])
+
+
+def get_recipe_metrics():
+    # operational counters for the upstream recipe layer
+    metrics = get_upstream_metrics()
+    metrics['suggest_cache'] = dict(_suggest_cache_stats)
+    store = _get_result_store()
+    metrics['suggest_cache']['store'] = store.stats() if store is not None else None
+    metrics['encoded_bodies'] = _encoded_bodies.stats()
+    return jsonify(metrics)
 
 
-recipe_recommendation_bp.add_url_rule('/<id>/information', 'get_recipe_information', get_recipe_info_by_id, methods=['GET'])
\ No newline at end of file
+recipe_recommendation_bp.add_url_rule('/metrics', 'get_recipe_metrics', get_recipe_metrics, methods=['GET'])
@@ -0,0 +1,117 @@
+"""
+Circuit breaker for an upstream dependency.
+
+States:
+
+  - closed: calls go through; consecutive failures are counted and reaching
+    `failure_threshold` opens the circuit.
+  - open: calls are rejected immediately, so callers fall back (cached data
+    or an error) instead of waiting on a dead upstream. After `reset_timeout`
+    seconds the circuit becomes half-open.
+  - half-open: up to `half_open_max_calls` trial calls go through. A success
+    closes the circuit again; a failure re-opens it for another timeout.
+
+Callers ask `allow()` before a call and report its outcome with
+`record_success()` / `record_failure()`, or `release()` when an allowed call
+ended up not being made.
+"""
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open probe phase."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, half_open_max_calls=1, clock=time.monotonic):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self.half_open_max_calls = max(1, int(half_open_max_calls))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._probes = 0
+        self._counters = {'successes': 0, 'failures': 0, 'rejected': 0}
+        self._transitions = {}
+
+    def _transition_locked(self, state):
+        if state == self._state:
+            return
+        name = f'{self._state}->{state}'
+        self._transitions[name] = self._transitions.get(name, 0) + 1
+        self._state = state
+        self._probes = 0
+        if state == OPEN:
+            self._opened_at = self._clock()
+        elif state == CLOSED:
+            self._consecutive_failures = 0
+            self._opened_at = None
+
+    def _update_locked(self):
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._transition_locked(HALF_OPEN)
+
+    @property
+    def state(self):
+        with self._lock:
+            self._update_locked()
+            return self._state
+
+    def allow(self):
+        """Return True if a call may be made now."""
+        with self._lock:
+            self._update_locked()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            self._counters['rejected'] += 1
+            return False
+
+    def release(self):
+        """Give back a half-open trial slot for a call that was allowed but not made."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_success(self):
+        with self._lock:
+            self._counters['successes'] += 1
+            self._consecutive_failures = 0
+            if self._state == HALF_OPEN:
+                self._transition_locked(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._counters['failures'] += 1
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN:
+                self._transition_locked(OPEN)
+            elif self._state == CLOSED and self._consecutive_failures >= self.failure_threshold:
+                self._transition_locked(OPEN)
+
+    def reset(self):
+        """Force the circuit closed and forget the failure streak."""
+        with self._lock:
+            self._transition_locked(CLOSED)
+            self._consecutive_failures = 0
+
+    def stats(self):
+        with self._lock:
+            self._update_locked()
+            open_for = self._clock() - self._opened_at if self._opened_at is not None else None
+            return {
+                'state': self._state,
+                'consecutive_failures': self._consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout': self.reset_timeout,
+                'open_for_seconds': round(open_for, 3) if open_for is not None else None,
+                'transitions': dict(self._transitions),
+                **self._counters,
+            }
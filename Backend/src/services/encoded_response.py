@@ -0,0 +1,115 @@
+"""
+Pre-encoded response bodies with compressed variants and ETags.
+
+`EncodedBody` wraps the bytes of a JSON response once: its ETag is a hash of
+the bytes, and the gzip (and, when the optional `brotli` package is
+installed, br) variants are compressed the first time a client asks for them
+and kept. `EncodedBodyCache` is a small LRU of those objects keyed by
+whatever identifies the response, with a scalar version (a result-store
+creation time, a recipe-cache entry stamp...): a hit sends stored bytes
+without encoding, hashing or compressing anything again. Only the bytes are
+kept, never the payload they were built from.
+
+`max_bytes` counts the identity bodies; compressed variants are smaller and
+add at most about as much again.
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# bodies smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 1024
+
+
+def available_encodings():
+    """Content-codings this process can produce, best first."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+class EncodedBody:
+    """Bytes of one response plus its ETag and lazily built compressed variants."""
+
+    __slots__ = ('body', 'etag', '_variants')
+
+    def __init__(self, body):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.body = body
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self._variants = {}
+
+    def variant(self, encoding):
+        """Return the body in `encoding` ('identity', 'gzip' or 'br'), compressing it once."""
+        if encoding in (None, 'identity'):
+            return self.body
+        data = self._variants.get(encoding)
+        if data is None:
+            if encoding == 'gzip':
+                # mtime=0 keeps the bytes (and so caches downstream) deterministic
+                data = gzip.compress(self.body, compresslevel=6, mtime=0)
+            elif encoding == 'br' and brotli is not None:
+                data = brotli.compress(self.body, quality=5)
+            else:
+                raise ValueError(f'unsupported content-coding: {encoding}')
+            self._variants[encoding] = data
+        return data
+
+
+class EncodedBodyCache:
+    """Thread-safe LRU of EncodedBody objects bounded by entries and identity bytes."""
+
+    def __init__(self, max_entries=2000, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (version, EncodedBody)
+        self._bytes = 0
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key, version=None):
+        """Return the EncodedBody stored for `key` if it was built from `version`, else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return entry[1]
+
+    def put(self, key, body, version=None):
+        """Store `body` (bytes or an EncodedBody) for `key` and return the EncodedBody."""
+        encoded = body if isinstance(body, EncodedBody) else EncodedBody(body)
+        size = len(encoded.body)
+        if size > self.max_bytes:
+            return encoded
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1].body)
+            self._entries[key] = (version, encoded)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, victim) = self._entries.popitem(last=False)
+                self._bytes -= len(victim.body)
+                self._counters['evictions'] += 1
+        return encoded
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, entries=len(self._entries), bytes=self._bytes,
+                        max_entries=self.max_entries, max_bytes=self.max_bytes)
@@ -0,0 +1,193 @@
+"""
+Background expiration scanner for fridge items.
+
+`ExpiryScanner.scan_once()` moves items through their status transitions
+with two range queries on the (status, expiration_date) index:
+
+  active | expiring  ->  expired    expiration_date before today
+  active             ->  expiring   expiration_date within `warn_days`
+
+Matches are read from the cursor `batch_size` documents at a time and
+every batch is written with one unordered bulk_write of status-guarded
+UpdateOne operations. Memory stays bounded by the batch size whatever the
+collection size. Each transition also records the run's scan id, so when
+another scanner (another worker process) got to some documents first, only
+the documents this run changed are notified.
+
+Notifications are grouped per user and type (`items_expiring`,
+`items_expired`) and handed to `notify(events)` in batches, flushed
+whenever `notify_batch_size` items are pending and at the end of a run.
+The items are already marked by then, so no later scan would find them
+again: events whose `notify` call fails stay in an outbox and are sent
+again, ahead of new ones, at the next flush (this run's or the next run's).
+The outbox lives in memory and keeps at most `max_outbox_events` events,
+dropping (and counting) the oldest beyond that.
+`expiration_date` values are ISO date strings, as create_item/create_items
+store them. `start(interval)` runs scans on a daemon thread.
+"""
+import datetime
+import threading
+import uuid
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+ACTIVE = 'active'
+EXPIRING = 'expiring'
+EXPIRED = 'expired'
+
+_PROJECTION = {'_id': 1, 'user_email': 1, 'name': 1, 'expiration_date': 1, 'status': 1}
+
+
+def _batches(cursor, size):
+    batch = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def collection_sink(collection):
+    """`notify` callable that stores each batch of events in `collection` with one insert_many."""
+    def notify(events):
+        try:
+            collection.insert_many(events, ordered=False)
+        except BulkWriteError as e:
+            # a retried batch: events stored by the failed attempt kept their _id
+            errors = (e.details or {}).get('writeErrors', [])
+            if not errors or any(err.get('code') != 11000 for err in errors):
+                raise
+    return notify
+
+
+class ExpiryScanner:
+    """Marks expiring / expired items in batches and emits per-user notification events."""
+
+    def __init__(self, collection, notify=None, warn_days=3, batch_size=1000, notify_batch_size=500,
+                 max_outbox_events=10000, clock=datetime.date.today):
+        self.collection = collection
+        self.notify = notify
+        self.warn_days = max(0, int(warn_days))
+        self.batch_size = max(1, int(batch_size))
+        self.notify_batch_size = max(1, int(notify_batch_size))
+        self.max_outbox_events = max(0, int(max_outbox_events))
+        # events whose notify call failed, sent again at the next flush
+        self._outbox = []
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {'runs': 0, 'failed_runs': 0, 'expiring': 0, 'expired': 0, 'write_errors': 0,
+                       'events': 0, 'notify_errors': 0, 'dropped_events': 0, 'last_run': None}
+
+    # ---------- scanning ----------
+    def scan_once(self, today=None):
+        """Run one scan; returns the counters of this run."""
+        today = today or self._clock()
+        run = {'scanned': 0, 'expiring': 0, 'expired': 0, 'write_errors': 0, 'events': 0, 'notify_errors': 0,
+               'dropped_events': 0}
+        pending = {}
+        with self._scan_lock:
+            now = datetime.datetime.utcnow()
+            scan_id = uuid.uuid4().hex
+            today_s = today.isoformat()
+            # `$lt` the day after the horizon also covers values with a time part
+            horizon_s = (today + datetime.timedelta(days=self.warn_days + 1)).isoformat()
+            try:
+                # expired first, so items past their date never get an `expiring` notice
+                self._transition({'status': {'$in': [ACTIVE, EXPIRING]}, 'expiration_date': {'$lt': today_s}},
+                                 EXPIRED, now, scan_id, run, pending)
+                self._transition({'status': ACTIVE, 'expiration_date': {'$gte': today_s, '$lt': horizon_s}},
+                                 EXPIRING, now, scan_id, run, pending)
+            finally:
+                # items marked before a failure are still notified (or kept in the outbox)
+                self._flush(pending, now, run)
+        with self._lock:
+            self._stats['runs'] += 1
+            for key in ('expiring', 'expired', 'write_errors', 'events', 'notify_errors', 'dropped_events'):
+                self._stats[key] += run[key]
+            self._stats['last_run'] = now.isoformat()
+        return run
+
+    def _transition(self, query, new_status, now, scan_id, run, pending):
+        cursor = self.collection.find(query, _PROJECTION, batch_size=self.batch_size)
+        for batch in _batches(cursor, self.batch_size):
+            run['scanned'] += len(batch)
+            ops = [UpdateOne({'_id': doc['_id'], 'status': doc.get('status')},
+                             {'$set': {'status': new_status, 'status_changed_at': now, 'status_scan_id': scan_id}})
+                   for doc in batch]
+            try:
+                modified = self.collection.bulk_write(ops, ordered=False).modified_count
+            except BulkWriteError as e:
+                details = e.details or {}
+                modified = details.get('nModified', 0)
+                run['write_errors'] += len(details.get('writeErrors', []))
+            run[new_status] += modified
+            if modified < len(batch):
+                # someone else moved part of the batch: notify only what this run changed
+                batch = list(self.collection.find(
+                    {'_id': {'$in': [doc['_id'] for doc in batch]}, 'status_scan_id': scan_id}, _PROJECTION))
+            for doc in batch:
+                key = (doc.get('user_email'), new_status)
+                pending.setdefault(key, []).append({'name': doc.get('name'),
+                                                    'expiration_date': doc.get('expiration_date')})
+            if sum(len(items) for items in pending.values()) >= self.notify_batch_size:
+                self._flush(pending, now, run)
+
+    def _flush(self, pending, now, run):
+        events = [{'type': f'items_{status}', 'user_email': user_email, 'items': items, 'created_at': now}
+                  for (user_email, status), items in pending.items()]
+        pending.clear()
+        if self.notify is None:
+            return
+        # earlier failed events go first (runs are serialized by _scan_lock)
+        events = self._outbox + events
+        self._outbox = []
+        if not events:
+            return
+        try:
+            self.notify(events)
+            run['events'] += len(events)
+        except Exception:
+            run['notify_errors'] += 1
+            dropped = max(0, len(events) - self.max_outbox_events)
+            self._outbox = events[dropped:]
+            run['dropped_events'] += dropped
+
+    # ---------- scheduling ----------
+    def start(self, interval=3600.0):
+        """Scan now and then every `interval` seconds on a daemon thread. Returns False if already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, args=(float(interval),), name='expiry-scanner',
+                                            daemon=True)
+            self._thread.start()
+        return True
+
+    def _loop(self, interval):
+        while not self._stop.is_set():
+            try:
+                self.scan_once()
+            except Exception:
+                with self._lock:
+                    self._stats['failed_runs'] += 1
+            self._stop.wait(interval)
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self._thread = None
+
+    def stats(self):
+        with self._lock:
+            running = self._thread is not None and self._thread.is_alive()
+            return dict(self._stats, running=running, outbox=len(self._outbox), warn_days=self.warn_days,
+                        batch_size=self.batch_size)
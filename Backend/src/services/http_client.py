@@ -0,0 +1,114 @@
+"""
+Shared keep-alive HTTP client for upstream (Spoonacular) calls.
+
+Wraps a single `requests.Session` whose adapter keeps a sized urllib3
+connection pool, so consecutive calls to the same host reuse TCP/TLS
+connections instead of opening a new one each time. Idempotent GETs are
+retried with jittered exponential backoff on connection errors and on
+429/5xx responses (honouring Retry-After); once retries are exhausted the
+last response is returned as-is so callers keep seeing the upstream status.
+Every wait between attempts, Retry-After included, is capped at
+`max_retry_wait` seconds, so a long Retry-After never pins a request
+thread: the 429 reaches the caller, whose limiter and breaker handle it.
+Upstreams that bill every answered request can pass `status_retries=0`:
+only connection errors, which never reached the server, are retried then.
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class _CappedRetry(Retry):
+    """Retry whose Retry-After wait is clamped to `backoff_max`."""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.backoff_max)
+
+
+class UpstreamClient:
+    """Thread-safe pooled GET client with connect/read timeouts and retries."""
+
+    def __init__(self, pool_connections=4, pool_maxsize=16, connect_timeout=3.05, read_timeout=10,
+                 retries=2, backoff_factor=0.3, backoff_jitter=0.25, status_forcelist=RETRY_STATUSES,
+                 max_retry_wait=0.5, status_retries=None):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        status_retries = retries if status_retries is None else status_retries
+        self._retry = _CappedRetry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=status_retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            backoff_max=max_retry_wait,
+            status_forcelist=status_forcelist if status_retries else (),
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        self._adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                    max_retries=self._retry)
+        self._session = requests.Session()
+        self._session.mount('http://', self._adapter)
+        self._session.mount('https://', self._adapter)
+        self._lock = threading.Lock()
+        self._counters = {'requests': 0, 'errors': 0, 'retries': 0}
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        """Issue a GET through the shared pool. Raises requests exceptions on transport errors."""
+        timeout = timeout or (self.connect_timeout, self.read_timeout)
+        self._count('requests')
+        try:
+            response = self._session.get(url, params=params, timeout=timeout, **kwargs)
+        except Exception:
+            self._count('errors')
+            raise
+        retries = getattr(getattr(response, 'raw', None), 'retries', None)
+        history = getattr(retries, 'history', None) or ()
+        if history:
+            self._count('retries', len(history))
+        return response
+
+    def stats(self):
+        """Pool usage counters: connections created vs reused, per-host breakdown."""
+        created = 0
+        served = 0
+        hosts = {}
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            n_conn = getattr(pool, 'num_connections', 0)
+            n_req = getattr(pool, 'num_requests', 0)
+            created += n_conn
+            served += n_req
+            hosts[f'{pool.scheme}://{pool.host}:{pool.port}'] = {
+                'connections_created': n_conn,
+                'requests': n_req,
+                'idle': pool.pool.qsize() if getattr(pool, 'pool', None) is not None else 0,
+            }
+        with self._lock:
+            counters = dict(self._counters)
+        counters.update({
+            'connections_created': created,
+            'connections_reused': max(0, served - created),
+            'pool_maxsize': self._adapter._pool_maxsize,
+            'hosts': hosts,
+        })
+        return counters
+
+    def close(self):
+        self._session.close()
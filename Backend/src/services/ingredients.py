@@ -0,0 +1,146 @@
+"""
+Ingredient name canonicalization.
+
+Fridge items and upstream ingredient names come in many spellings for the
+same thing ("Tomatoes", "tomato ", "roma tomato"). `canonical_ingredient()`
+maps a name to one canonical form:
+
+  1. lowercase, trim, drop punctuation and collapse inner whitespace;
+  2. singularize the last word ("cherry tomatoes" -> "cherry tomato");
+  3. map synonyms and varieties through `SYNONYMS`.
+
+`canonicalize_ingredients()` applies it to a list and drops empties and
+duplicates. Cache keys, the upstream query and the `available` flags all go
+through this module so they agree on what counts as the same ingredient.
+"""
+import re
+
+# Words whose singular is not produced by the suffix rules below, or that must
+# not be touched at all (mass nouns that happen to end in "s").
+_IRREGULAR = {
+    'leaves': 'leaf',
+    'loaves': 'loaf',
+    'halves': 'half',
+    'knives': 'knife',
+    'cookies': 'cookie',
+    'brownies': 'brownie',
+    'pies': 'pie',
+    'ties': 'tie',
+    'anchovies': 'anchovy',
+    'chilies': 'chili',
+    'chillies': 'chilli',
+    'mice': 'mouse',
+    'geese': 'goose',
+    # singular ends in "-che"/"-ze": only the "s" goes
+    'quiches': 'quiche',
+    'brioches': 'brioche',
+    'ganaches': 'ganache',
+    'glazes': 'glaze',
+}
+_UNCHANGED = {
+    'asparagus', 'bass', 'brussels', 'couscous', 'citrus', 'cress', 'swiss', 'hummus', 'molasses',
+    'grits', 'oats', 'octopus', 'quinoa', 'schnapps', 'watercress', 'series', 'species',
+    'hibiscus', 'haggis', 'chives', 'greens', 'hops', 'tapas', 'gras', 'jus', 'rice', 'fish',
+    'anis', 'pastis',
+}
+
+# Canonical name for common synonyms and varieties (keys are already singular).
+SYNONYMS = {
+    'roma tomato': 'tomato',
+    'plum tomato': 'tomato',
+    'vine tomato': 'tomato',
+    'scallion': 'green onion',
+    'spring onion': 'green onion',
+    'garbanzo bean': 'chickpea',
+    'garbanzo': 'chickpea',
+    'aubergine': 'eggplant',
+    'courgette': 'zucchini',
+    'capsicum': 'bell pepper',
+    'sweet pepper': 'bell pepper',
+    'coriander leaf': 'cilantro',
+    'fresh coriander': 'cilantro',
+    'minced beef': 'ground beef',
+    'beef mince': 'ground beef',
+    'minced pork': 'ground pork',
+    'rocket': 'arugula',
+    'maize': 'corn',
+    'sweetcorn': 'corn',
+    'sweet corn': 'corn',
+    'icing sugar': 'powdered sugar',
+    'confectioners sugar': 'powdered sugar',
+    'caster sugar': 'sugar',
+    'granulated sugar': 'sugar',
+    'white sugar': 'sugar',
+    'plain flour': 'flour',
+    'all purpose flour': 'flour',
+    'all-purpose flour': 'flour',
+    'double cream': 'heavy cream',
+    'heavy whipping cream': 'heavy cream',
+    'prawn': 'shrimp',
+    'chilli': 'chili pepper',
+    'chile': 'chili pepper',
+    'chili': 'chili pepper',
+    'egg yolk': 'egg',
+    'egg white': 'egg',
+    'whole milk': 'milk',
+    'semi skimmed milk': 'milk',
+    'skimmed milk': 'milk',
+    'unsalted butter': 'butter',
+    'salted butter': 'butter',
+    'extra virgin olive oil': 'olive oil',
+    'evoo': 'olive oil',
+    'yoghurt': 'yogurt',
+    'chick pea': 'chickpea',
+}
+
+_PUNCT = re.compile(r"[^\w\s'-]+", re.UNICODE)
+_SPACES = re.compile(r'\s+')
+
+
+def singularize(word):
+    """Best-effort English singular of one lowercase word."""
+    if word in _IRREGULAR:
+        return _IRREGULAR[word]
+    if word in _UNCHANGED or len(word) <= 3:
+        return word
+    if word.endswith('ies') and len(word) > 4:
+        return word[:-3] + 'y'
+    if word.endswith('oes'):
+        return word[:-2]
+    if word.endswith(('ches', 'shes', 'xes', 'zes', 'sses')):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith(('ss', 'us')):
+        # "-is" is a plural of "-i" ("kiwis"); singular "-is" words are in _UNCHANGED
+        return word[:-1]
+    return word
+
+
+def canonical_ingredient(name):
+    """Return the canonical form of one ingredient name ('' for blank input)."""
+    if name is None:
+        return ''
+    text = _PUNCT.sub(' ', str(name).lower())
+    text = _SPACES.sub(' ', text).strip()
+    if not text:
+        return ''
+    words = text.split(' ')
+    words[-1] = singularize(words[-1])
+    text = ' '.join(words)
+    return SYNONYMS.get(text, text)
+
+
+def canonicalize_ingredients(names):
+    """Canonicalize a list of names, dropping blanks and duplicates (first occurrence wins)."""
+    seen = set()
+    result = []
+    for name in names or []:
+        canon = canonical_ingredient(name)
+        if canon and canon not in seen:
+            seen.add(canon)
+            result.append(canon)
+    return result
+
+
+def ingredient_key(names):
+    """Order-independent key for an ingredient list: sorted canonical names joined by ','."""
+    return ','.join(sorted(canonicalize_ingredients(names)))
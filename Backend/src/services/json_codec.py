@@ -0,0 +1,106 @@
+"""
+JSON encoding for responses and caches.
+
+`dumps(obj)` returns compact UTF-8 bytes and `loads(data)` accepts bytes or
+str. Both use orjson when it is installed and the standard library
+otherwise, with the same output for the values this app handles.
+`FastJSONProvider` plugs the same functions into Flask, so `jsonify` and
+`request.get_json()` use them too:
+
+    app.json = FastJSONProvider(app)
+
+Values orjson cannot encode on its own (dates, decimals, UUIDs, dataclasses)
+go through `default()`, which converts them the way Flask's default provider
+does, so responses keep their format.
+Integers wider than 64 bits fall back to the standard library.
+"""
+import dataclasses
+import datetime
+import decimal
+import json
+import uuid
+
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+if orjson is not None:
+    # datetimes are passed to `default` to keep Flask's HTTP-date format
+    _OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    _SORTED_OPTIONS = _OPTIONS | orjson.OPT_SORT_KEYS
+
+
+def default(o):
+    """Convert values JSON has no type for, as Flask's default provider does."""
+    if isinstance(o, datetime.date):
+        return http_date(o)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+def backend():
+    """Name of the JSON library in use ('orjson' or 'json')."""
+    return 'orjson' if orjson is not None else 'json'
+
+
+def _stdlib_dumps(obj, sort_keys=False):
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, sort_keys=sort_keys,
+                      default=default).encode('utf-8')
+
+
+def dumps(obj, sort_keys=False):
+    """Encode `obj` as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=default, option=_SORTED_OPTIONS if sort_keys else _OPTIONS)
+        except orjson.JSONEncodeError:
+            # orjson rejects integers wider than 64 bits; the standard library does not
+            pass
+    return _stdlib_dumps(obj, sort_keys=sort_keys)
+
+
+def loads(data):
+    """Decode JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def iter_json_array(values):
+    """Encode an iterable as a JSON array, one chunk per value, as the values arrive."""
+    first = True
+    for value in values:
+        yield (b'[' if first else b',') + dumps(value)
+        first = False
+    yield b'[]' if first else b']'
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by `dumps`/`loads` (keeps `sort_keys` and debug pretty-printing)."""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # explicit stdlib options (indent, cls, ...) are honoured as given
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, sort_keys=self.sort_keys).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = dumps(obj, sort_keys=self.sort_keys) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
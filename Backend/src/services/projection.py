@@ -0,0 +1,64 @@
+"""
+Field projection for recipe responses.
+
+`parse_fields('id,name,ingredients.name')` turns a comma-separated list (or a
+list) of dotted paths into a tree:
+
+    {'id': True, 'name': True, 'ingredients': {'name': True}}
+
+and `project(value, tree)` keeps only those paths. Lists are projected item by
+item, so `ingredients.name` keeps the name of every ingredient; `True` keeps a
+whole subtree. Projection runs on the Python objects before they are encoded,
+so dropped subtrees are never serialized.
+"""
+import json
+
+
+def parse_fields(spec):
+    """Parse a `fields=` value. Returns None (no projection) for an empty spec; raises ValueError if malformed."""
+    if spec is None:
+        return None
+    if isinstance(spec, str):
+        paths = spec.split(',')
+    elif isinstance(spec, (list, tuple)) and all(isinstance(p, str) for p in spec):
+        paths = spec
+    else:
+        raise ValueError('fields must be a comma-separated string or a list of strings')
+    tree = {}
+    for path in paths:
+        parts = [part.strip() for part in path.split('.')]
+        if not all(parts):
+            continue
+        node = tree
+        for part in parts[:-1]:
+            child = node.get(part)
+            if child is True:
+                # the whole subtree is already selected
+                break
+            if child is None:
+                child = node[part] = {}
+            node = child
+        else:
+            node[parts[-1]] = True
+    return tree or None
+
+
+def project(value, tree):
+    """Return `value` restricted to the paths of `tree` (None or True keep everything)."""
+    if tree is None or tree is True:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: project(value[key], sub) for key, sub in tree.items() if key in value}
+    return value
+
+
+def wants(tree, field):
+    """True if the projection keeps top-level `field` (always, without a projection)."""
+    return tree is None or field in tree
+
+
+def fields_key(tree):
+    """Stable string for a projection, for cache keys ('' without one)."""
+    return json.dumps(tree, sort_keys=True, separators=(',', ':')) if tree else ''
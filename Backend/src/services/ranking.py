@@ -0,0 +1,215 @@
+"""
+Candidate ranking for /recipes/suggest.
+
+Each candidate (a findByIngredients-shaped dict) is described by a few
+numeric features and ranked by their weighted sum, highest first; ties keep
+the upstream order. Features are plain functions registered in `FEATURES`
+with `@feature(name)`: they take the whole candidate list and the ranking
+context and return one value per candidate, None where the candidate does
+not carry that information (the ranker then uses the mean of the known
+values, so missing data neither helps nor hurts).
+
+Built-in features:
+  used         usedIngredientCount
+  missed       missedIngredientCount
+  used_ratio   used / (used + missed)
+  expiring     sum of 1 / (1 + days) over the used ingredients that expire soon,
+               from `context['expiring']` ({canonical name: days left})
+  ready_time   readyInMinutes
+  calories     calories from the `nutrition` block
+
+`DEFAULT_WEIGHTS` reproduce the previous order: used count first, then the
+used ratio (a ratio never outweighs one more used ingredient).
+
+When NumPy is installed (`context['numpy']`) the columns become arrays and
+the weighted sum and the sort run vectorized; without it the same
+arithmetic runs in Python and yields the same order.
+"""
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+from .ingredients import canonical_ingredient
+
+FEATURES = {}
+
+DEFAULT_WEIGHTS = {'used': 2.0, 'used_ratio': 1.0}
+
+
+def feature(name):
+    """
+    Register `fn(candidates, context) -> values` as ranking feature `name`:
+    one number (or None) per candidate, in order.
+    """
+    def register(fn):
+        FEATURES[name] = fn
+        return fn
+    return register
+
+
+def _int(value):
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _counts(candidates, context, field):
+    # shared by several features, so read once per ranking
+    columns = context['columns']
+    if field not in columns:
+        columns[field] = [v if type(v) is int else _int(v) for v in (c.get(field) for c in candidates)]
+    return columns[field]
+
+
+@feature('used')
+def _used(candidates, context):
+    return _counts(candidates, context, 'usedIngredientCount')
+
+
+@feature('missed')
+def _missed(candidates, context):
+    return _counts(candidates, context, 'missedIngredientCount')
+
+
+@feature('used_ratio')
+def _used_ratio(candidates, context):
+    used = _counts(candidates, context, 'usedIngredientCount')
+    missed = _counts(candidates, context, 'missedIngredientCount')
+    if context['numpy']:
+        used = np.asarray(used, dtype=np.float64)
+        return used / np.maximum(used + np.asarray(missed, dtype=np.float64), 1.0)
+    return [u / (u + m if (u + m) > 0 else 1) for u, m in zip(used, missed)]
+
+
+@feature('expiring')
+def _expiring(candidates, context):
+    expiring = context.get('expiring')
+    if not expiring:
+        return [0.0] * len(candidates)
+    canonical = context['canonical']
+    # candidates share most ingredient names: canonicalize each spelling once
+    weights = {}
+    values = []
+    for c in candidates:
+        total = 0.0
+        for el in c.get('usedIngredients') or []:
+            if isinstance(el, dict):
+                name = el.get('name') or el.get('original')
+                weight = weights.get(name)
+                if weight is None:
+                    days = expiring.get(canonical(name))
+                    weight = weights[name] = 1.0 / (1.0 + max(days, 0)) if days is not None else 0.0
+                total += weight
+        values.append(total)
+    return values
+
+
+@feature('ready_time')
+def _ready_time(candidates, context):
+    return [c.get('readyInMinutes') for c in candidates]
+
+
+def _calories(c):
+    nutrition = c.get('nutrition')
+    if not isinstance(nutrition, dict):
+        return None
+    for nutrient in nutrition.get('nutrients') or []:
+        if isinstance(nutrient, dict) and nutrient.get('name') == 'Calories':
+            return nutrient.get('amount')
+    return None
+
+
+@feature('calories')
+def _calories_feature(candidates, context):
+    return [_calories(c) for c in candidates]
+
+
+def parse_weights(text):
+    """Parse 'used=2,used_ratio=1,expiring=0.5' into a weights dict (unknown names raise ValueError)."""
+    weights = {}
+    for part in (text or '').split(','):
+        if not part.strip():
+            continue
+        name, _, value = part.partition('=')
+        name = name.strip()
+        if name not in FEATURES:
+            raise ValueError(f'unknown ranking feature: {name}')
+        weights[name] = float(value)
+    return weights
+
+
+def _float(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _column(values):
+    values = list(values)
+    if all(type(v) in (int, float) and v == v for v in values):
+        return values
+    values = [v if type(v) in (int, float) else _float(v) for v in values]
+    known = [v for v in values if v is not None and v == v]
+    fill = sum(known) / len(known) if known else 0.0
+    return [v if v is not None and v == v else fill for v in values]
+
+
+def _np_column(values):
+    if not isinstance(values, np.ndarray):
+        try:
+            values = np.asarray(values, dtype=np.float64)  # None becomes NaN
+        except (TypeError, ValueError):
+            values = np.asarray([_float(v) for v in values], dtype=np.float64)
+    missing = np.isnan(values)
+    if missing.any():
+        values = np.where(missing, 0.0 if missing.all() else values[~missing].mean(), values)
+    return values
+
+
+class Ranker:
+    """Weighted-feature ranker. `use_numpy=None` uses NumPy when it is installed."""
+
+    def __init__(self, weights=None, use_numpy=None):
+        weights = DEFAULT_WEIGHTS if weights is None else weights
+        unknown = [name for name in weights if name not in FEATURES]
+        if unknown:
+            raise ValueError(f'unknown ranking feature: {unknown[0]}')
+        # zero weights are not even extracted
+        self.weights = {name: float(w) for name, w in weights.items() if w}
+        self.use_numpy = (np is not None) if use_numpy is None else (use_numpy and np is not None)
+
+    def scores(self, candidates, context=None):
+        """Return the score of every candidate, in input order (a NumPy array on the NumPy path)."""
+        context = self._context(context)
+        if self.use_numpy:
+            totals = np.zeros(len(candidates), dtype=np.float64)
+            for name, w in self.weights.items():
+                totals += w * _np_column(FEATURES[name](candidates, context))
+            return totals
+        totals = None
+        for name, w in self.weights.items():
+            column = _column(FEATURES[name](candidates, context))
+            totals = [w * v for v in column] if totals is None else [t + w * v for t, v in zip(totals, column)]
+        return totals if totals is not None else [0.0] * len(candidates)
+
+    def rank(self, candidates, context=None):
+        """Return `candidates` sorted by score, highest first (stable for ties)."""
+        candidates = list(candidates or [])
+        if len(candidates) < 2:
+            return candidates
+        scores = self.scores(candidates, context)
+        if self.use_numpy:
+            order = np.argsort(-scores, kind='stable').tolist()
+        else:
+            order = sorted(range(len(candidates)), key=scores.__getitem__, reverse=True)
+        return [candidates[i] for i in order]
+
+    def _context(self, context):
+        context = dict(context or {})
+        context.setdefault('canonical', canonical_ingredient)
+        context['numpy'] = self.use_numpy
+        context['columns'] = {}
+        return context
@@ -0,0 +1,181 @@
+"""
+Quota-aware limiter for Spoonacular calls.
+
+Spoonacular bills "points" per call and enforces a daily point quota that
+resets at UTC midnight. `QuotaLimiter` keeps two budgets:
+
+  - a token bucket (points per second with a burst capacity) that smooths
+    bursts of suggest traffic, and
+  - the daily quota, configured up front and/or learned from the
+    `X-API-Quota-Used` / `X-API-Quota-Left` response headers.
+
+Calls carry a priority. Interactive lookups (a user opening a recipe) may
+use the whole budget and wait briefly for bucket tokens; speculative
+prefetches never wait and are refused once they would dip into the reserved
+share of either budget, so they are the first to degrade.
+
+An upstream 429 means the bucket is running faster than Spoonacular allows:
+`backoff(seconds)` then pauses every grant for that long (interactive calls
+still wait up to `max_wait`).
+"""
+import threading
+import time
+
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_PREFETCH = 'prefetch'
+
+
+def endpoint_cost(endpoint, results=1):
+    """Approximate Spoonacular point cost of one call."""
+    results = max(1, int(results or 1))
+    if endpoint == 'findByIngredients':
+        return 1 + 0.01 * results
+    if endpoint == 'informationBulk':
+        return 1 + 0.5 * (results - 1)
+    return 1.0
+
+
+class QuotaLimiter:
+    """Token bucket plus daily point quota, with a reserve kept for interactive calls."""
+
+    def __init__(self, rate=10.0, burst=20.0, daily_points=None, prefetch_reserve=0.2,
+                 max_wait=0.5, clock=time.monotonic, wall_clock=time.time):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.daily_points = float(daily_points) if daily_points else None
+        self.prefetch_reserve = float(prefetch_reserve)
+        self.max_wait = float(max_wait)
+        self._clock = clock
+        self._wall = wall_clock
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._last_refill = clock()
+        self._day = self._day_index()
+        self._daily_used = 0.0
+        self._daily_left = None  # authoritative value from upstream headers, if any
+        self._paused_until = 0.0  # set by backoff() after an upstream 429
+        self._backoffs = 0
+        self._counters = {
+            PRIORITY_INTERACTIVE: {'granted': 0, 'denied': 0},
+            PRIORITY_PREFETCH: {'granted': 0, 'denied': 0},
+        }
+        self._points_by_endpoint = {}
+
+    def _day_index(self):
+        return int(self._wall() // 86400)
+
+    def _refill_locked(self):
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+        day = self._day_index()
+        if day != self._day:
+            self._day = day
+            self._daily_used = 0.0
+            self._daily_left = None
+
+    def _daily_remaining_locked(self):
+        if self._daily_left is not None:
+            return self._daily_left
+        if self.daily_points is None:
+            return None
+        return max(0.0, self.daily_points - self._daily_used)
+
+    def _daily_limit_locked(self):
+        if self._daily_left is not None:
+            return self._daily_used + self._daily_left
+        return self.daily_points
+
+    def _try_take_locked(self, cost, priority):
+        if self._last_refill < self._paused_until:
+            return False, self._paused_until - self._last_refill
+        reserve = self.prefetch_reserve if priority == PRIORITY_PREFETCH else 0.0
+        remaining = self._daily_remaining_locked()
+        if remaining is not None:
+            limit = self._daily_limit_locked() or 0.0
+            if remaining - cost < reserve * limit:
+                return False, None
+        if self._tokens - cost < reserve * self.burst:
+            # seconds until enough tokens are back (None: never for this call)
+            missing = cost + reserve * self.burst - self._tokens
+            return False, (missing / self.rate if self.rate > 0 and cost <= self.burst else None)
+        self._tokens -= cost
+        self._daily_used += cost
+        if self._daily_left is not None:
+            self._daily_left = max(0.0, self._daily_left - cost)
+        return True, None
+
+    def acquire(self, endpoint, cost=None, priority=PRIORITY_INTERACTIVE):
+        """
+        Reserve the points for one call. Returns True if the call may go ahead.
+        Interactive calls wait up to `max_wait` seconds for bucket tokens;
+        prefetch calls never wait.
+        """
+        cost = endpoint_cost(endpoint) if cost is None else float(cost)
+        priority = priority if priority in self._counters else PRIORITY_INTERACTIVE
+        deadline = self._clock() + (self.max_wait if priority == PRIORITY_INTERACTIVE else 0.0)
+        while True:
+            with self._lock:
+                self._refill_locked()
+                ok, wait = self._try_take_locked(cost, priority)
+                if ok:
+                    self._counters[priority]['granted'] += 1
+                    self._points_by_endpoint[endpoint] = self._points_by_endpoint.get(endpoint, 0.0) + cost
+                    return True
+                now = self._clock()
+                if wait is None or now + wait > deadline:
+                    self._counters[priority]['denied'] += 1
+                    return False
+            time.sleep(wait)
+
+    def update_from_headers(self, headers):
+        """Sync the daily budget with Spoonacular's X-API-Quota-* response headers."""
+        try:
+            used = headers.get('X-API-Quota-Used')
+            left = headers.get('X-API-Quota-Left')
+            used = float(used) if used is not None else None
+            left = float(left) if left is not None else None
+        except Exception:
+            return
+        with self._lock:
+            if used is not None:
+                self._daily_used = used
+            if left is not None:
+                self._daily_left = max(0.0, left)
+
+    def reset(self):
+        """Refill the bucket and forget today's usage (counters are kept)."""
+        with self._lock:
+            self._tokens = self.burst
+            self._last_refill = self._clock()
+            self._daily_used = 0.0
+            self._daily_left = None
+            self._paused_until = 0.0
+
+    def exhaust(self):
+        """Mark today's quota as used up (e.g. after an upstream 402)."""
+        with self._lock:
+            self._daily_left = 0.0
+
+    def backoff(self, seconds):
+        """Stop granting calls for `seconds` (e.g. the Retry-After of an upstream 429)."""
+        with self._lock:
+            self._backoffs += 1
+            self._paused_until = max(self._paused_until, self._clock() + max(0.0, float(seconds)))
+
+    def stats(self):
+        with self._lock:
+            self._refill_locked()
+            return {
+                'tokens': round(self._tokens, 3),
+                'burst': self.burst,
+                'rate_per_sec': self.rate,
+                'daily_limit': self._daily_limit_locked(),
+                'daily_used': round(self._daily_used, 3),
+                'daily_remaining': self._daily_remaining_locked(),
+                'prefetch_reserve': self.prefetch_reserve,
+                'priorities': {p: dict(c) for p, c in self._counters.items()},
+                'backoffs': self._backoffs,
+                'paused_for': round(max(0.0, self._paused_until - self._last_refill), 3),
+                'points_by_endpoint': {k: round(v, 3) for k, v in self._points_by_endpoint.items()},
+            }
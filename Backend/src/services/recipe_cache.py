@@ -0,0 +1,276 @@
+"""
+Bounded in-process cache for upstream recipe payloads.
+
+Entries are kept in LRU order and bounded both by entry count and by an
+approximate byte budget (size of the JSON encoding of the value). Expired
+entries are dropped lazily when they are read and periodically by a sweep
+that piggybacks on cache traffic. An entry may also carry a soft TTL: past
+it, `lookup()` still returns the value but flags it as stale so the caller
+can serve it and refresh in the background (stale-while-revalidate).
+
+With a `stale_if_error` grace period, entries past their hard TTL are no
+longer returned by `lookup()` but are kept for that long so `lookup_expired()`
+can still serve them when the upstream is failing.
+
+An optional shared `backend` (see shared_cache.py) acts as an L2 behind the
+in-process dict: L1 misses are looked up there and promoted, and writes go
+to both, so worker processes on one host share what they fetched. Counters
+are kept per namespace, where the namespace is the part of the key before
+the first ':' (e.g. `findByIngredients`, `information`).
+"""
+import itertools
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from . import json_codec
+
+_MISSING = object()
+
+
+def _estimate_size(value):
+    try:
+        return len(json_codec.dumps(value))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+def _namespace(key):
+    return str(key).split(':', 1)[0]
+
+
+class _Entry:
+    __slots__ = ('value', 'expires_at', 'stale_at', 'evict_at', 'size', 'stamp')
+
+    def __init__(self, value, expires_at, size, stale_at=None, evict_at=None, stamp=None):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_at = stale_at
+        # end of the stale-if-error grace period; the entry is dropped after it
+        self.evict_at = expires_at if evict_at is None else evict_at
+        self.size = size
+        # unique per stored value, so derived data can be keyed on it instead of the value
+        self.stamp = stamp
+
+
+class RecipeCache:
+    """Thread-safe LRU cache with per-entry TTL, entry cap and byte budget."""
+
+    def __init__(self, max_entries=5000, max_bytes=64 * 1024 * 1024, default_ttl=60 * 60 * 24,
+                 sweep_interval=60, clock=time.time, backend=None, stale_if_error=0):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.default_ttl = default_ttl
+        self.sweep_interval = sweep_interval
+        self.backend = backend
+        self.stale_if_error = max(0, stale_if_error or 0)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._last_sweep = clock()
+        self._stats = {}
+        self._stamps = itertools.count(1)
+
+    # ---------- counters ----------
+    def _ns_stats(self, key):
+        ns = _namespace(key)
+        stats = self._stats.get(ns)
+        if stats is None:
+            stats = {'hits': 0, 'misses': 0, 'stale_hits': 0, 'shared_hits': 0, 'expired_hits': 0,
+                     'evictions': 0, 'expirations': 0, 'entries': 0, 'bytes': 0}
+            self._stats[ns] = stats
+        return stats
+
+    def _remove(self, key, reason=None):
+        entry = self._data.pop(key)
+        self._bytes -= entry.size
+        stats = self._ns_stats(key)
+        stats['entries'] -= 1
+        stats['bytes'] -= entry.size
+        if reason:
+            stats[reason] += 1
+        return entry
+
+    def _maybe_sweep(self, now):
+        if self.sweep_interval is not None and now - self._last_sweep >= self.sweep_interval:
+            self._sweep_locked(now)
+
+    def _sweep_locked(self, now):
+        self._last_sweep = now
+        expired = [k for k, e in self._data.items() if e.evict_at is not None and e.evict_at <= now]
+        for k in expired:
+            self._remove(k, 'expirations')
+        if self.backend is not None:
+            try:
+                self.backend.sweep(now)
+            except Exception:
+                pass
+        return len(expired)
+
+    def _evict_at(self, expires_at):
+        return expires_at + self.stale_if_error if expires_at is not None else None
+
+    def _store_locked(self, key, value, expires_at, stale_at, size):
+        if key in self._data:
+            self._remove(key)
+        if size > self.max_bytes:
+            # a single value larger than the whole budget is never stored
+            return False
+        self._data[key] = _Entry(value, expires_at, size, stale_at, self._evict_at(expires_at), next(self._stamps))
+        self._bytes += size
+        stats = self._ns_stats(key)
+        stats['entries'] += 1
+        stats['bytes'] += size
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._data))
+            self._remove(oldest, 'evictions')
+        return True
+
+    def _lookup_shared(self, key, now):
+        # L1 miss: try the shared backend and promote the entry into L1
+        try:
+            found = self.backend.get(key, now)
+        except Exception:
+            found = None
+        with self._lock:
+            stats = self._ns_stats(key)
+            if found is None:
+                stats['misses'] += 1
+                return None
+            # the backend row lives until the end of the grace period
+            value, evict_at, stale_at = found
+            expires_at = evict_at - self.stale_if_error if evict_at is not None else None
+            self._store_locked(key, value, expires_at, stale_at, _estimate_size(value))
+            if expires_at is not None and expires_at <= now:
+                stats['misses'] += 1
+                return None
+            stats['shared_hits'] += 1
+        return value, stale_at is not None and stale_at <= now
+
+    # ---------- public API ----------
+    def lookup(self, key):
+        """Return `(value, is_stale)` for a live entry, or None on a miss."""
+        now = self._clock()
+        with self._lock:
+            self._maybe_sweep(now)
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry.evict_at is not None and entry.evict_at <= now:
+                self._remove(key, 'expirations')
+                entry = _MISSING
+            if entry is not _MISSING and entry.expires_at is not None and entry.expires_at <= now:
+                # past the hard TTL: only lookup_expired() may still serve it
+                entry = _MISSING
+            if entry is not _MISSING:
+                self._data.move_to_end(key)
+                stale = entry.stale_at is not None and entry.stale_at <= now
+                self._ns_stats(key)['stale_hits' if stale else 'hits'] += 1
+                return entry.value, stale
+            if self.backend is None:
+                self._ns_stats(key)['misses'] += 1
+                return None
+        return self._lookup_shared(key, now)
+
+    def lookup_expired(self, key):
+        """
+        Return the value for `key` even if it is past its hard TTL but still
+        within the stale-if-error grace period, or None. Meant for serving
+        something when the upstream is failing.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and (entry.evict_at is None or entry.evict_at > now):
+                self._ns_stats(key)['expired_hits'] += 1
+                return entry.value
+        if self.backend is None:
+            return None
+        try:
+            found = self.backend.get(key, now)
+        except Exception:
+            found = None
+        if found is None:
+            return None
+        with self._lock:
+            self._ns_stats(key)['expired_hits'] += 1
+        return found[0]
+
+    def get(self, key, default=None):
+        """Return the value (stale or not) for `key`, or `default` on a miss."""
+        hit = self.lookup(key)
+        return default if hit is None else hit[0]
+
+    def set(self, key, value, ttl=None, stale_ttl=None):
+        """Store `value` for `ttl` seconds; past `stale_ttl` lookups flag it as stale."""
+        now = self._clock()
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = (now + ttl) if ttl is not None else None
+        stale_at = (now + stale_ttl) if stale_ttl is not None and (ttl is None or stale_ttl < ttl) else None
+        size = _estimate_size(value)
+        with self._lock:
+            self._maybe_sweep(now)
+            stored = self._store_locked(key, value, expires_at, stale_at, size)
+        if self.backend is not None:
+            try:
+                self.backend.set(key, value, self._evict_at(expires_at), stale_at)
+            except Exception:
+                pass
+        return stored
+
+    def stamp(self, key, value):
+        """Stamp of the entry for `key` if it still holds `value` (the same object), else None."""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry.stamp if entry is not None and entry.value is value else None
+
+    def delete(self, key):
+        if self.backend is not None:
+            try:
+                self.backend.delete(key)
+            except Exception:
+                pass
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+                return True
+            return False
+
+    def clear(self):
+        """Empty the in-process L1. A shared backend is left untouched."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            for stats in self._stats.values():
+                stats['entries'] = 0
+                stats['bytes'] = 0
+
+    def sweep(self):
+        """Drop every expired entry now. Returns how many were removed."""
+        with self._lock:
+            return self._sweep_locked(self._clock())
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry.expires_at is None or entry.expires_at > self._clock())
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'stale_if_error': self.stale_if_error,
+                'namespaces': {ns: dict(s) for ns, s in self._stats.items()},
+            }
+        if self.backend is not None:
+            try:
+                stats['shared'] = self.backend.stats()
+            except Exception:
+                stats['shared'] = None
+        return stats
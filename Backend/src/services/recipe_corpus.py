@@ -0,0 +1,176 @@
+"""
+Local recipe corpus with an inverted ingredient index.
+
+Recipes enter the corpus from Spoonacular `information` payloads: every
+payload the controller fetches is added, and a bulk import file (a JSON
+array or JSON lines of payloads) can seed it at startup. Each recipe gets a
+dense internal document id and is kept as a compact `RecipeRecord` (see
+recipe_records.py: slotted ingredient records with interned names); its
+canonical ingredient names are appended to per-ingredient posting lists:
+sorted `array('I')` of document ids.
+
+`find_by_ingredients(fridge)` walks the posting lists of the fridge items,
+counts matches per document and derives used/missed counts from each
+recipe's ingredient total, returning candidates shaped like Spoonacular's
+findByIngredients results, so callers can use them interchangeably.
+
+Re-adding a recipe whose ingredients changed retires its old document id;
+posting lists are compacted once retired ids make up a quarter of them.
+"""
+import heapq
+import threading
+from array import array
+from collections import Counter
+
+from . import json_codec
+from .recipe_records import RecipeRecord
+
+
+class RecipeCorpus:
+    """In-memory recipe corpus indexed by canonical ingredient name."""
+
+    def __init__(self, max_recipes=50000):
+        self.max_recipes = max(1, int(max_recipes))
+        self._lock = threading.Lock()
+        self._docs = {}          # doc id -> RecipeRecord, one ingredient per canonical name (live documents only)
+        self._by_recipe = {}     # recipe id -> doc id
+        self._postings = {}      # canonical ingredient -> array('I') of doc ids, ascending
+        self._next_doc = 0
+        self._retired = 0
+        self._counters = {'added': 0, 'updated': 0, 'rejected': 0, 'queries': 0}
+
+    # ---------- building ----------
+    def add_recipe(self, payload):
+        """Add or refresh one recipe from an `information` payload. Returns True if indexed."""
+        if not isinstance(payload, dict) or payload.get('id') is None:
+            return False
+        record = RecipeRecord.from_information(payload, details=False, distinct=True)
+        if not record.ingredients:
+            return False
+        recipe_id = record.id
+        names = record.canonical_names()
+        with self._lock:
+            old = self._by_recipe.get(recipe_id)
+            if old is not None:
+                if self._docs[old].canonical_names() == names:
+                    # same ingredients: refresh the stored fields in place
+                    self._docs[old] = record
+                    self._counters['updated'] += 1
+                    return True
+                del self._docs[old]
+                self._retired += 1
+            elif len(self._docs) >= self.max_recipes:
+                self._counters['rejected'] += 1
+                return False
+            doc_id = self._next_doc
+            self._next_doc += 1
+            self._docs[doc_id] = record
+            self._by_recipe[recipe_id] = doc_id
+            for name in names:
+                postings = self._postings.get(name)
+                if postings is None:
+                    postings = self._postings[name] = array('I')
+                postings.append(doc_id)
+            self._counters['updated' if old is not None else 'added'] += 1
+            if self._retired * 4 > len(self._docs) + self._retired:
+                self._compact_locked()
+        return True
+
+    def _compact_locked(self):
+        live = self._docs
+        for name in list(self._postings):
+            kept = array('I', (d for d in self._postings[name] if d in live))
+            if kept:
+                self._postings[name] = kept
+            else:
+                del self._postings[name]
+        self._retired = 0
+
+    def load_file(self, path):
+        """Bulk-import `information` payloads from a JSON array or JSON lines file. Returns the number indexed."""
+        with open(path, 'r', encoding='utf-8') as fh:
+            text = fh.read()
+        stripped = text.lstrip()
+        if stripped.startswith('['):
+            payloads = json_codec.loads(stripped)
+        else:
+            payloads = [json_codec.loads(line) for line in text.splitlines() if line.strip()]
+        return sum(1 for payload in payloads if self.add_recipe(payload))
+
+    def clear(self):
+        with self._lock:
+            self._docs.clear()
+            self._by_recipe.clear()
+            self._postings.clear()
+            self._next_doc = 0
+            self._retired = 0
+
+    # ---------- querying ----------
+    def find_by_ingredients(self, ingredients, number=5, min_used=1):
+        """
+        Rank corpus recipes for a fridge: most used ingredients first, then fewest missed.
+        `ingredients` must already be canonical names. Returns up to `number`
+        findByIngredients-shaped candidates.
+        """
+        fridge = set(ingredients or [])
+        with self._lock:
+            self._counters['queries'] += 1
+            counts = Counter()
+            for name in fridge:
+                postings = self._postings.get(name)
+                if postings is not None:
+                    counts.update(postings)
+            number = max(0, int(number))
+            docs = self._docs
+            picked = []
+            if counts and number:
+                # only documents using at least as many ingredients as the number-th
+                # best can make the cut; most matches are dropped without scoring
+                cutoff = max(min_used, heapq.nlargest(number, counts.values())[-1])
+                scored = self._score_locked(counts, cutoff)
+                if len(scored) < number and cutoff > min_used:
+                    # retired ids inflated the cutoff
+                    scored = self._score_locked(counts, min_used)
+                scored.sort()
+                picked = [docs[doc_id] for _, _, doc_id in scored[:number]]
+
+        results = []
+        for doc in picked:
+            used = [ing.to_dict() for ing in doc.ingredients if ing.canonical in fridge]
+            missed = [ing.to_dict() for ing in doc.ingredients if ing.canonical not in fridge]
+            results.append({
+                'id': doc.id,
+                'title': doc.title,
+                'image': doc.image,
+                'usedIngredientCount': len(used),
+                'missedIngredientCount': len(missed),
+                'usedIngredients': used,
+                'missedIngredients': missed,
+                'source': 'local',
+            })
+        return results
+
+    def _score_locked(self, counts, cutoff):
+        docs = self._docs
+        return [
+            (-used, len(docs[doc_id].ingredients) - used, doc_id)
+            for doc_id, used in counts.items()
+            if used >= cutoff and doc_id in docs
+        ]
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, recipe_id):
+        return recipe_id in self._by_recipe
+
+    def stats(self):
+        with self._lock:
+            return {
+                'recipes': len(self._docs),
+                'ingredients': len(self._postings),
+                'postings': sum(len(p) for p in self._postings.values()),
+                'retired': self._retired,
+                'max_recipes': self.max_recipes,
+                **self._counters,
+            }
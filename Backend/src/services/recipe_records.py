@@ -0,0 +1,131 @@
+"""
+Compact recipe and ingredient records.
+
+Upstream payloads are dicts of dicts; keeping many of them (the local
+corpus) or rebuilding them per request (the enriched suggest results) costs
+one dict per ingredient. `IngredientRecord` and `RecipeRecord` hold the same
+fields in `__slots__` instances instead, and ingredient names, canonical
+names and units are interned: the vocabulary is small, so thousands of
+recipes share the same string objects. Dicts are only built at the edge,
+by `to_dict()`, when a response is encoded.
+
+`canonical_name()` memoizes `canonical_ingredient()` per spelling, so
+building records does not re-run the canonicalization for names already
+seen.
+"""
+import sys
+
+from .ingredients import canonical_ingredient
+
+# spelling -> (interned name, interned canonical name); cleared when full
+_NAMES = {}
+_NAMES_MAX = 50000
+
+
+def canonical_name(name):
+    """Return (interned name, interned canonical name) for an ingredient spelling."""
+    entry = _NAMES.get(name)
+    if entry is None:
+        if len(_NAMES) >= _NAMES_MAX:
+            _NAMES.clear()
+        text = sys.intern(name if type(name) is str else str(name))
+        entry = _NAMES[name] = (text, sys.intern(canonical_ingredient(text)))
+    return entry
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class IngredientRecord:
+    """One recipe ingredient: id, name, canonical name, original text, amount and unit."""
+
+    __slots__ = ('id', 'name', 'canonical', 'original', 'amount', 'unit')
+
+    def __init__(self, id, name, original=None, amount=None, unit=None):
+        self.id = id
+        self.name, self.canonical = canonical_name(name or '')
+        self.original = original
+        self.amount = amount
+        self.unit = _intern(unit)
+
+    @classmethod
+    def from_search(cls, el):
+        """From a findByIngredients used/missed ingredient."""
+        return cls(el.get('id'), el.get('name') or el.get('original'), el.get('original'),
+                   el.get('amount'), el.get('unit'))
+
+    @classmethod
+    def from_information(cls, el):
+        """From an `information` extendedIngredients entry."""
+        return cls(el.get('id'), el.get('name') or el.get('originalName'), el.get('original'),
+                   el.get('amount'), el.get('unit'))
+
+    def to_dict(self, available=None):
+        """Response dict; `available` is added when given."""
+        out = {'id': self.id, 'name': self.name, 'original': self.original,
+               'amount': self.amount, 'unit': self.unit}
+        if available is not None:
+            out['available'] = available
+        return out
+
+
+def search_ingredients(candidate):
+    """Records for the used then missed ingredients of a findByIngredients candidate, with their availability."""
+    return ([(IngredientRecord.from_search(el), True) for el in candidate.get('usedIngredients') or []
+             if isinstance(el, dict)]
+            + [(IngredientRecord.from_search(el), False) for el in candidate.get('missedIngredients') or []
+               if isinstance(el, dict)])
+
+
+class RecipeRecord:
+    """
+    The fields of an `information` payload the app uses. Details (times,
+    summary, steps, nutrition...) are None on records built without them.
+    """
+
+    __slots__ = ('id', 'title', 'image', 'ingredients', 'ready_in_minutes', 'servings', 'summary',
+                 'dish_types', 'steps', 'nutrition', 'source_url')
+
+    def __init__(self, id, title=None, image=None, ingredients=(), ready_in_minutes=None, servings=None,
+                 summary=None, dish_types=None, steps=None, nutrition=None, source_url=None):
+        self.id = id
+        self.title = title
+        self.image = image
+        self.ingredients = tuple(ingredients)
+        self.ready_in_minutes = ready_in_minutes
+        self.servings = servings
+        self.summary = summary
+        self.dish_types = dish_types
+        self.steps = steps
+        self.nutrition = nutrition
+        self.source_url = source_url
+
+    @classmethod
+    def from_information(cls, payload, details=True, distinct=False):
+        """
+        Build a record from an `information` payload. `details=False` keeps only
+        id, title, image and ingredients; `distinct=True` keeps the first
+        ingredient of each canonical name.
+        """
+        ingredients = [IngredientRecord.from_information(el) for el in payload.get('extendedIngredients') or []
+                       if isinstance(el, dict)]
+        if distinct:
+            seen = set()
+            ingredients = [ing for ing in ingredients
+                           if ing.canonical and not (ing.canonical in seen or seen.add(ing.canonical))]
+        record = cls(payload.get('id'), payload.get('title'), payload.get('image'), ingredients)
+        if details:
+            record.ready_in_minutes = payload.get('readyInMinutes')
+            record.servings = payload.get('servings')
+            record.summary = payload.get('summary')
+            record.dish_types = payload.get('dishTypes')
+            ai = payload.get('analyzedInstructions')
+            if isinstance(ai, list) and ai and isinstance(ai[0], dict):
+                record.steps = ai[0].get('steps')
+            record.nutrition = payload.get('nutrition')
+            record.source_url = payload.get('sourceUrl') or payload.get('spoonacularSourceUrl')
+        return record
+
+    def canonical_names(self):
+        return frozenset(ing.canonical for ing in self.ingredients)
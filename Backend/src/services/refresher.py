@@ -0,0 +1,89 @@
+"""
+Background refresh worker for stale-while-revalidate caching.
+
+Callers that serve a stale cache entry hand the refresh job to
+`BackgroundRefresher.schedule(key, fn)`. Jobs run on a small thread pool and
+at most one refresh per key is queued or running at any time; further
+requests for the same key are counted as skipped. A job is considered
+successful when `fn()` returns a truthy value without raising.
+
+The pool is a ThreadPoolExecutor, whose workers are not daemon threads: at
+interpreter exit, refreshes already running are waited for.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _namespace(key):
+    return str(key).split(':', 1)[0]
+
+
+class BackgroundRefresher:
+    """Runs deduplicated refresh jobs on a bounded thread pool."""
+
+    def __init__(self, max_workers=2):
+        self.max_workers = max(1, int(max_workers))
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._executor = None
+        self._stats = {}
+
+    def _ns_stats(self, key):
+        ns = _namespace(key)
+        stats = self._stats.get(ns)
+        if stats is None:
+            stats = {'scheduled': 0, 'skipped': 0, 'succeeded': 0, 'failed': 0}
+            self._stats[ns] = stats
+        return stats
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='cache-refresh')
+        return self._executor
+
+    def schedule(self, key, fn):
+        """Queue `fn` to refresh `key`. Returns False if a refresh for `key` is already pending."""
+        with self._lock:
+            stats = self._ns_stats(key)
+            if key in self._pending:
+                stats['skipped'] += 1
+                return False
+            self._pending.add(key)
+            stats['scheduled'] += 1
+            executor = self._get_executor()
+        try:
+            executor.submit(self._run, key, fn)
+        except Exception:
+            with self._lock:
+                self._pending.discard(key)
+                stats['failed'] += 1
+            return False
+        return True
+
+    def _run(self, key, fn):
+        try:
+            ok = bool(fn())
+        except Exception:
+            ok = False
+        with self._lock:
+            self._pending.discard(key)
+            self._ns_stats(key)['succeeded' if ok else 'failed'] += 1
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def wait_idle(self, timeout=5.0):
+        """Block until no refresh is pending (mainly for tests and benchmarks)."""
+        deadline = time.monotonic() + timeout
+        while self.pending() and time.monotonic() < deadline:
+            time.sleep(0.005)
+        return self.pending() == 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'namespaces': {ns: dict(s) for ns, s in self._stats.items()},
+            }
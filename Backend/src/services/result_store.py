@@ -0,0 +1,210 @@
+"""
+Indexed on-disk store for encoded API responses.
+
+`ResultStore` keeps every entry as one row of a single SQLite file (WAL
+journal): the response body exactly as it will be sent, its creation time,
+its expiry, an optional integer `tag` describing the stored variant and an
+optional `count` of the entries the body holds. Hits return the stored
+bytes, so nothing is parsed or re-encoded on the way out.
+
+  - writes run in `BEGIN IMMEDIATE` transactions, so concurrent threads and
+    worker processes never interleave partial writes;
+  - expired rows are deleted by a sweep that piggybacks on writes every
+    `sweep_interval` seconds (and by `sweep()`);
+  - the total body size is kept in a counter table maintained by triggers,
+    and writes that push it over `max_bytes` evict the oldest rows first.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL,
+    tag INTEGER,
+    count INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_results_expires_at ON results (expires_at);
+CREATE INDEX IF NOT EXISTS idx_results_created_at ON results (created_at);
+CREATE TABLE IF NOT EXISTS results_meta (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    total_bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO results_meta (id, total_bytes) VALUES (1, 0);
+CREATE TRIGGER IF NOT EXISTS results_size_insert AFTER INSERT ON results BEGIN
+    UPDATE results_meta SET total_bytes = total_bytes + NEW.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS results_size_delete AFTER DELETE ON results BEGIN
+    UPDATE results_meta SET total_bytes = total_bytes - OLD.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS results_size_update AFTER UPDATE OF size ON results BEGIN
+    UPDATE results_meta SET total_bytes = total_bytes - OLD.size + NEW.size WHERE id = 1;
+END;
+"""
+
+# rows removed per statement when the size cap is exceeded
+_EVICT_BATCH = 64
+
+
+class ResultStore:
+    """Single-file SQLite store of encoded responses with TTL and a byte cap."""
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, sweep_interval=300, busy_timeout=5.0,
+                 clock=time.time):
+        self.path = path
+        self.max_bytes = max(1, int(max_bytes))
+        self.sweep_interval = sweep_interval
+        self.busy_timeout = busy_timeout
+        self._clock = clock
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._last_sweep = clock()
+        self._counters = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0, 'expirations': 0, 'errors': 0}
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        # files created before the tag / count columns existed
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(results)')]
+        for column in ('tag', 'count'):
+            if column not in columns:
+                conn.execute(f'ALTER TABLE results ADD COLUMN {column} INTEGER')
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            # truncate the WAL after checkpoints instead of letting it keep its peak size
+            conn.execute('PRAGMA journal_size_limit=16777216')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+
+    def get(self, key, now=None):
+        """Return `(body, created_at, tag, count)` for a live entry, or None."""
+        now = self._clock() if now is None else now
+        try:
+            row = self._conn().execute(
+                'SELECT body, created_at, tag, count FROM results '
+                'WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)',
+                (key, now),
+            ).fetchone()
+        except sqlite3.Error:
+            self._count('errors')
+            return None
+        if row is None:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return bytes(row[0]), row[1], row[2], row[3]
+
+    def put(self, key, body, ttl=None, now=None, tag=None, count=None):
+        """Store `body` (bytes) under `key` for `ttl` seconds. Returns False if it was not stored."""
+        now = self._clock() if now is None else now
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        size = len(body)
+        if size > self.max_bytes:
+            return False
+        expires_at = now + ttl if ttl is not None else None
+        conn = self._conn()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # an upsert (not INSERT OR REPLACE) so the size triggers see the old row
+                conn.execute(
+                    'INSERT INTO results (key, body, size, created_at, expires_at, tag, count) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT(key) DO UPDATE SET body = excluded.body, size = excluded.size, '
+                    'created_at = excluded.created_at, expires_at = excluded.expires_at, tag = excluded.tag, '
+                    'count = excluded.count',
+                    (key, sqlite3.Binary(body), size, now, expires_at, tag, count),
+                )
+                evicted = self._enforce_cap(conn, key)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error:
+            self._count('errors')
+            return False
+        self._count('writes')
+        if evicted:
+            self._count('evictions', evicted)
+        if self.sweep_interval is not None and now - self._last_sweep >= self.sweep_interval:
+            self.sweep(now)
+        return True
+
+    def _enforce_cap(self, conn, keep_key):
+        # evict the oldest rows until the overflow is covered
+        evicted = 0
+        overflow = self._total_bytes(conn) - self.max_bytes
+        while overflow > 0:
+            rows = conn.execute(
+                'SELECT key, size FROM results WHERE key != ? ORDER BY created_at LIMIT ?',
+                (keep_key, _EVICT_BATCH),
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for key, size in rows:
+                victims.append((key,))
+                overflow -= size
+                if overflow <= 0:
+                    break
+            conn.executemany('DELETE FROM results WHERE key = ?', victims)
+            evicted += len(victims)
+        return evicted
+
+    @staticmethod
+    def _total_bytes(conn):
+        return conn.execute('SELECT total_bytes FROM results_meta WHERE id = 1').fetchone()[0]
+
+    def delete(self, key):
+        try:
+            self._conn().execute('DELETE FROM results WHERE key = ?', (key,))
+        except sqlite3.Error:
+            self._count('errors')
+
+    def sweep(self, now=None):
+        """Delete every expired row. Returns how many were removed."""
+        now = self._clock() if now is None else now
+        self._last_sweep = now
+        try:
+            cur = self._conn().execute(
+                'DELETE FROM results WHERE expires_at IS NOT NULL AND expires_at <= ?', (now,)
+            )
+        except sqlite3.Error:
+            self._count('errors')
+            return 0
+        if cur.rowcount > 0:
+            self._count('expirations', cur.rowcount)
+        return max(cur.rowcount, 0)
+
+    def __len__(self):
+        return self._conn().execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        try:
+            conn = self._conn()
+            stats['entries'] = conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+            stats['bytes'] = self._total_bytes(conn)
+        except sqlite3.Error:
+            stats['entries'] = None
+            stats['bytes'] = None
+        stats['max_bytes'] = self.max_bytes
+        stats['path'] = self.path
+        return stats
@@ -0,0 +1,137 @@
+"""
+Host-local shared cache backends.
+
+A backend is the L2 behind `RecipeCache`: every worker process on the host
+reads and writes the same store, so a recipe fetched by one worker is a hit
+for the others. Backends implement:
+
+    get(key, now)                        -> (value, expires_at, stale_at) or None
+    set(key, value, expires_at, stale_at)
+    delete(key), clear(), sweep(now)     -> number of rows removed
+    stats()                              -> dict
+
+`SQLiteCacheBackend` keeps everything in one SQLite file in WAL mode, which
+allows concurrent readers alongside a single writer and needs no external
+service. Connections are per thread and re-opened after a fork.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from . import json_codec
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL,
+    stale_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_cache_entries_expires_at ON cache_entries (expires_at);
+"""
+
+
+class SQLiteCacheBackend:
+    """Shared key/value store in a single SQLite file (WAL journal)."""
+
+    def __init__(self, path, busy_timeout=5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counters = {'gets': 0, 'hits': 0, 'sets': 0, 'errors': 0}
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, key, now=None):
+        now = time.time() if now is None else now
+        self._count('gets')
+        try:
+            row = self._conn().execute(
+                'SELECT value, expires_at, stale_at FROM cache_entries WHERE key = ?', (key,)
+            ).fetchone()
+        except sqlite3.Error:
+            self._count('errors')
+            return None
+        if row is None:
+            return None
+        value, expires_at, stale_at = row
+        if expires_at is not None and expires_at <= now:
+            return None
+        self._count('hits')
+        return json_codec.loads(value), expires_at, stale_at
+
+    def set(self, key, value, expires_at=None, stale_at=None):
+        try:
+            raw = json_codec.dumps(value)
+            self._conn().execute(
+                'INSERT OR REPLACE INTO cache_entries (key, value, expires_at, stale_at) VALUES (?, ?, ?, ?)',
+                (key, raw, expires_at, stale_at),
+            )
+        except (sqlite3.Error, TypeError, ValueError):
+            self._count('errors')
+            return False
+        self._count('sets')
+        return True
+
+    def delete(self, key):
+        try:
+            self._conn().execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+        except sqlite3.Error:
+            self._count('errors')
+
+    def clear(self):
+        try:
+            self._conn().execute('DELETE FROM cache_entries')
+        except sqlite3.Error:
+            self._count('errors')
+
+    def sweep(self, now=None):
+        now = time.time() if now is None else now
+        try:
+            cur = self._conn().execute(
+                'DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?', (now,)
+            )
+            return cur.rowcount
+        except sqlite3.Error:
+            self._count('errors')
+            return 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        try:
+            stats['entries'] = self._conn().execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+        except sqlite3.Error:
+            stats['entries'] = None
+        stats['kind'] = 'sqlite'
+        stats['path'] = self.path
+        return stats
+
+
+def make_cache_backend(kind, path=None):
+    """Build the shared backend named by `kind` ('sqlite'), or None when disabled."""
+    kind = (kind or '').strip().lower()
+    if kind in ('', 'none', 'memory', 'local'):
+        return None
+    if kind == 'sqlite':
+        return SQLiteCacheBackend(path or os.path.join(os.getcwd(), 'cache', 'recipe_cache.sqlite3'))
+    raise ValueError(f'Unknown recipe cache backend: {kind}')
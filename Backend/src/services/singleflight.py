@@ -0,0 +1,70 @@
+"""
+Single-flight request coalescing.
+
+When several threads ask for the same key at the same time, only the first
+one (the leader) runs the function; the others block until it finishes and
+receive the same result. Exceptions raised by the leader are re-raised in
+every waiter, and error results returned as values (e.g. the controller's
+`(payload, status)` tuples) are shared like any other result.
+"""
+import threading
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'exc', 'waiters')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.exc = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._counters = {'executions': 0, 'coalesced': 0}
+
+    def do(self, key, fn):
+        """Run `fn()` once per in-flight `key` and return its result to every caller."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._counters['coalesced'] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._counters['executions'] += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.exc is not None:
+                raise call.exc
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.exc = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['in_flight'] = len(self._calls)
+        return stats
@@ -0,0 +1,26 @@
+"""
+Configuración compartida de pytest
+"""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def reset_upstream_guards(tmp_path, monkeypatch):
+    """Cada test empieza con el circuit breaker cerrado, la cuota de Spoonacular llena,
+    las cachés de Spoonacular vacías, el corpus local vacío (y sin sembrar) y un
+    almacén de resultados propio en tmp_path, nunca el `cache/` del directorio de trabajo"""
+    import src.controllers.recipe_controller as rc
+    rc._breaker.reset()
+    rc._limiter.reset()
+    rc._recipe_cache.clear()
+    rc._negative_cache.clear()
+    rc._corpus.clear()
+    monkeypatch.setitem(rc._corpus_state, 'seeded', False)
+    monkeypatch.setitem(rc._corpus_state, 'local_hits', 0)
+    monkeypatch.setitem(rc._corpus_state, 'local_misses', 0)
+    import src.routes.recipe_recomendation as routes
+    routes._encoded_bodies.clear()
+    monkeypatch.setenv('EP_RECIPE_CACHE_DIR', str(tmp_path / 'cache'))
+    yield
+    for path in [p for p in routes._result_stores if p.startswith(str(tmp_path))]:
+        routes._result_stores.pop(path, None)
@@ -0,0 +1,76 @@
+"""Tests para el circuit breaker (src/services/circuit_breaker.py)"""
+from src.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_breaker(**kwargs):
+    clock = FakeClock()
+    return CircuitBreaker(clock=clock, **kwargs), clock
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker, _ = make_breaker(failure_threshold=3)
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.state == CLOSED
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert breaker.allow() is False
+        assert breaker.stats()['rejected'] == 1
+
+    def test_success_resets_failure_streak(self):
+        breaker, _ = make_breaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+
+    def test_half_open_after_timeout_allows_one_probe(self):
+        breaker, clock = make_breaker(failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        clock.now += 30
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow() is True
+        assert breaker.allow() is False
+
+    def test_probe_success_closes(self):
+        breaker, clock = make_breaker(failure_threshold=1, reset_timeout=5)
+        breaker.record_failure()
+        clock.now += 5
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert breaker.stats()['transitions'] == {'closed->open': 1, 'open->half_open': 1, 'half_open->closed': 1}
+
+    def test_probe_failure_reopens(self):
+        breaker, clock = make_breaker(failure_threshold=1, reset_timeout=5)
+        breaker.record_failure()
+        clock.now += 5
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        clock.now += 4
+        assert breaker.allow() is False
+
+    def test_release_returns_probe_slot(self):
+        breaker, clock = make_breaker(failure_threshold=1, reset_timeout=5)
+        breaker.record_failure()
+        clock.now += 5
+        assert breaker.allow()
+        breaker.release()
+        assert breaker.allow() is True
+
+    def test_reset(self):
+        breaker, _ = make_breaker(failure_threshold=1)
+        breaker.record_failure()
+        breaker.reset()
+        assert breaker.state == CLOSED
+        assert breaker.stats()['consecutive_failures'] == 0
@@ -0,0 +1,86 @@
+"""Tests para la capa de datos (db.py)"""
+from types import SimpleNamespace
+
+import pytest
+
+import db
+from memory_db import MemoryClient, MemoryDatabase
+
+
+@pytest.fixture
+def mongo_env(monkeypatch):
+    """Motor real apuntando a un servidor que no existe (el cliente no conecta hasta usarse)"""
+    monkeypatch.setattr(db, 'MONGO_URI', 'mongodb://127.0.0.1:1/?directConnection=true')
+    monkeypatch.setattr(db, 'ENGINE', 'mongo')
+    db.close_client()
+    yield
+    db.close_client()
+
+
+class TestEngines:
+    def test_default_without_uri_is_disabled(self):
+        database = db.open_database('disabled')
+        assert database['items'].find({}) == []
+        with pytest.raises(RuntimeError):
+            database['items'].insert_one({})
+
+    def test_memory_engine(self):
+        database = db.open_database('memory')
+        assert isinstance(database, MemoryDatabase)
+        database['items'].insert_one({'name': 'Milk'})
+        assert database['items'].count_documents({}) == 1
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            db.open_database('sqlite')
+
+    def test_client_options(self):
+        options = db.client_options({'EP_MONGO_MAX_POOL_SIZE': '10', 'EP_MONGO_SERVER_API': ''})
+        assert options['maxPoolSize'] == 10
+        assert options['connect'] is False
+        assert 'server_api' not in options
+
+
+class TestProcessClient:
+    def test_client_is_lazy_and_shared(self, mongo_env):
+        assert db.pool_metrics()['connected'] is False
+        client = db.get_client()
+        assert db.get_client() is client
+        assert db.pool_metrics()['connected'] is True
+
+    def test_new_client_after_fork(self, mongo_env, monkeypatch):
+        client = db.get_client()
+        monkeypatch.setattr(db.os, 'getpid', lambda: -1)
+        assert db.get_client() is not client
+
+    def test_collection_proxy_follows_the_client(self, mongo_env, monkeypatch):
+        proxy = db.open_database('mongo')['items']
+        memory = MemoryClient()
+        monkeypatch.setattr(db, 'get_client', lambda: memory)
+        proxy.insert_one({'name': 'Milk'})
+        assert memory[db.DB_NAME]['items'].count_documents({}) == 1
+
+    def test_requires_uri(self, monkeypatch):
+        monkeypatch.setattr(db, 'MONGO_URI', '')
+        db.close_client()
+        with pytest.raises(RuntimeError):
+            db.get_client()
+
+
+class TestPoolMetrics:
+    def test_checkout_counters(self):
+        metrics = db.PoolMetrics()
+        event = SimpleNamespace()
+        metrics.connection_created(event)
+        metrics.connection_check_out_started(event)
+        metrics.connection_checked_out(event)
+        metrics.connection_check_out_started(event)
+        metrics.connection_checked_out(event)
+        metrics.connection_checked_in(event)
+        metrics.connection_check_out_failed(event)
+        snap = metrics.snapshot()
+        assert snap['connections_created'] == 1
+        assert snap['checkouts'] == 2
+        assert snap['in_use'] == 1 and snap['max_in_use'] == 2
+        assert snap['checkout_failures'] == 1
+        assert snap['wait_ms_avg'] >= 0
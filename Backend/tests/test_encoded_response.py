@@ -0,0 +1,47 @@
+"""Tests para los cuerpos pre-codificados (src/services/encoded_response.py)"""
+import gzip
+
+import pytest
+
+from src.services import encoded_response
+from src.services.encoded_response import EncodedBody, EncodedBodyCache
+
+
+class TestEncodedBody:
+    def test_etag_is_content_hash(self):
+        assert EncodedBody(b'[1,2]').etag == EncodedBody('[1,2]').etag
+        assert EncodedBody(b'[1,2]').etag != EncodedBody(b'[1,3]').etag
+
+    def test_gzip_variant_built_once(self):
+        encoded = EncodedBody(b'{"a":"' + b'x' * 5000 + b'"}')
+        first = encoded.variant('gzip')
+        assert gzip.decompress(first) == encoded.body
+        assert encoded.variant('gzip') is first
+        assert encoded.variant('identity') is encoded.body
+        assert encoded.variant(None) is encoded.body
+
+    def test_unsupported_encoding(self, monkeypatch):
+        monkeypatch.setattr(encoded_response, 'brotli', None)
+        with pytest.raises(ValueError):
+            EncodedBody(b'x').variant('br')
+        assert encoded_response.available_encodings() == ('gzip',)
+
+
+class TestEncodedBodyCache:
+    def test_version_must_match(self):
+        cache = EncodedBodyCache()
+        cache.put('k', b'body', version=1.5)
+        assert cache.get('k', 1.5).body == b'body'
+        assert cache.get('k', 2.0) is None
+
+    def test_lru_bounds(self):
+        cache = EncodedBodyCache(max_entries=2, max_bytes=10)
+        cache.put('a', b'1234')
+        cache.put('b', b'1234')
+        cache.get('a')
+        cache.put('c', b'1234')
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        cache.put('d', b'x' * 20)
+        assert len(cache) == 2
+        assert cache.stats()['evictions'] == 1
@@ -0,0 +1,228 @@
+"""Tests para el escáner de vencimientos (src/services/expiry_scanner.py)"""
+import datetime
+import time
+
+import pytest
+
+from memory_db import MemoryClient
+from src.models.indexes import ensure_indexes, explain_plan, index_backed
+from src.services.expiry_scanner import ExpiryScanner, collection_sink
+
+TODAY = datetime.date(2024, 6, 10)
+
+
+@pytest.fixture
+def database():
+    database = MemoryClient()['FridgeDB']
+    ensure_indexes(database)
+    return database
+
+
+def _item(user, name, expiration_date, status='active'):
+    return {'user_email': user, 'name': name, 'category': 'dairy', 'expiration_date': expiration_date,
+            'status': status}
+
+
+def _statuses(collection):
+    return {doc['name']: doc['status'] for doc in collection.find({})}
+
+
+class TestScanOnce:
+    """Tests para las transiciones de estado"""
+
+    def test_transitions(self, database):
+        items = database['items']
+        items.insert_many([
+            _item('a@x.com', 'Milk', '2024-06-01'),
+            _item('a@x.com', 'Eggs', '2024-06-12'),
+            _item('a@x.com', 'Ham', '2024-06-13T20:00:00'),
+            _item('b@x.com', 'Rice', '2025-01-01'),
+            _item('b@x.com', 'Yogurt', '2024-06-09', status='expiring'),
+            _item('b@x.com', 'Bread', '2024-06-02', status='consumed'),
+        ])
+        run = ExpiryScanner(items, warn_days=3).scan_once(TODAY)
+        assert _statuses(items) == {'Milk': 'expired', 'Eggs': 'expiring', 'Ham': 'expiring', 'Rice': 'active',
+                                    'Yogurt': 'expired', 'Bread': 'consumed'}
+        assert (run['expired'], run['expiring']) == (2, 2)
+        assert items.find_one({'name': 'Milk'})['status_changed_at'] is not None
+
+    def test_rerun_is_idempotent(self, database):
+        events = []
+        items = database['items']
+        items.insert_many([_item('a@x.com', 'Milk', '2024-06-01'), _item('a@x.com', 'Eggs', '2024-06-11')])
+        scanner = ExpiryScanner(items, notify=events.extend)
+        scanner.scan_once(TODAY)
+        run = scanner.scan_once(TODAY)
+        assert (run['scanned'], run['expired'], run['expiring'], run['events']) == (0, 0, 0, 0)
+        assert len(events) == 2
+        # once its date has passed, Eggs goes from expiring to expired
+        run = scanner.scan_once(TODAY + datetime.timedelta(days=2))
+        assert run['expired'] == 1
+        assert scanner.stats()['runs'] == 3
+
+    def test_processes_in_batches(self, database):
+        items = database['items']
+        items.insert_many([_item(f'u{i % 3}@x.com', f'Item {i}', '2024-06-01') for i in range(25)])
+        writes = []
+        original = items.bulk_write
+        items.bulk_write = lambda ops, **kwargs: writes.append(len(ops)) or original(ops, **kwargs)
+        run = ExpiryScanner(items, batch_size=10).scan_once(TODAY)
+        assert writes == [10, 10, 5]
+        assert run['expired'] == 25
+
+    def test_only_changed_documents_are_notified(self, database):
+        events = []
+        items = database['items']
+        items.insert_many([_item('a@x.com', 'Milk', '2024-06-01'), _item('a@x.com', 'Eggs', '2024-06-02')])
+        original = items.bulk_write
+
+        def concurrent_scanner(ops, **kwargs):
+            # another process marks Milk first
+            items.update_one({'name': 'Milk'}, {'$set': {'status': 'expired'}})
+            return original(ops, **kwargs)
+
+        items.bulk_write = concurrent_scanner
+        run = ExpiryScanner(items, notify=events.extend).scan_once(TODAY)
+        assert run['expired'] == 1
+        assert [i['name'] for e in events for i in e['items']] == ['Eggs']
+
+
+class TestNotifications:
+    """Tests para los eventos de notificación agrupados por usuario"""
+
+    def test_events_grouped_per_user_and_type(self, database):
+        calls = []
+        items = database['items']
+        items.insert_many([
+            _item('a@x.com', 'Milk', '2024-06-01'),
+            _item('a@x.com', 'Cheese', '2024-06-05'),
+            _item('a@x.com', 'Eggs', '2024-06-11'),
+            _item('b@x.com', 'Rice', '2024-06-03'),
+        ])
+        ExpiryScanner(items, notify=calls.append).scan_once(TODAY)
+        assert len(calls) == 1
+        grouped = {(e['user_email'], e['type']): sorted(i['name'] for i in e['items']) for e in calls[0]}
+        assert grouped == {('a@x.com', 'items_expired'): ['Cheese', 'Milk'],
+                           ('a@x.com', 'items_expiring'): ['Eggs'],
+                           ('b@x.com', 'items_expired'): ['Rice']}
+
+    def test_flushes_every_notify_batch_size(self, database):
+        calls = []
+        items = database['items']
+        items.insert_many([_item('a@x.com', f'Item {i}', '2024-06-01') for i in range(12)])
+        ExpiryScanner(items, notify=calls.append, batch_size=5, notify_batch_size=5).scan_once(TODAY)
+        assert [sum(len(e['items']) for e in events) for events in calls] == [5, 5, 2]
+
+    def test_collection_sink(self, database):
+        database['items'].insert_one(_item('a@x.com', 'Milk', '2024-06-01'))
+        ExpiryScanner(database['items'], notify=collection_sink(database['notifications'])).scan_once(TODAY)
+        stored = database['notifications'].find_one({'user_email': 'a@x.com'})
+        assert stored['type'] == 'items_expired'
+        assert stored['items'] == [{'name': 'Milk', 'expiration_date': '2024-06-01'}]
+
+    def test_notify_error_does_not_stop_the_scan(self, database):
+        def failing(events):
+            raise RuntimeError('queue down')
+
+        database['items'].insert_one(_item('a@x.com', 'Milk', '2024-06-01'))
+        scanner = ExpiryScanner(database['items'], notify=failing)
+        run = scanner.scan_once(TODAY)
+        assert (run['expired'], run['notify_errors']) == (1, 1)
+        assert scanner.stats()['notify_errors'] == 1
+        assert scanner.stats()['outbox'] == 1
+
+    def test_failed_events_are_sent_on_the_next_flush(self, database):
+        delivered = []
+        fail = [True]
+
+        def flaky(events):
+            if fail[0]:
+                raise RuntimeError('queue down')
+            delivered.extend(events)
+
+        items = database['items']
+        items.insert_many([_item('a@x.com', 'Milk', '2024-06-01'), _item('b@x.com', 'Rice', '2024-06-02')])
+        scanner = ExpiryScanner(items, notify=flaky)
+        scanner.scan_once(TODAY)
+        assert delivered == [] and scanner.stats()['outbox'] == 2
+        # the items are already expired: only the outbox can still deliver them
+        fail[0] = False
+        run = scanner.scan_once(TODAY)
+        assert run['scanned'] == 0 and run['events'] == 2
+        assert sorted(e['user_email'] for e in delivered) == ['a@x.com', 'b@x.com']
+        assert scanner.stats()['outbox'] == 0
+
+    def test_collection_sink_retry_after_partial_insert(self, database):
+        notifications = database['notifications']
+        events = [{'user_email': 'a@x.com'}, {'user_email': 'b@x.com'}]
+        # the first attempt stores one event and then loses the connection
+        notifications.insert_many(events[:1])
+        notify = collection_sink(notifications)
+        # the retried batch only hits the duplicate _id of the event already stored
+        notify(events)
+        assert notifications.count_documents({}) == 2
+
+    def test_marked_items_are_notified_when_the_scan_fails(self, database):
+        events = []
+        items = database['items']
+        items.insert_many([_item('a@x.com', 'Milk', '2024-06-01'), _item('a@x.com', 'Eggs', '2024-06-11')])
+        original = items.find
+
+        def find(query, *args, **kwargs):
+            if query.get('status') == 'active':
+                raise RuntimeError('connection lost')
+            return original(query, *args, **kwargs)
+
+        items.find = find
+        with pytest.raises(RuntimeError):
+            ExpiryScanner(items, notify=events.extend).scan_once(TODAY)
+        assert [i['name'] for e in events for i in e['items']] == ['Milk']
+
+    def test_outbox_is_bounded(self, database):
+        def failing(events):
+            raise RuntimeError('queue down')
+
+        items = database['items']
+        items.insert_many([_item(f'u{i}@x.com', f'Item {i}', '2024-06-01') for i in range(5)])
+        scanner = ExpiryScanner(items, notify=failing, max_outbox_events=3)
+        run = scanner.scan_once(TODAY)
+        assert run['dropped_events'] == 2
+        assert scanner.stats()['outbox'] == 3
+
+
+class TestQueryPlans:
+    """Las consultas del escáner deben usar el índice status_1_expiration_date_1"""
+
+    @pytest.mark.parametrize('query', [
+        {'status': {'$in': ['active', 'expiring']}, 'expiration_date': {'$lt': '2024-06-10'}},
+        {'status': 'active', 'expiration_date': {'$gte': '2024-06-10', '$lt': '2024-06-14'}},
+    ])
+    def test_index_backed(self, database, query):
+        plan = explain_plan(database['items'], query)
+        assert index_backed(plan)
+        assert plan['inputStage']['indexName'] == 'status_1_expiration_date_1'
+
+
+class TestScheduling:
+    """Tests para start/stop"""
+
+    def test_start_scans_and_stop(self, database):
+        database['items'].insert_one(_item('a@x.com', 'Milk', '2024-06-01'))
+        scanner = ExpiryScanner(database['items'], clock=lambda: TODAY)
+        assert scanner.start(interval=60) is True
+        assert scanner.start(interval=60) is False
+        deadline = time.monotonic() + 5
+        while scanner.stats()['runs'] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        scanner.stop()
+        assert scanner.stats()['running'] is False
+        assert database['items'].find_one({'name': 'Milk'})['status'] == 'expired'
+
+    def test_failed_run_is_counted(self, database):
+        scanner = ExpiryScanner(None, clock=lambda: TODAY)
+        scanner.start(interval=60)
+        deadline = time.monotonic() + 5
+        while scanner.stats()['failed_runs'] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        scanner.stop()
+        assert scanner.stats()['failed_runs'] == 1
@@ -0,0 +1,123 @@
+"""Tests para el servidor Spoonacular falso (benchmarks/fake_spoonacular.py)"""
+import random
+
+import pytest
+import requests
+from flask import Flask
+
+from benchmarks.fake_spoonacular import FixtureStore, LatencyModel, fixture_key, start_fake_server
+
+
+@pytest.fixture
+def fake():
+    servers = []
+
+    def start(**kwargs):
+        server, base_url = start_fake_server(seed=1, **kwargs)
+        servers.append(server)
+        return server, base_url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+class TestLatencyModel:
+    def test_parse_plain_number(self):
+        model = LatencyModel.parse('0.05')
+        assert model.sample(random.Random(0)) == 0.05
+
+    def test_uniform_within_bounds(self):
+        model = LatencyModel.parse('uniform:0.01,0.02')
+        rng = random.Random(0)
+        assert all(0.01 <= model.sample(rng) <= 0.02 for _ in range(100))
+
+    def test_lognormal_never_negative(self):
+        model = LatencyModel.parse('lognormal:0.05,1.0')
+        rng = random.Random(0)
+        assert all(model.sample(rng) >= 0 for _ in range(100))
+
+    def test_invalid_spec(self):
+        with pytest.raises(ValueError):
+            LatencyModel.parse('uniform:0.1')
+
+
+class TestFixtureStore:
+    def test_key_ignores_api_key_and_order(self):
+        a = fixture_key('/recipes/1/information', {'apiKey': 'x', 'includeNutrition': 'true'})
+        b = fixture_key('/recipes/1/information/', {'includeNutrition': 'true', 'apiKey': 'y'})
+        assert a == b
+
+    def test_save_and_load(self, tmp_path):
+        store = FixtureStore(str(tmp_path))
+        store.save('/recipes/1/information', {'includeNutrition': 'true'}, 200, {'id': 1})
+        assert store.load('/recipes/1/information', {'includeNutrition': 'true', 'apiKey': 'k'}) == (200, {'id': 1})
+        assert store.load('/recipes/2/information', {'includeNutrition': 'true'}) is None
+        assert len(store) == 1
+
+
+class TestFakeServer:
+    def test_synthetic_endpoints(self, fake):
+        server, base = fake()
+        found = requests.get(f'{base}/recipes/findByIngredients',
+                             params={'ingredients': 'rice,egg', 'number': 3}).json()
+        assert len(found) == 3
+        assert found[0]['usedIngredients'][0]['name'] == 'rice'
+        bulk = requests.get(f'{base}/recipes/informationBulk', params={'ids': '5,6'}).json()
+        assert [r['id'] for r in bulk] == [5, 6]
+        info = requests.get(f'{base}/recipes/7/information', params={'includeNutrition': 'true'}).json()
+        assert info['id'] == 7 and 'nutrition' in info
+        assert server.hits == 3
+
+    def test_error_and_429_injection(self, fake):
+        server, base = fake(rate_429=1.0, retry_after=3)
+        resp = requests.get(f'{base}/recipes/1/information')
+        assert resp.status_code == 429
+        assert resp.headers['Retry-After'] == '3'
+
+        server, base = fake(error_rate=1.0)
+        assert requests.get(f'{base}/recipes/1/information').status_code == 500
+        assert server.status_counts == {500: 1}
+
+    def test_daily_points_headers_and_402(self, fake):
+        server, base = fake(daily_points=2)
+        first = requests.get(f'{base}/recipes/1/information')
+        assert first.headers['X-API-Quota-Used'] == '1'
+        assert first.headers['X-API-Quota-Left'] == '1'
+        requests.get(f'{base}/recipes/2/information')
+        assert requests.get(f'{base}/recipes/3/information').status_code == 402
+
+    def test_record_then_replay(self, fake, tmp_path):
+        """Graba contra un upstream y luego reproduce sin él"""
+        upstream, upstream_url = fake()
+        fixtures = str(tmp_path / 'fixtures')
+        recorder, recorder_url = fake(fixtures_dir=fixtures, record_from=upstream_url, api_key='secret')
+
+        recorded = requests.get(f'{recorder_url}/recipes/informationBulk',
+                                params={'ids': '11,12', 'includeNutrition': 'false'}).json()
+        assert upstream.hits == 1
+        assert recorder.recorded == 1
+
+        replayer, replay_url = fake(fixtures_dir=fixtures)
+        assert requests.get(f'{replay_url}/recipes/informationBulk',
+                            params={'ids': '11,12', 'includeNutrition': 'false'}).json() == recorded
+        # los ids del bulk también quedan como fixtures individuales
+        single = requests.get(f'{replay_url}/recipes/12/information', params={'includeNutrition': 'false'})
+        assert single.json() == recorded[1]
+        assert replayer.replayed == 2
+
+    def test_backend_against_fake_server(self, fake):
+        """El controlador funciona apuntando SPOONACULAR_URL_BASE al servidor falso"""
+        from src.controllers.recipe_controller import get_recipe_information, get_recipes_by_ingredients
+        server, base = fake()
+        app = Flask(__name__)
+        app.config.update(SPOONACULAR_API_KEY='test', SPOONACULAR_URL_BASE=base, RECIPE_CACHE_TTL=60)
+
+        with app.app_context():
+            found = get_recipes_by_ingredients(['fake-server-kale', 'fake-server-leek'], number=4)
+            info = get_recipe_information(987654)
+
+        assert len(found) == 4
+        assert info['id'] == 987654
+        assert server.hits == 2
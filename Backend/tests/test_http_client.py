@@ -0,0 +1,107 @@
+"""Tests para el cliente HTTP compartido (http_client.py)"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.services.http_client import UpstreamClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body are separate writes; avoid Nagle/delayed-ACK stalls on keep-alive
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits += 1
+            status = server.statuses.pop(0) if server.statuses else 200
+        raw = json.dumps({'ok': status == 200}).encode('utf-8')
+        self.send_response(status)
+        if status == 429:
+            self.send_header('Retry-After', str(server.retry_after))
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    srv.daemon_threads = True
+    srv.lock = threading.Lock()
+    srv.hits = 0
+    srv.statuses = []
+    srv.retry_after = 0
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    srv.url = f'http://127.0.0.1:{srv.server_address[1]}'
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+class TestUpstreamClient:
+    """Tests del pool de conexiones y reintentos"""
+
+    def test_reuses_keep_alive_connection(self, server):
+        client = UpstreamClient(backoff_factor=0)
+        for _ in range(5):
+            resp = client.get(server.url + '/recipes/1/information', params={'apiKey': 'x'})
+            assert resp.status_code == 200
+        stats = client.stats()
+        assert stats['requests'] == 5
+        assert stats['connections_created'] == 1
+        assert stats['connections_reused'] == 4
+        client.close()
+
+    def test_retries_on_429_and_5xx(self, server):
+        server.statuses = [429, 503]
+        client = UpstreamClient(retries=2, backoff_factor=0, backoff_jitter=0)
+        resp = client.get(server.url + '/recipes/findByIngredients')
+        assert resp.status_code == 200
+        assert server.hits == 3
+        assert client.stats()['retries'] == 2
+        client.close()
+
+    def test_long_retry_after_is_capped(self, server):
+        server.statuses = [429, 429, 429]
+        server.retry_after = 20
+        client = UpstreamClient(read_timeout=1, retries=2, max_retry_wait=0.25)
+        start = time.monotonic()
+        resp = client.get(server.url + '/recipes/findByIngredients')
+        assert time.monotonic() - start < 1
+        assert resp.status_code == 429
+        assert server.hits == 3
+        client.close()
+
+    def test_status_retries_disabled(self, server):
+        """Con status_retries=0 un 429/5xx no se repite (cada respuesta gasta puntos)"""
+        server.statuses = [429]
+        client = UpstreamClient(retries=2, status_retries=0, backoff_factor=0, backoff_jitter=0)
+        resp = client.get(server.url + '/recipes/findByIngredients')
+        assert resp.status_code == 429
+        assert server.hits == 1
+        assert client.stats()['retries'] == 0
+        client.close()
+
+    def test_returns_last_response_when_retries_exhausted(self, server):
+        server.statuses = [500, 500, 500]
+        client = UpstreamClient(retries=1, backoff_factor=0, backoff_jitter=0)
+        resp = client.get(server.url + '/recipes/findByIngredients')
+        assert resp.status_code == 500
+        assert server.hits == 2
+        client.close()
+
+    def test_connection_error_is_raised(self):
+        client = UpstreamClient(retries=0, connect_timeout=0.5)
+        with pytest.raises(Exception):
+            client.get('http://127.0.0.1:1/recipes/findByIngredients')
+        assert client.stats()['errors'] == 1
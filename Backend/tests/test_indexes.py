@@ -0,0 +1,93 @@
+"""Tests para la declaración de índices y el plan de las consultas de los modelos"""
+import pytest
+
+from memory_db import MemoryClient
+from src.models.indexes import INDEXES, ensure_indexes, explain_plan, index_backed
+
+
+class TestEnsureIndexes:
+    def test_creates_then_keeps(self):
+        database = MemoryClient()['FridgeDB']
+        report = ensure_indexes(database)
+        assert report['users']['created'] == ['email_1']
+        assert sorted(report['items']['created']) == ['status_1_expiration_date_1', 'user_email_1_expiration_date_1',
+                                                      'user_email_1_name_1']
+        assert database['users'].index_information()['email_1']['unique'] is True
+        report = ensure_indexes(database)
+        assert all(not r['created'] and not r['rebuilt'] for r in report.values())
+
+    def test_rebuilds_changed_and_drops_unknown(self):
+        database = MemoryClient()['FridgeDB']
+        database['users'].create_index('email', name='legacy_email')
+        database['users'].create_index('name')
+        report = ensure_indexes(database, drop_unknown=True)
+        assert report['users']['rebuilt'] == ['email_1']
+        assert report['users']['dropped'] == ['name_1']
+        assert set(database['users'].index_information()) == {'_id_', 'email_1'}
+
+    def test_failure_is_reported(self):
+        database = MemoryClient()['FridgeDB']
+        database['users'].insert_many([{'email': 'a@x.com'}, {'email': 'a@x.com'}])
+        report = ensure_indexes(database)
+        assert report['users']['failed'][0][0] == 'email_1'
+        assert report['items']['created']
+
+
+class _Recorder:
+    """Colección que anota los filtros (y el orden) de cada consulta que hace un modelo"""
+
+    def __init__(self, collection, log):
+        self._collection = collection
+        self._log = log
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name not in ('find', 'find_one', 'update_one', 'update_many', 'delete_one', 'delete_many',
+                        'count_documents'):
+            return attr
+
+        def call(filter=None, *args, **kwargs):
+            self._log.append((self._collection.name, name, filter or {}, kwargs.get('sort')))
+            return attr(filter, *args, **kwargs)
+        return call
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """Modelos sobre colecciones en memoria con los índices declarados"""
+    import src.models.items as items
+    import src.models.recipes as recipes
+    import src.models.users as users
+    database = MemoryClient()['FridgeDB']
+    ensure_indexes(database)
+    log = []
+    monkeypatch.setattr(users, 'users_collection', _Recorder(database['users'], log))
+    monkeypatch.setattr(items, 'items_collection', _Recorder(database['items'], log))
+    monkeypatch.setattr(recipes, 'recipes_collection', _Recorder(database['recipes'], log))
+    return database, log
+
+
+def _scans(database, log):
+    # a listing of the whole collection without order is a scan by definition
+    return [(coll, op, query) for coll, op, query, sort in log
+            if (query or sort) and not index_backed(explain_plan(database[coll], query, sort))]
+
+
+class TestModelQueriesUseIndexes:
+    def test_every_model_query_is_index_backed(self, recorded):
+        from src.models import items, recipes, users
+        database, log = recorded
+        users.register_user('Ana', 'ana@x.com', 'secret')
+        users.authenticate_user('ANA@x.com', 'secret')
+        users.page_users(limit=10)
+        items.create_item('ana@x.com', 'Milk', 'dairy', '2024-12-31')
+        items.list_items('ana@x.com')
+        items.page_items('ana@x.com', limit=10)
+        items.update_item_status('Milk', 'consumed', 'ana@x.com')
+        recipes.page_recipes(limit=10)
+        assert len(log) >= 7
+        assert _scans(database, log) == []
+
+
+def test_declared_indexes_have_names():
+    assert all(spec['name'] for specs in INDEXES.values() for spec in specs)
@@ -0,0 +1,61 @@
+"""Tests para la canonicalización de ingredientes (src/services/ingredients.py)"""
+import pytest
+
+from src.services.ingredients import (
+    canonical_ingredient,
+    canonicalize_ingredients,
+    ingredient_key,
+    singularize,
+)
+
+
+class TestSingularize:
+    @pytest.mark.parametrize('word,expected', [
+        ('tomatoes', 'tomato'),
+        ('cherries', 'cherry'),
+        ('peaches', 'peach'),
+        ('eggs', 'egg'),
+        ('leaves', 'leaf'),
+        ('cookies', 'cookie'),
+        ('glass', 'glass'),
+        ('asparagus', 'asparagus'),
+        ('rice', 'rice'),
+        ('peas', 'pea'),
+        ('kiwis', 'kiwi'),
+        ('chilis', 'chili'),
+        ('quiches', 'quiche'),
+        ('glazes', 'glaze'),
+        ('haggis', 'haggis'),
+    ])
+    def test_singular(self, word, expected):
+        assert singularize(word) == expected
+
+
+class TestCanonicalIngredient:
+    def test_trims_and_lowercases(self):
+        assert canonical_ingredient('  Tomato ') == 'tomato'
+
+    def test_plural_and_variety(self):
+        assert canonical_ingredient('Tomatoes') == 'tomato'
+        assert canonical_ingredient('roma tomato') == 'tomato'
+        assert canonical_ingredient('Roma  Tomatoes!') == 'tomato'
+
+    def test_only_last_word_is_singularized(self):
+        assert canonical_ingredient('bay leaves') == 'bay leaf'
+        assert canonical_ingredient('cherry tomatoes') == 'cherry tomato'
+
+    def test_synonyms(self):
+        assert canonical_ingredient('Scallions') == 'green onion'
+        assert canonical_ingredient('garbanzo beans') == 'chickpea'
+
+    def test_blank(self):
+        assert canonical_ingredient(None) == ''
+        assert canonical_ingredient('   ') == ''
+
+
+class TestCanonicalizeIngredients:
+    def test_dedupes_keeping_first(self):
+        assert canonicalize_ingredients(['Tomatoes', 'rice', 'tomato ', '', 'roma tomato']) == ['tomato', 'rice']
+
+    def test_key_is_order_independent(self):
+        assert ingredient_key(['Rice', 'tomatoes']) == ingredient_key(['tomato', 'rice ']) == 'rice,tomato'
@@ -0,0 +1,110 @@
+"""Tests para el codificador JSON (src/services/json_codec.py), con y sin orjson"""
+import dataclasses
+import datetime
+import decimal
+import json
+import uuid
+from unittest.mock import patch
+
+import pytest
+from flask import Flask, jsonify, request
+
+from src.services import json_codec
+from src.services.json_codec import FastJSONProvider
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def codec(request, monkeypatch):
+    """El mismo módulo con orjson (si está instalado) y con la librería estándar"""
+    if request.param == 'orjson':
+        if json_codec.orjson is None:
+            pytest.skip('orjson no está instalado')
+    else:
+        monkeypatch.setattr(json_codec, 'orjson', None)
+    return json_codec
+
+
+RECIPE = {
+    'id': 716429,
+    'title': 'Pasta con coliflor, ajo y pan rallado',
+    'readyInMinutes': 45,
+    'extendedIngredients': [{'id': 1001, 'name': 'butter', 'amount': 1.5, 'unit': 'tbsp'}],
+    'nutrition': {'nutrients': [{'name': 'Calories', 'amount': 584.46}]},
+    'cheap': False,
+    'image': None,
+}
+
+
+class TestCodec:
+    def test_round_trip_matches_stdlib(self, codec):
+        encoded = codec.dumps(RECIPE)
+        assert isinstance(encoded, bytes)
+        assert encoded == json.dumps(RECIPE, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        assert codec.loads(encoded) == RECIPE
+        assert codec.loads(encoded.decode('utf-8')) == RECIPE
+
+    def test_sort_keys(self, codec):
+        assert codec.dumps({'b': 1, 'a': {'d': 2, 'c': 3}}, sort_keys=True) == b'{"a":{"c":3,"d":2},"b":1}'
+
+    def test_flask_conversions(self, codec):
+        value = {'when': datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+                 'price': decimal.Decimal('1.50')}
+        assert codec.loads(codec.dumps(value)) == {'when': 'Tue, 02 Jan 2024 03:04:05 GMT', 'price': '1.50'}
+
+    def test_uuid_dataclass_and_date(self, codec):
+        @dataclasses.dataclass
+        class Point:
+            x: int
+
+        value = {'id': uuid.UUID(int=1), 'point': Point(2), 'day': datetime.date(2024, 1, 2)}
+        assert codec.loads(codec.dumps(value)) == {'id': '00000000-0000-0000-0000-000000000001',
+                                                   'point': {'x': 2}, 'day': 'Tue, 02 Jan 2024 00:00:00 GMT'}
+
+    def test_orjson_is_used_when_installed(self):
+        orjson = pytest.importorskip('orjson')
+        assert json_codec.backend() == 'orjson'
+        with patch.object(json_codec.orjson, 'dumps', wraps=orjson.dumps) as dumps:
+            json_codec.dumps(RECIPE)
+        assert dumps.called
+
+    def test_big_integers(self, codec):
+        assert codec.loads(codec.dumps({'n': 2 ** 70})) == {'n': 2 ** 70}
+
+    def test_unserializable(self, codec):
+        with pytest.raises(TypeError):
+            codec.dumps({'x': object()})
+
+    def test_invalid_json(self, codec):
+        with pytest.raises(ValueError):
+            codec.loads(b'{"a":')
+
+
+class TestFastJSONProvider:
+    @pytest.fixture
+    def client(self, codec):
+        app = Flask(__name__)
+        app.json = FastJSONProvider(app)
+
+        @app.route('/echo', methods=['POST'])
+        def echo():
+            return jsonify(request.get_json())
+
+        return app.test_client()
+
+    def test_jsonify_same_bytes_as_default(self, client):
+        expected = Flask(__name__)
+        with expected.app_context():
+            body = jsonify(RECIPE).get_data()
+        resp = client.post('/echo', json=RECIPE)
+        assert resp.mimetype == 'application/json'
+        assert resp.get_json() == RECIPE
+        # el JSON por defecto de Flask escapa lo no-ASCII; el contenido es el mismo
+        assert json.loads(resp.get_data()) == json.loads(body)
+        assert resp.get_data().endswith(b'\n')
+
+    def test_debug_pretty_prints(self, codec):
+        app = Flask(__name__)
+        app.json = FastJSONProvider(app)
+        app.debug = True
+        with app.app_context():
+            assert b'\n  "a": 1' in jsonify({'a': 1}).get_data()
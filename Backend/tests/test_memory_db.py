@@ -0,0 +1,129 @@
+"""Tests para el motor en memoria (memory_db.py)"""
+import datetime
+import re
+
+import pytest
+from pymongo import ASCENDING, DESCENDING, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from memory_db import MemoryClient
+
+
+@pytest.fixture
+def items():
+    collection = MemoryClient()['FridgeDB']['items']
+    collection.insert_many([
+        {'user_email': 'a@x.com', 'name': 'Milk', 'status': 'active', 'days': 3, 'tags': ['dairy']},
+        {'user_email': 'a@x.com', 'name': 'Eggs', 'status': 'expired', 'days': -1, 'tags': ['protein']},
+        {'user_email': 'b@x.com', 'name': 'Bread', 'status': 'active', 'days': 1},
+    ])
+    return collection
+
+
+class TestReads:
+    def test_filters_and_projection(self, items):
+        docs = list(items.find({'user_email': 'a@x.com'}, {'_id': 0}))
+        assert [d['name'] for d in docs] == ['Milk', 'Eggs']
+        assert '_id' not in docs[0]
+        assert list(items.find({'days': {'$gte': 1}}, {'name': 1, '_id': 0})) == [{'name': 'Milk'}, {'name': 'Bread'}]
+
+    def test_id_only_projection(self, items):
+        docs = list(items.find({}, {'_id': 1}))
+        assert len(docs) == 3
+        assert all(list(d) == ['_id'] for d in docs)
+        assert '_id' not in items.find_one({}, {'_id': 0}) and 'name' in items.find_one({}, {'_id': 0})
+
+    def test_operators(self, items):
+        assert items.count_documents({'status': {'$in': ['expired']}}) == 1
+        assert items.count_documents({'tags': 'dairy'}) == 1
+        assert items.count_documents({'tags': {'$exists': False}}) == 1
+        assert items.count_documents({'$or': [{'days': {'$lt': 0}}, {'name': 'Bread'}]}) == 2
+        assert items.count_documents({'name': {'$regex': '^m', '$options': 'i'}}) == 1
+        assert items.count_documents({'name': re.compile('read')}) == 1
+        assert items.count_documents({'days': {'$gt': 'a'}}) == 0  # distintos tipos no se comparan
+
+    def test_sort_skip_limit(self, items):
+        names = [d['name'] for d in items.find({}).sort([('status', ASCENDING), ('days', DESCENDING)]).skip(1).limit(1)]
+        assert names == ['Bread']
+
+    def test_returned_documents_are_copies(self, items):
+        doc = items.find_one({'name': 'Milk'})
+        doc['tags'].append('x')
+        assert items.find_one({'name': 'Milk'})['tags'] == ['dairy']
+
+
+class TestWrites:
+    def test_insert_sets_id_on_caller_document(self, items):
+        doc = {'name': 'Jam'}
+        result = items.insert_one(doc)
+        assert doc['_id'] == result.inserted_id
+        assert items.find_one(result.inserted_id)['name'] == 'Jam'
+
+    def test_update_and_upsert(self, items):
+        result = items.update_many({'user_email': 'a@x.com'}, {'$set': {'status': 'active'}, '$inc': {'days': 1}})
+        assert (result.matched_count, result.modified_count) == (2, 2)
+        result = items.update_one({'name': 'Rice'}, {'$set': {'status': 'active'}, '$setOnInsert': {'days': 30}},
+                                  upsert=True)
+        assert result.upserted_id is not None and result.matched_count == 0
+        assert items.find_one({'name': 'Rice'}, {'_id': 0}) == {'name': 'Rice', 'status': 'active', 'days': 30}
+        assert items.update_one({'name': 'Milk'}, {'$set': {'status': 'active'}}).modified_count == 0
+
+    def test_update_requires_operators(self, items):
+        with pytest.raises(ValueError):
+            items.update_one({'name': 'Milk'}, {'status': 'x'})
+
+    def test_unique_index(self, items):
+        items.create_index([('user_email', ASCENDING), ('name', ASCENDING)], unique=True)
+        with pytest.raises(DuplicateKeyError):
+            items.insert_one({'user_email': 'a@x.com', 'name': 'Milk'})
+        with pytest.raises(DuplicateKeyError):
+            items.update_one({'name': 'Eggs'}, {'$set': {'name': 'Milk'}})
+        items.delete_one({'name': 'Milk'})
+        items.insert_one({'user_email': 'a@x.com', 'name': 'Milk'})
+        assert 'user_email_1_name_1' in items.index_information()
+
+    def test_insert_many_unordered_reports_each_error(self, items):
+        items.create_index('name', unique=True)
+        with pytest.raises(BulkWriteError) as info:
+            items.insert_many([{'name': 'Milk'}, {'name': 'Jam'}, {'name': 'Eggs'}, {'name': 'Tea'}], ordered=False)
+        details = info.value.details
+        assert [e['index'] for e in details['writeErrors']] == [0, 2]
+        assert details['nInserted'] == 2
+        assert items.count_documents({}) == 5
+
+    def test_ordered_bulk_stops_at_first_error(self, items):
+        items.create_index('name', unique=True)
+        with pytest.raises(BulkWriteError) as info:
+            items.bulk_write([InsertOne({'name': 'Jam'}), InsertOne({'name': 'Milk'}), InsertOne({'name': 'Tea'})])
+        assert info.value.details['nInserted'] == 1
+        assert items.count_documents({'name': 'Tea'}) == 0
+
+    def test_bulk_write_counts(self, items):
+        result = items.bulk_write([
+            UpdateMany({'status': 'active'}, {'$set': {'status': 'expiring'}}),
+            UpdateOne({'name': 'Tea'}, {'$set': {'days': 9}}, upsert=True),
+            ReplaceOne({'name': 'Eggs'}, {'name': 'Eggs', 'status': 'gone'}),
+            DeleteOne({'name': 'Bread'}),
+        ])
+        assert result.matched_count == 3
+        assert result.modified_count == 3
+        assert result.upserted_count == 1
+        assert result.deleted_count == 1
+        assert items.find_one({'name': 'Eggs'}, {'_id': 0}) == {'name': 'Eggs', 'status': 'gone'}
+
+    def test_datetimes_compare(self, items):
+        now = datetime.datetime(2024, 1, 1)
+        items.insert_one({'name': 'Yogurt', 'expiration_date': now})
+        assert items.count_documents({'expiration_date': {'$lte': now + datetime.timedelta(days=1)}}) == 1
+
+
+class TestModelsOnMemoryEngine:
+    """Los modelos funcionan sobre el motor en memoria sin servidor"""
+
+    def test_items_model(self, monkeypatch):
+        import src.models.items as items_model
+        monkeypatch.setattr(items_model, 'items_collection', MemoryClient()['FridgeDB']['items'])
+        assert 'message' in items_model.create_item('A@X.com', 'Milk', 'dairy', '2024-12-31')
+        assert [i['name'] for i in items_model.list_items('a@x.com')] == ['Milk']
+        assert 'message' in items_model.update_item_status('Milk', 'expired', 'a@x.com')
+        assert 'error' in items_model.update_item_status('Nope', 'expired', 'a@x.com')
@@ -62,7 +62,7 @@ class TestUpdateItemStatus:
         mock_result = Mock()
         mock_result.modified_count = 1
         mock_collection.update_one.return_value = mock_result
-        result = update_item_status("Milk", "consumed")
+        result = update_item_status("Milk", "consumed", "user@example.com")
         assert "message" in result
     
     @patch('src.models.items.items_collection')
@@ -71,18 +71,146 @@ class TestUpdateItemStatus:
         mock_result = Mock()
         mock_result.modified_count = 0
         mock_collection.update_one.return_value = mock_result
-        result = update_item_status("NonExistent", "consumed")
+        result = update_item_status("NonExistent", "consumed", "user@example.com")
         assert "error" in result
     
     @patch('src.models.items.items_collection', None)
     def test_update_item_status_no_db(self):
         from src.models.items import update_item_status
-        result = update_item_status("Milk", "consumed")
+        result = update_item_status("Milk", "consumed", "user@example.com")
         assert "error" in result
     
     @patch('src.models.items.items_collection')
     def test_update_item_status_db_error(self, mock_collection):
         from src.models.items import update_item_status
         mock_collection.update_one.side_effect = Exception("Connection error")
-        result = update_item_status("Milk", "consumed")
+        result = update_item_status("Milk", "consumed", "user@example.com")
         assert "error" in result
+
+    @patch('src.models.items.items_collection')
+    def test_update_item_status_requires_user_email(self, mock_collection):
+        """Sin user_email no se actualiza nada (un update por nombre recorrería la colección)"""
+        from src.models.items import update_item_status
+        result = update_item_status("Milk", "consumed", None)
+        assert result == {"error": "Falta user_email."}
+        mock_collection.update_one.assert_not_called()
+
+    @patch('src.models.items.items_collection')
+    def test_update_item_status_is_scoped_to_owner(self, mock_collection):
+        from src.models.items import update_item_status
+        mock_collection.update_one.return_value = Mock(modified_count=1)
+        update_item_status("Milk", "consumed", "User@Example.com")
+        query = mock_collection.update_one.call_args[0][0]
+        assert query == {"user_email": "user@example.com", "name": "Milk"}
+
+
+@pytest.fixture
+def memory_items(monkeypatch):
+    """Colección de items en el motor en memoria, con índice único (user_email, name)"""
+    from memory_db import MemoryClient
+    import src.models.items as items
+    collection = MemoryClient()['FridgeDB']['items']
+    collection.create_index([('user_email', 1), ('name', 1)], unique=True)
+    monkeypatch.setattr(items, 'items_collection', collection)
+    return collection
+
+
+class TestCreateItems:
+    """Tests para create_items (ingesta por lotes)"""
+
+    def test_inserts_in_chunks(self, memory_items):
+        from src.models.items import create_items
+        rows = [{"name": f"Item {i}", "category": "dairy", "expiration_date": "2024-12-31"} for i in range(25)]
+        with patch.object(memory_items, 'insert_many', wraps=memory_items.insert_many) as insert_many:
+            result = create_items("USER@example.com", rows, chunk_size=10)
+        assert result == {"inserted": 25, "failed": 0, "errors": []}
+        assert insert_many.call_count == 3
+        assert all(call.kwargs["ordered"] is False for call in insert_many.call_args_list)
+        assert memory_items.count_documents({"user_email": "user@example.com", "status": "active"}) == 25
+
+    def test_reports_row_errors_without_failing_the_batch(self, memory_items):
+        from src.models.items import create_items
+        memory_items.insert_one({"user_email": "user@example.com", "name": "Milk"})
+        rows = [
+            {"name": "Eggs", "expiration_date": "2024-12-31"},
+            {"name": "", "expiration_date": "2024-12-31"},
+            {"name": "Milk", "expiration_date": "2024-12-31"},
+            {"name": "Bread", "expiration_date": "31/12/2024"},
+            "basura",
+            {"name": "Jam", "expiration_date": "2025-01-10T00:00:00"},
+            {"name": "Ham", "expiration_date": "2024-12-31garbage"},
+            {"name": "Tea", "expiration_date": "20241231"},
+            {"name": "  " + "x" * 200 + "  ", "expiration_date": "2024-12-31"},
+        ]
+        result = create_items("user@example.com", rows, chunk_size=2)
+        assert result["inserted"] == 3
+        assert [e["index"] for e in result["errors"]] == [1, 2, 3, 4, 6, 7]
+        assert "duplicate key" in result["errors"][1]["error"]
+
+    def test_chunk_failure_marks_its_rows(self):
+        from src.models.items import create_items
+        with patch('src.models.items.items_collection') as mock_collection:
+            mock_collection.insert_many.side_effect = Exception("Connection error")
+            result = create_items("user@example.com", [{"name": "Milk", "expiration_date": "2024-12-31"}])
+        assert result["failed"] == 1 and result["errors"][0]["error"] == "Connection error"
+
+    @pytest.mark.parametrize("email,rows", [
+        (None, [{"name": "Milk"}]),
+        ("user@example.com", []),
+        ("user@example.com", {"name": "Milk"}),
+    ])
+    def test_invalid_payload(self, memory_items, email, rows):
+        from src.models.items import create_items
+        assert "error" in create_items(email, rows)
+
+    def test_too_many_rows(self, memory_items, monkeypatch):
+        import src.models.items as items
+        monkeypatch.setattr(items, 'MAX_BULK_ITEMS', 2)
+        assert "error" in items.create_items("user@example.com", [{}, {}, {}])
+
+    @patch('src.models.items.items_collection', None)
+    def test_create_items_no_db(self):
+        from src.models.items import create_items
+        assert "DB no disponible" in create_items("user@example.com", [{"name": "Milk"}])["error"]
+
+
+class TestItemsBulkEndpoint:
+    """Tests para POST /items/bulk"""
+
+    AUTH = {"Authorization": "Bearer token"}
+
+    @pytest.fixture
+    def client(self, memory_items, monkeypatch):
+        from app import app
+        monkeypatch.setitem(app.config, 'WTF_CSRF_ENABLED', False)
+        with patch('src.middleware.auth._verify_token', return_value={"uid": "u1", "email": "A@x.com"}):
+            yield app.test_client()
+
+    def test_all_inserted(self, client, memory_items):
+        resp = client.post('/items/bulk', headers=self.AUTH,
+                           json={"items": [{"name": "Milk", "expiration_date": "2024-12-31"}]})
+        assert resp.status_code == 201
+        assert resp.get_json()["inserted"] == 1
+        assert memory_items.find_one({"name": "Milk"})["user_email"] == "a@x.com"
+
+    def test_partial(self, client):
+        resp = client.post('/items/bulk', headers=self.AUTH,
+                           json={"user_email": "a@x.com",
+                                 "items": [{"name": "Milk", "expiration_date": "2024-12-31"}, {}]})
+        assert resp.status_code == 207
+        assert resp.get_json()["errors"] == [{"index": 1, "error": "Falta name."}]
+
+    def test_bad_payload(self, client):
+        assert client.post('/items/bulk', headers=self.AUTH, json={"items": []}).status_code == 400
+
+    def test_requires_auth(self, client, memory_items):
+        resp = client.post('/items/bulk', json={"items": [{"name": "Milk", "expiration_date": "2024-12-31"}]})
+        assert resp.status_code == 401
+        assert memory_items.count_documents({}) == 0
+
+    def test_other_users_email_is_rejected(self, client, memory_items):
+        resp = client.post('/items/bulk', headers=self.AUTH,
+                           json={"user_email": "b@x.com",
+                                 "items": [{"name": "Milk", "expiration_date": "2024-12-31"}]})
+        assert resp.status_code == 403
+        assert memory_items.count_documents({}) == 0
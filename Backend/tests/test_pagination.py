@@ -0,0 +1,101 @@
+"""Tests para la paginación por clave, proyección y streaming de los listados"""
+import json
+
+import pytest
+
+from memory_db import MemoryClient
+from src.models import pagination
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """Colecciones de usuarios, recetas e items sobre el motor en memoria"""
+    import src.models.items as items
+    import src.models.recipes as recipes
+    import src.models.users as users
+    database = MemoryClient()['FridgeDB']
+    monkeypatch.setattr(users, 'users_collection', database['users'])
+    monkeypatch.setattr(recipes, 'recipes_collection', database['recipes'])
+    monkeypatch.setattr(items, 'items_collection', database['items'])
+    database['users'].insert_many([{'name': f'U{i}', 'email': f'u{i}@x.com', 'password_hash': 'h'}
+                                   for i in range(5)])
+    database['items'].insert_many([{'user_email': 'a@x.com' if i % 2 else 'b@x.com', 'name': f'I{i}'}
+                                   for i in range(6)])
+    return database
+
+
+class TestFindPage:
+    def test_walks_all_pages(self, database):
+        from src.models.users import page_users
+        names, after = [], None
+        while True:
+            page = page_users(limit=2, after=after)
+            names += [u['name'] for u in page['items']]
+            after = page['next_after']
+            if after is None:
+                break
+        assert names == ['U0', 'U1', 'U2', 'U3', 'U4']
+        assert all('password_hash' not in u and '_id' not in u for u in page['items'])
+
+    def test_last_full_page_has_no_cursor(self, database):
+        from src.models.users import page_users
+        assert page_users(limit=5)['next_after'] is None
+
+    def test_projection_never_returns_hidden_fields(self, database):
+        from src.models.users import page_users
+        page = page_users(limit=1, fields='email,password_hash')
+        assert page['items'] == [{'email': 'u0@x.com'}]
+
+    def test_items_filtered_by_user(self, database):
+        from src.models.items import page_items
+        page = page_items('A@x.com', limit=10, fields=['name'])
+        assert page['items'] == [{'name': 'I1'}, {'name': 'I3'}, {'name': 'I5'}]
+
+    def test_invalid_parameters(self, database):
+        from src.models.recipes import page_recipes
+        with pytest.raises(ValueError):
+            page_recipes(after='nope')
+        with pytest.raises(ValueError):
+            page_recipes(limit='x')
+        assert pagination.parse_limit(10 ** 6) == pagination.MAX_PAGE_SIZE
+
+    def test_no_db(self, monkeypatch):
+        import src.models.users as users
+        monkeypatch.setattr(users, 'users_collection', None)
+        assert users.page_users() == {'items': [], 'next_after': None}
+        assert list(users.iter_users()) == []
+
+
+class TestListEndpoints:
+    @pytest.fixture
+    def client(self, database):
+        from app import app
+        return app.test_client()
+
+    def test_legacy_full_list(self, client):
+        users = client.get('/users').get_json()
+        assert len(users) == 5 and 'password_hash' not in users[0]
+
+    def test_paged(self, client):
+        first = client.get('/users?limit=3&fields=name').get_json()
+        assert first['items'] == [{'name': 'U0'}, {'name': 'U1'}, {'name': 'U2'}]
+        second = client.get(f"/users?limit=3&after={first['next_after']}&fields=name").get_json()
+        assert [u['name'] for u in second['items']] == ['U3', 'U4']
+        assert client.get('/users?after=zzz').status_code == 400
+
+    def test_stream(self, client):
+        resp = client.get('/items?stream=1&user_email=b@x.com&fields=name')
+        assert resp.mimetype == 'application/json'
+        assert json.loads(resp.get_data()) == [{'name': 'I0'}, {'name': 'I2'}, {'name': 'I4'}]
+        assert json.loads(client.get('/recipes?stream=1').get_data()) == []
+
+    def test_hidden_fields_are_never_returned(self, client):
+        for url in ('/users?limit=1&fields=password_hash', '/users?fields=password_hash',
+                    '/users?stream=1&fields=password_hash'):
+            body = client.get(url).get_data(as_text=True)
+            assert 'password_hash' not in body, url
+
+    def test_items_require_user_email(self, client):
+        assert client.get('/items').status_code == 400
+        assert client.get('/items?limit=5').status_code == 400
+        assert len(client.get('/items?user_email=a@x.com').get_json()) == 3
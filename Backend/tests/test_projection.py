@@ -0,0 +1,47 @@
+"""Tests para la proyección de campos (src/services/projection.py)"""
+import pytest
+
+from src.services.projection import fields_key, parse_fields, project, wants
+
+
+class TestParseFields:
+    def test_paths(self):
+        assert parse_fields('id, name,ingredients.name') == {'id': True, 'name': True, 'ingredients': {'name': True}}
+        assert parse_fields(['id', 'nutrition.nutrients']) == {'id': True, 'nutrition': {'nutrients': True}}
+
+    def test_whole_subtree_wins(self):
+        assert parse_fields('ingredients.name,ingredients') == {'ingredients': True}
+        assert parse_fields('ingredients,ingredients.name') == {'ingredients': True}
+
+    def test_empty(self):
+        assert parse_fields(None) is None
+        assert parse_fields('') is None
+        assert parse_fields(' , .') is None
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            parse_fields(5)
+        with pytest.raises(ValueError):
+            parse_fields(['id', 3])
+
+
+class TestProject:
+    def test_nested_dicts_and_lists(self):
+        recipe = {
+            'id': 1, 'name': 'Tortilla', 'nutrition': {'nutrients': [1, 2]},
+            'ingredients': [{'name': 'egg', 'amount': 2}, {'name': 'potato', 'amount': 3}],
+        }
+        tree = parse_fields('id,ingredients.name,missing')
+        assert project(recipe, tree) == {'id': 1, 'ingredients': [{'name': 'egg'}, {'name': 'potato'}]}
+        assert project([recipe], parse_fields('id')) == [{'id': 1}]
+
+    def test_without_projection(self):
+        recipe = {'id': 1}
+        assert project(recipe, None) is recipe
+
+    def test_wants_and_key(self):
+        assert wants(None, 'nutrition')
+        assert wants(parse_fields('nutrition.nutrients'), 'nutrition')
+        assert not wants(parse_fields('id'), 'nutrition')
+        assert fields_key(parse_fields('name,id')) == fields_key(parse_fields('id,name'))
+        assert fields_key(None) == ''
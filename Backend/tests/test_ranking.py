@@ -0,0 +1,123 @@
+"""Tests para el ranking de candidatas (src/services/ranking.py)"""
+import random
+
+import pytest
+
+from src.services import ranking
+from src.services.ranking import DEFAULT_WEIGHTS, Ranker, parse_weights
+
+
+def _legacy_order(candidates):
+    # el orden anterior de /suggest: (used, used/total) descendente
+    def score(item):
+        used = int(item.get('usedIngredientCount', 0))
+        missed = int(item.get('missedIngredientCount', 0))
+        total = used + missed if (used + missed) > 0 else 1
+        return (used, used / total)
+    return sorted(candidates, key=score, reverse=True)
+
+
+def _candidates(n, seed=5):
+    rng = random.Random(seed)
+    return [{'id': i, 'usedIngredientCount': rng.randint(0, 6), 'missedIngredientCount': rng.randint(0, 8)}
+            for i in range(n)]
+
+
+@pytest.fixture(params=[False, True], ids=['python', 'numpy'])
+def use_numpy(request):
+    if request.param and ranking.np is None:
+        pytest.skip('numpy no está instalado')
+    return request.param
+
+
+class TestDefaultRanking:
+    def test_reproduces_legacy_order(self, use_numpy):
+        candidates = _candidates(500)
+        ranked = Ranker(use_numpy=use_numpy).rank(candidates)
+        assert [c['id'] for c in ranked] == [c['id'] for c in _legacy_order(candidates)]
+
+    def test_missing_counts(self, use_numpy):
+        candidates = [{'id': 1}, {'id': 2, 'usedIngredientCount': 1}, {'id': 3, 'usedIngredientCount': 'x'}]
+        ranked = Ranker(use_numpy=use_numpy).rank(candidates)
+        assert [c['id'] for c in ranked] == [2, 1, 3]
+
+    def test_small_inputs(self, use_numpy):
+        assert Ranker(use_numpy=use_numpy).rank([]) == []
+        assert Ranker(use_numpy=use_numpy).rank(None) == []
+        assert Ranker(use_numpy=use_numpy).rank([{'id': 1}]) == [{'id': 1}]
+
+
+class TestWeightedFeatures:
+    def test_expiring_items_first(self, use_numpy):
+        candidates = [
+            {'id': 1, 'usedIngredientCount': 1, 'usedIngredients': [{'name': 'rice'}]},
+            {'id': 2, 'usedIngredientCount': 1, 'usedIngredients': [{'name': 'Tomatoes'}]},
+        ]
+        ranker = Ranker({'used': 2, 'expiring': 1}, use_numpy=use_numpy)
+        ranked = ranker.rank(candidates, {'expiring': {'tomato': 1}})
+        assert [c['id'] for c in ranked] == [2, 1]
+        # sin contexto se mantiene el orden original
+        assert [c['id'] for c in ranker.rank(candidates)] == [1, 2]
+
+    def test_missing_values_are_neutral(self, use_numpy):
+        candidates = [{'id': 1}, {'id': 2, 'readyInMinutes': 60}, {'id': 3, 'readyInMinutes': 10}]
+        ranked = Ranker({'ready_time': -1}, use_numpy=use_numpy).rank(candidates)
+        # la 1 no tiene tiempo: cuenta como la media (35 min)
+        assert [c['id'] for c in ranked] == [3, 1, 2]
+
+    def test_calories(self, use_numpy):
+        candidates = [
+            {'id': 1, 'nutrition': {'nutrients': [{'name': 'Calories', 'amount': 800}]}},
+            {'id': 2, 'nutrition': {'nutrients': [{'name': 'Calories', 'amount': 300}]}},
+        ]
+        ranked = Ranker({'calories': -1}, use_numpy=use_numpy).rank(candidates)
+        assert [c['id'] for c in ranked] == [2, 1]
+
+    def test_custom_feature(self, use_numpy, monkeypatch):
+        monkeypatch.setitem(ranking.FEATURES, 'vegan', lambda cs, ctx: [1 if c.get('vegan') else 0 for c in cs])
+        candidates = [{'id': 1}, {'id': 2, 'vegan': True}]
+        ranked = Ranker({'vegan': 1}, use_numpy=use_numpy).rank(candidates)
+        assert [c['id'] for c in ranked] == [2, 1]
+
+    def test_numpy_and_python_scores_agree(self):
+        if ranking.np is None:
+            pytest.skip('numpy no está instalado')
+        candidates = _candidates(200)
+        weights = {'used': 1.5, 'missed': -0.5, 'used_ratio': 2}
+        np_scores = Ranker(weights, use_numpy=True).scores(candidates)
+        py_scores = Ranker(weights, use_numpy=False).scores(candidates)
+        assert list(np_scores) == pytest.approx(py_scores)
+
+    def test_numpy_and_python_rank_identically(self):
+        """Mismo orden (empates incluidos) con valores ausentes en todas las features"""
+        if ranking.np is None:
+            pytest.skip('numpy no está instalado')
+        rng = random.Random(11)
+        candidates = _candidates(500)
+        for c in candidates:
+            if rng.random() < 0.7:
+                c['readyInMinutes'] = rng.choice([10, 20, 45, 90])
+            if rng.random() < 0.5:
+                c['nutrition'] = {'nutrients': [{'name': 'Calories', 'amount': rng.choice([250, 400, 800])}]}
+            c['usedIngredients'] = [{'name': rng.choice(['eggs', 'milk', 'rice'])}]
+        weights = dict(DEFAULT_WEIGHTS, ready_time=-0.5, calories=-0.25, expiring=1)
+        context = {'expiring': {'egg': 1, 'milk': 3}}
+        np_ranked = Ranker(weights, use_numpy=True).rank(candidates, context)
+        py_ranked = Ranker(weights, use_numpy=False).rank(candidates, context)
+        assert [c['id'] for c in np_ranked] == [c['id'] for c in py_ranked]
+
+
+class TestWeightsConfig:
+    def test_parse_weights(self):
+        assert parse_weights('used=2, used_ratio=1,') == {'used': 2.0, 'used_ratio': 1.0}
+        assert parse_weights('') == {}
+
+    def test_unknown_feature(self):
+        with pytest.raises(ValueError):
+            parse_weights('popularity=1')
+        with pytest.raises(ValueError):
+            Ranker({'popularity': 1})
+
+    def test_zero_weights_dropped(self):
+        assert Ranker({'used': 1, 'missed': 0}).weights == {'used': 1.0}
+        assert Ranker().weights == DEFAULT_WEIGHTS
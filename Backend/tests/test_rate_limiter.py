@@ -0,0 +1,116 @@
+"""
+Tests para el limitador de cuota de Spoonacular (src/services/rate_limiter.py)
+"""
+import pytest
+
+from src.services.rate_limiter import (
+    PRIORITY_INTERACTIVE,
+    PRIORITY_PREFETCH,
+    QuotaLimiter,
+    endpoint_cost,
+)
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_limiter(**kwargs):
+    clock = FakeClock()
+    wall = FakeClock(86400 * 100 + 10)
+    kwargs.setdefault('max_wait', 0)
+    return QuotaLimiter(clock=clock, wall_clock=wall, **kwargs), clock, wall
+
+
+class TestEndpointCost:
+    def test_find_by_ingredients_scales_with_results(self):
+        assert endpoint_cost('findByIngredients', 10) == pytest.approx(1.1)
+
+    def test_bulk_costs_half_point_per_extra_recipe(self):
+        assert endpoint_cost('informationBulk', 5) == pytest.approx(3.0)
+
+    def test_information_costs_one_point(self):
+        assert endpoint_cost('information') == 1.0
+
+
+class TestTokenBucket:
+    def test_burst_then_deny(self):
+        """Se permiten `burst` puntos seguidos y luego se rechaza"""
+        limiter, clock, _ = make_limiter(rate=1, burst=3, prefetch_reserve=0)
+        assert all(limiter.acquire('information') for _ in range(3))
+        assert limiter.acquire('information') is False
+
+    def test_refill_over_time(self):
+        limiter, clock, _ = make_limiter(rate=2, burst=2, prefetch_reserve=0)
+        limiter.acquire('information')
+        limiter.acquire('information')
+        clock.now += 0.5
+        assert limiter.acquire('information') is True
+
+    def test_prefetch_cannot_use_reserve(self):
+        """Los prefetch no consumen la reserva que queda para llamadas interactivas"""
+        limiter, _, _ = make_limiter(rate=1, burst=10, prefetch_reserve=0.5)
+        granted = sum(limiter.acquire('information', priority=PRIORITY_PREFETCH) for _ in range(10))
+        assert granted == 5
+        assert limiter.acquire('information', priority=PRIORITY_INTERACTIVE) is True
+        stats = limiter.stats()
+        assert stats['priorities'][PRIORITY_PREFETCH] == {'granted': 5, 'denied': 5}
+
+
+class TestDailyQuota:
+    def test_daily_quota_enforced(self):
+        limiter, clock, _ = make_limiter(rate=100, burst=100, daily_points=3, prefetch_reserve=0)
+        assert all(limiter.acquire('information') for _ in range(3))
+        assert limiter.acquire('information') is False
+
+    def test_daily_quota_resets_at_utc_midnight(self):
+        limiter, clock, wall = make_limiter(rate=100, burst=100, daily_points=1, prefetch_reserve=0)
+        assert limiter.acquire('information') is True
+        assert limiter.acquire('information') is False
+        wall.now += 86400
+        assert limiter.acquire('information') is True
+
+    def test_headers_override_budget(self):
+        """Los headers X-API-Quota-* fijan lo que queda del día"""
+        limiter, _, _ = make_limiter(rate=100, burst=100, prefetch_reserve=0.2)
+        limiter.update_from_headers({'X-API-Quota-Used': '95', 'X-API-Quota-Left': '5'})
+        stats = limiter.stats()
+        assert stats['daily_limit'] == 100
+        assert stats['daily_remaining'] == 5
+        # un prefetch de 1 punto dejaría 4 < 20% de 100
+        assert limiter.acquire('information', priority=PRIORITY_PREFETCH) is False
+        assert limiter.acquire('information', priority=PRIORITY_INTERACTIVE) is True
+
+    def test_bad_headers_ignored(self):
+        limiter, _, _ = make_limiter()
+        limiter.update_from_headers({'X-API-Quota-Left': 'n/a'})
+        assert limiter.stats()['daily_remaining'] is None
+
+    def test_exhaust_blocks_everything(self):
+        limiter, _, _ = make_limiter()
+        limiter.exhaust()
+        assert limiter.acquire('information') is False
+
+    def test_backoff_pauses_every_priority(self):
+        """Tras un 429 no se concede nada hasta que pase el Retry-After"""
+        limiter, clock, _ = make_limiter(prefetch_reserve=0)
+        limiter.backoff(5)
+        assert limiter.acquire('information') is False
+        assert limiter.acquire('information', priority=PRIORITY_PREFETCH) is False
+        assert limiter.stats()['paused_for'] == 5
+        clock.now += 5
+        assert limiter.acquire('information') is True
+        assert limiter.stats()['backoffs'] == 1
+
+
+class TestStats:
+    def test_points_by_endpoint(self):
+        limiter, _, _ = make_limiter(prefetch_reserve=0)
+        limiter.acquire('informationBulk', endpoint_cost('informationBulk', 3))
+        limiter.acquire('information')
+        points = limiter.stats()['points_by_endpoint']
+        assert points == {'informationBulk': 2.0, 'information': 1.0}
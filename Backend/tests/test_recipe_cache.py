@@ -0,0 +1,174 @@
+"""Tests para el motor de caché LRU+TTL (recipe_cache.py)"""
+import pytest
+
+from src.services.recipe_cache import RecipeCache
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestRecipeCacheBasics:
+    """Tests de lectura/escritura básicas"""
+
+    def test_set_and_get(self, clock):
+        cache = RecipeCache(clock=clock)
+        cache.set('information:1', {'id': 1})
+        assert cache.get('information:1') == {'id': 1}
+        assert 'information:1' in cache
+        assert len(cache) == 1
+
+    def test_missing_key_returns_default(self, clock):
+        cache = RecipeCache(clock=clock)
+        assert cache.get('information:404') is None
+        assert cache.get('information:404', 'x') == 'x'
+
+    def test_delete_and_clear(self, clock):
+        cache = RecipeCache(clock=clock)
+        cache.set('a:1', 1)
+        cache.set('a:2', 2)
+        assert cache.delete('a:1') is True
+        assert cache.delete('a:1') is False
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()['bytes'] == 0
+
+    def test_stamp_changes_with_the_stored_value(self, clock):
+        cache = RecipeCache(clock=clock)
+        first = {'id': 1}
+        cache.set('information:1', first)
+        stamp = cache.stamp('information:1', first)
+        assert stamp is not None
+        assert cache.stamp('information:1', {'id': 1}) is None
+        second = {'id': 1}
+        cache.set('information:1', second)
+        assert cache.stamp('information:1', first) is None
+        assert cache.stamp('information:1', second) not in (None, stamp)
+
+
+class TestRecipeCacheExpiry:
+    """Tests de expiración TTL perezosa y periódica"""
+
+    def test_lazy_expiry_on_get(self, clock):
+        cache = RecipeCache(clock=clock, sweep_interval=None)
+        cache.set('information:1', {'id': 1}, ttl=10)
+        clock.now += 11
+        assert cache.get('information:1') is None
+        stats = cache.stats()['namespaces']['information']
+        assert stats['expirations'] == 1
+        assert stats['misses'] == 1
+
+    def test_periodic_sweep_drops_untouched_entries(self, clock):
+        cache = RecipeCache(clock=clock, sweep_interval=30)
+        cache.set('findByIngredients:a', [1], ttl=5)
+        cache.set('findByIngredients:b', [2], ttl=5)
+        clock.now += 31
+        # cualquier operación dispara el barrido aunque no toque esas claves
+        cache.get('information:other')
+        assert len(cache) == 0
+        assert cache.stats()['namespaces']['findByIngredients']['expirations'] == 2
+
+    def test_explicit_sweep(self, clock):
+        cache = RecipeCache(clock=clock, sweep_interval=None)
+        cache.set('a:1', 1, ttl=1)
+        cache.set('a:2', 2, ttl=100)
+        clock.now += 2
+        assert cache.sweep() == 1
+        assert 'a:2' in cache
+
+
+class TestRecipeCacheEviction:
+    """Tests de desalojo LRU por número de entradas y por bytes"""
+
+    def test_evicts_least_recently_used(self, clock):
+        cache = RecipeCache(max_entries=2, clock=clock)
+        cache.set('a:1', 1)
+        cache.set('a:2', 2)
+        cache.get('a:1')  # a:1 pasa a ser el más reciente
+        cache.set('a:3', 3)
+        assert 'a:1' in cache
+        assert 'a:2' not in cache
+        assert cache.stats()['namespaces']['a']['evictions'] == 1
+
+    def test_byte_budget(self, clock):
+        cache = RecipeCache(max_bytes=50, clock=clock)
+        cache.set('a:1', 'x' * 20)
+        cache.set('a:2', 'y' * 20)
+        cache.set('a:3', 'z' * 20)
+        stats = cache.stats()
+        assert stats['bytes'] <= 50
+        assert 'a:1' not in cache
+        assert 'a:3' in cache
+
+    def test_value_larger_than_budget_is_not_stored(self, clock):
+        cache = RecipeCache(max_bytes=10, clock=clock)
+        assert cache.set('a:big', 'x' * 100) is False
+        assert len(cache) == 0
+
+    def test_namespace_counters(self, clock):
+        cache = RecipeCache(clock=clock)
+        cache.set('information:1', {'id': 1})
+        cache.get('information:1')
+        cache.get('findByIngredients:x')
+        ns = cache.stats()['namespaces']
+        assert ns['information']['hits'] == 1
+        assert ns['information']['entries'] == 1
+        assert ns['information']['bytes'] > 0
+        assert ns['findByIngredients']['misses'] == 1
+
+
+class TestRecipeCacheStaleWhileRevalidate:
+    """Tests del modo soft-TTL / hard-TTL"""
+
+    def test_lookup_flags_stale_entries(self, clock):
+        cache = RecipeCache(clock=clock, sweep_interval=None)
+        cache.set('information:1', {'id': 1}, ttl=100, stale_ttl=10)
+        assert cache.lookup('information:1') == ({'id': 1}, False)
+        clock.now += 20
+        assert cache.lookup('information:1') == ({'id': 1}, True)
+        clock.now += 100
+        assert cache.lookup('information:1') is None
+        stats = cache.stats()['namespaces']['information']
+        assert stats['hits'] == 1
+        assert stats['stale_hits'] == 1
+        assert stats['misses'] == 1
+
+    def test_soft_ttl_not_below_hard_ttl_is_ignored(self, clock):
+        cache = RecipeCache(clock=clock, sweep_interval=None)
+        cache.set('a:1', 1, ttl=10, stale_ttl=10)
+        clock.now += 5
+        assert cache.lookup('a:1') == (1, False)
+
+
+class TestRecipeCacheStaleIfError:
+    """Tests del periodo de gracia stale-if-error"""
+
+    def test_expired_entry_only_served_by_lookup_expired(self, clock):
+        cache = RecipeCache(clock=clock, sweep_interval=None, stale_if_error=100)
+        cache.set('information:1', {'id': 1}, ttl=10)
+        clock.now += 20
+        assert cache.lookup('information:1') is None
+        assert cache.lookup_expired('information:1') == {'id': 1}
+        assert cache.stats()['namespaces']['information']['expired_hits'] == 1
+
+    def test_entry_dropped_after_grace(self, clock):
+        cache = RecipeCache(clock=clock, sweep_interval=None, stale_if_error=100)
+        cache.set('information:1', {'id': 1}, ttl=10)
+        clock.now += 111
+        assert cache.sweep() == 1
+        assert cache.lookup_expired('information:1') is None
+
+    def test_no_grace_by_default(self, clock):
+        cache = RecipeCache(clock=clock, sweep_interval=None)
+        cache.set('information:1', {'id': 1}, ttl=10)
+        clock.now += 20
+        assert cache.lookup_expired('information:1') is None
@@ -44,7 +44,7 @@ class TestGetRecipesByIngredients:
         result, status = get_recipes_by_ingredients(None)
         assert status == 400
     
-    @patch('src.controllers.recipe_controller.requests.get')
+    @patch('src.controllers.recipe_controller.upstream_client.get')
     def test_successful_api_call(self, mock_get, mock_current_app):
         """Test de llamada exitosa a la API"""
         from src.controllers.recipe_controller import get_recipes_by_ingredients
@@ -64,7 +64,7 @@ class TestGetRecipesByIngredients:
         assert len(result) == 2
         assert result[0]['id'] == 1
     
-    @patch('src.controllers.recipe_controller.requests.get')
+    @patch('src.controllers.recipe_controller.upstream_client.get')
     def test_api_request_failure(self, mock_get, mock_current_app):
         """Test cuando la petición a la API falla"""
         from src.controllers.recipe_controller import get_recipes_by_ingredients
@@ -78,7 +78,7 @@ class TestGetRecipesByIngredients:
         assert 'error' in result
         assert 'Request failed' in result['error']
     
-    @patch('src.controllers.recipe_controller.requests.get')
+    @patch('src.controllers.recipe_controller.upstream_client.get')
     def test_api_non_200_response(self, mock_get, mock_current_app):
         """Test cuando la API devuelve un código diferente a 200"""
         from src.controllers.recipe_controller import get_recipes_by_ingredients
@@ -93,7 +93,7 @@ class TestGetRecipesByIngredients:
         assert status == 404
         assert 'error' in result
     
-    @patch('src.controllers.recipe_controller.requests.get')
+    @patch('src.controllers.recipe_controller.upstream_client.get')
     def test_number_parameter_validation(self, mock_get, mock_current_app):
         """Test validación del parámetro number"""
         from src.controllers.recipe_controller import get_recipes_by_ingredients
@@ -110,7 +110,7 @@ class TestGetRecipesByIngredients:
         call_args = mock_get.call_args
         assert call_args[1]['params']['number'] == 5
     
-    @patch('src.controllers.recipe_controller.requests.get')
+    @patch('src.controllers.recipe_controller.upstream_client.get')
     def test_number_parameter_bounds(self, mock_get, mock_current_app):
         """Test límites del parámetro number"""
         from src.controllers.recipe_controller import get_recipes_by_ingredients
@@ -134,7 +134,7 @@ class TestGetRecipesByIngredients:
         call_args = mock_get.call_args
         assert call_args[1]['params']['number'] >= 1
     
-    @patch('src.controllers.recipe_controller.requests.get')
+    @patch('src.controllers.recipe_controller.upstream_client.get')
     def test_cache_functionality(self, mock_get, mock_current_app):
         """Test del sistema de caché"""
         from src.controllers.recipe_controller import get_recipes_by_ingredients
@@ -163,7 +163,7 @@ class TestGetRecipesByIngredients:
 class TestGetRecipeInformation:
     """Tests para get_recipe_information"""
     
-    @patch('src.controllers.recipe_controller.requests.get')
+    @patch('src.controllers.recipe_controller.upstream_client.get')
     def test_get_recipe_info_success(self, mock_get, mock_current_app):
         """Test de obtención exitosa de información de receta"""
         from src.controllers.recipe_controller import get_recipe_information
@@ -182,7 +182,7 @@ class TestGetRecipeInformation:
         assert result['id'] == 123
         assert 'nutrition' in result
     
-    @patch('src.controllers.recipe_controller.requests.get')
+    @patch('src.controllers.recipe_controller.upstream_client.get')
     def test_get_recipe_info_failure(self, mock_get, mock_current_app):
         """Test cuando falla la obtención de información"""
         from src.controllers.recipe_controller import get_recipe_information
@@ -194,7 +194,7 @@ class TestGetRecipeInformation:
         assert status == 502
         assert 'error' in result
     
-    @patch('src.controllers.recipe_controller.requests.get')
+    @patch('src.controllers.recipe_controller.upstream_client.get')
     def test_get_recipe_info_without_nutrition(self, mock_get, mock_current_app):
         """Test sin incluir información nutricional"""
         from src.controllers.recipe_controller import get_recipe_information
@@ -209,3 +209,398 @@ class TestGetRecipeInformation:
         # Verificar que el parámetro includeNutrition sea false
         call_args = mock_get.call_args
         assert call_args[1]['params']['includeNutrition'] == 'false'
+
+
+class TestRequestCoalescing:
+    """Tests para la deduplicación de peticiones idénticas al upstream"""
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_concurrent_misses_share_one_upstream_call(self, mock_get, mock_current_app):
+        """Varias peticiones simultáneas del mismo id hacen una sola llamada"""
+        import threading
+        import src.controllers.recipe_controller as rc
+
+        def slow_response(*args, **kwargs):
+            time.sleep(0.05)
+            response = Mock()
+            response.status_code = 200
+            response.json.return_value = {'id': 777, 'title': 'Popular'}
+            return response
+
+        mock_get.side_effect = slow_response
+        before = rc._inflight.stats()['coalesced']
+
+        results = []
+        barrier = threading.Barrier(5)
+
+        def worker():
+            barrier.wait()
+            results.append(rc.get_recipe_information(777))
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert mock_get.call_count == 1
+        assert all(r['id'] == 777 for r in results)
+        assert rc._inflight.stats()['coalesced'] - before == 4
+
+
+class TestGetRecipesInformationBulk:
+    """Tests para get_recipes_information_bulk"""
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_only_missing_ids_are_requested(self, mock_get, mock_current_app):
+        """Los ids en caché no se piden otra vez y el resto va en una llamada"""
+        import src.controllers.recipe_controller as rc
+        rc._recipe_cache.set('information:9001:nutrition=True', {'id': 9001, 'title': 'Cached'})
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [
+            {'id': 9002, 'title': 'Two'},
+            {'id': 9003, 'title': 'Three'}
+        ]
+        mock_get.return_value = mock_response
+
+        result = rc.get_recipes_information_bulk([9001, 9002, 9003])
+
+        assert mock_get.call_count == 1
+        assert mock_get.call_args[0][0].endswith('/recipes/informationBulk')
+        assert mock_get.call_args[1]['params']['ids'] == '9002,9003'
+        assert result[9001]['title'] == 'Cached'
+        assert result[9003]['title'] == 'Three'
+        # las respuestas individuales quedan en la caché por id
+        assert rc.get_recipe_information(9002)['title'] == 'Two'
+        assert mock_get.call_count == 1
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_ids_missing_from_response_are_errors(self, mock_get, mock_current_app):
+        from src.controllers.recipe_controller import get_recipes_information_bulk
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [{'id': 9101}]
+        mock_get.return_value = mock_response
+
+        result = get_recipes_information_bulk([9101, 9102])
+
+        assert result[9101] == {'id': 9101}
+        payload, status = result[9102]
+        assert status == 404
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_upstream_failure_is_reported_per_id(self, mock_get, mock_current_app):
+        from src.controllers.recipe_controller import get_recipes_information_bulk
+        mock_get.side_effect = Exception('Connection error')
+
+        result = get_recipes_information_bulk([9201, 9202])
+
+        assert result[9201][1] == 502
+        assert result[9202][1] == 502
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_chunking(self, mock_get, mock_current_app):
+        from src.controllers.recipe_controller import get_recipes_information_bulk
+        mock_current_app.config['SPOONACULAR_BULK_MAX_IDS'] = 2
+
+        def respond(url, params=None):
+            response = Mock()
+            response.status_code = 200
+            response.json.return_value = [{'id': int(x)} for x in params['ids'].split(',')]
+            return response
+
+        mock_get.side_effect = respond
+
+        result = get_recipes_information_bulk([9301, 9302, 9303, 9301])
+
+        assert mock_get.call_count == 2
+        assert sorted(result) == [9301, 9302, 9303]
+
+    def test_empty_ids(self, mock_current_app):
+        from src.controllers.recipe_controller import get_recipes_information_bulk
+        assert get_recipes_information_bulk([]) == {}
+
+
+class TestStaleWhileRevalidate:
+    """Tests para el modo stale-while-revalidate del controlador"""
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_stale_entry_is_served_and_refreshed_in_background(self, mock_get):
+        from flask import Flask
+        import src.controllers.recipe_controller as rc
+
+        app = Flask(__name__)
+        app.config.update(SPOONACULAR_API_KEY='k', SPOONACULAR_URL_BASE='http://upstream.test',
+                          RECIPE_CACHE_TTL=3600, RECIPE_CACHE_SOFT_TTL=60)
+        rc._recipe_cache.set('information:4242:nutrition=True', {'id': 4242, 'title': 'Old'},
+                             ttl=3600, stale_ttl=0)
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'id': 4242, 'title': 'New'}
+        mock_get.return_value = mock_response
+
+        with app.app_context():
+            # el valor viejo se devuelve sin esperar al upstream
+            assert rc.get_recipe_information(4242)['title'] == 'Old'
+            assert rc._refresher.wait_idle()
+            assert mock_get.call_count == 1
+            assert rc.get_recipe_information(4242)['title'] == 'New'
+            assert mock_get.call_count == 1
+
+        assert rc._refresher.stats()['namespaces']['information']['succeeded'] >= 1
+
+
+class TestQuotaLimiter:
+    """Tests para el limitador de cuota delante del cliente upstream"""
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_prefetch_denied_when_quota_low(self, mock_get, mock_current_app):
+        """Un prefetch sin cuota devuelve 429 sin llamar a Spoonacular"""
+        import src.controllers.recipe_controller as rc
+        from src.services.rate_limiter import QuotaLimiter
+        limiter = QuotaLimiter(rate=1, burst=10, daily_points=10, prefetch_reserve=0.5, max_wait=0)
+        limiter.update_from_headers({'X-API-Quota-Used': '9', 'X-API-Quota-Left': '1'})
+
+        with patch.object(rc, '_limiter', limiter):
+            result = rc.get_recipes_information_bulk([9401, 9402])
+
+        assert mock_get.call_count == 0
+        assert result[9401][1] == 429
+        assert result[9402][1] == 429
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_interactive_call_uses_reserve(self, mock_get, mock_current_app):
+        import src.controllers.recipe_controller as rc
+        from src.services.rate_limiter import QuotaLimiter
+        limiter = QuotaLimiter(rate=1, burst=10, prefetch_reserve=0.5, max_wait=0)
+        limiter.update_from_headers({'X-API-Quota-Used': '9', 'X-API-Quota-Left': '1'})
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.headers = {'X-API-Quota-Used': '10', 'X-API-Quota-Left': '0'}
+        mock_response.json.return_value = {'id': 9403}
+        mock_get.return_value = mock_response
+
+        with patch.object(rc, '_limiter', limiter):
+            result = rc.get_recipe_information(9403)
+
+        assert result == {'id': 9403}
+        assert limiter.stats()['daily_remaining'] == 0
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_402_marks_quota_exhausted(self, mock_get, mock_current_app):
+        import src.controllers.recipe_controller as rc
+        from src.services.rate_limiter import QuotaLimiter
+        limiter = QuotaLimiter(max_wait=0)
+        mock_response = Mock()
+        mock_response.status_code = 402
+        mock_response.headers = {}
+        mock_get.return_value = mock_response
+
+        with patch.object(rc, '_limiter', limiter):
+            result, status = rc.get_recipe_information(9404)
+            assert status == 402
+            result, status = rc.get_recipe_information(9405)
+
+        assert status == 429
+        assert mock_get.call_count == 1
+
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_429_backs_off_without_opening_breaker(self, mock_get, mock_current_app):
+        """Un 429 pausa el limitador según Retry-After y no cuenta como fallo del breaker"""
+        import src.controllers.recipe_controller as rc
+        from src.services.circuit_breaker import CLOSED, CircuitBreaker
+        from src.services.rate_limiter import QuotaLimiter
+        limiter = QuotaLimiter(max_wait=0)
+        breaker = CircuitBreaker(failure_threshold=1)
+        mock_response = Mock()
+        mock_response.status_code = 429
+        mock_response.headers = {'Retry-After': '30'}
+        mock_get.return_value = mock_response
+
+        with patch.object(rc, '_limiter', limiter), patch.object(rc, '_breaker', breaker):
+            assert rc.get_recipe_information(9406)[1] == 429
+            assert rc.get_recipe_information(9407)[1] == 429
+            assert breaker.state == CLOSED
+
+        assert mock_get.call_count == 1
+        assert limiter.stats()['backoffs'] == 1
+        assert breaker.stats()['failures'] == 0
+
+    def test_spoonacular_client_does_not_retry_statuses(self):
+        import src.controllers.recipe_controller as rc
+        assert rc.upstream_client._retry.status == 0
+
+
+class TestCircuitBreakerAndStaleIfError:
+    """Tests para el circuit breaker, la caché negativa y stale-if-error"""
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_open_breaker_skips_upstream(self, mock_get, mock_current_app):
+        import src.controllers.recipe_controller as rc
+        from src.services.circuit_breaker import OPEN, CircuitBreaker
+        mock_get.side_effect = Exception('Connection error')
+
+        with patch.object(rc, '_breaker', CircuitBreaker(failure_threshold=2)) as breaker:
+            assert rc.get_recipe_information(9501)[1] == 502
+            assert rc.get_recipe_information(9502)[1] == 502
+            result, status = rc.get_recipe_information(9503)
+            assert breaker.state == OPEN
+
+        assert status == 503
+        assert mock_get.call_count == 2
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_failures_are_negatively_cached(self, mock_get, mock_current_app):
+        """Un fallo reciente no se reintenta en cada petición"""
+        from src.controllers.recipe_controller import get_recipe_information
+        mock_get.side_effect = Exception('Connection error')
+
+        assert get_recipe_information(9511)[1] == 502
+        assert get_recipe_information(9511)[1] == 502
+        assert mock_get.call_count == 1
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_not_found_is_not_negatively_cached(self, mock_get, mock_current_app):
+        from src.controllers.recipe_controller import get_recipe_information
+        mock_response = Mock()
+        mock_response.status_code = 404
+        mock_get.return_value = mock_response
+
+        get_recipe_information(9512)
+        get_recipe_information(9512)
+        assert mock_get.call_count == 2
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_expired_entry_served_when_upstream_fails(self, mock_get, mock_current_app):
+        import src.controllers.recipe_controller as rc
+        from src.services.recipe_cache import RecipeCache
+        now = [1000.0]
+        cache = RecipeCache(clock=lambda: now[0], stale_if_error=3600)
+        cache.set('information:9521:nutrition=True', {'id': 9521, 'title': 'Old'}, ttl=10)
+        now[0] += 60
+        mock_get.side_effect = Exception('Connection error')
+
+        with patch.object(rc, '_recipe_cache', cache):
+            assert rc.get_recipe_information(9521) == {'id': 9521, 'title': 'Old'}
+
+        assert mock_get.call_count == 1
+        assert cache.stats()['namespaces']['information']['expired_hits'] == 1
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_bulk_falls_back_to_expired_entries(self, mock_get, mock_current_app):
+        import src.controllers.recipe_controller as rc
+        from src.services.circuit_breaker import CircuitBreaker
+        from src.services.recipe_cache import RecipeCache
+        now = [1000.0]
+        cache = RecipeCache(clock=lambda: now[0], stale_if_error=3600)
+        cache.set('information:9531:nutrition=True', {'id': 9531}, ttl=10)
+        now[0] += 60
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_failure()
+
+        with patch.object(rc, '_recipe_cache', cache), patch.object(rc, '_breaker', breaker):
+            result = rc.get_recipes_information_bulk([9531, 9532])
+
+        assert mock_get.call_count == 0
+        assert result[9531] == {'id': 9531}
+        assert result[9532][1] == 503
+
+    def test_metrics_include_breaker(self):
+        from src.controllers.recipe_controller import get_upstream_metrics
+        metrics = get_upstream_metrics()
+        assert metrics['breaker']['state'] == 'closed'
+        assert 'transitions' in metrics['breaker']
+        assert 'namespaces' in metrics['negative_cache']
+
+
+class TestIngredientCanonicalization:
+    """Tests para la canonicalización en la consulta y la clave de caché"""
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_spellings_share_one_query(self, mock_get, mock_current_app):
+        from src.controllers.recipe_controller import get_recipes_by_ingredients
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [{'id': 9601}]
+        mock_get.return_value = mock_response
+
+        get_recipes_by_ingredients(['Parsnips', ' kohlrabi '])
+        get_recipes_by_ingredients(['kohlrabi', 'parsnip', 'PARSNIPS'])
+
+        assert mock_get.call_count == 1
+        assert mock_get.call_args[1]['params']['ingredients'] == 'kohlrabi,parsnip'
+
+    def test_blank_ingredients_rejected(self, mock_current_app):
+        from src.controllers.recipe_controller import get_recipes_by_ingredients
+        result, status = get_recipes_by_ingredients(['  ', ''])
+        assert status == 400
+
+
+class TestLocalCorpus:
+    """Tests para el corpus local alimentado por los payloads de información"""
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_information_payloads_feed_corpus(self, mock_get, mock_current_app):
+        from src.controllers.recipe_controller import get_recipe_information, search_local_recipes
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'id': 9701, 'title': 'Tortilla',
+                                           'extendedIngredients': [{'name': 'Eggs'}, {'name': 'potatoes'}]}
+        mock_get.return_value = mock_response
+
+        get_recipe_information(9701)
+        found = search_local_recipes(['egg', 'onion'], number=1)
+        assert [r['id'] for r in found] == [9701]
+        assert found[0]['missedIngredientCount'] == 1
+
+    def test_too_few_local_matches_is_a_miss(self, mock_current_app):
+        import src.controllers.recipe_controller as rc
+        rc._corpus.add_recipe({'id': 9702, 'extendedIngredients': [{'name': 'egg'}]})
+        assert rc.search_local_recipes(['egg'], number=2) is None
+        assert rc.search_local_recipes(['egg'], number=1)[0]['id'] == 9702
+
+    def test_disabled_by_config(self, mock_current_app):
+        import src.controllers.recipe_controller as rc
+        rc._corpus.add_recipe({'id': 9703, 'extendedIngredients': [{'name': 'egg'}]})
+        mock_current_app.config['RECIPE_LOCAL_CORPUS'] = False
+        assert rc.search_local_recipes(['egg'], number=1) is None
+
+    def test_concurrent_first_requests_seed_once(self, mock_current_app, monkeypatch):
+        import threading
+        import src.controllers.recipe_controller as rc
+        monkeypatch.setenv('EP_RECIPE_CORPUS_FILE', '/tmp/corpus.json')
+
+        def slow_load(path):
+            time.sleep(0.05)
+            rc._corpus.add_recipe({'id': 9704, 'extendedIngredients': [{'name': 'egg'}]})
+
+        with patch.object(rc._corpus, 'load_file', side_effect=slow_load) as load:
+            threads = [threading.Thread(target=rc.search_local_recipes, args=(['egg'], 1)) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        assert load.call_count == 1
+        assert rc._corpus_state['local_hits'] == 8
+        assert rc._corpus_state['local_misses'] == 0
+
+
+class TestInformationWithoutNutrition:
+    """Tests para las consultas sin nutrición servidas desde la caché con nutrición"""
+
+    @patch('src.controllers.recipe_controller.upstream_client.get')
+    def test_served_from_payload_with_nutrition(self, mock_get, mock_current_app):
+        from src.controllers.recipe_controller import get_recipe_information, get_recipes_information_bulk
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'id': 9801, 'nutrition': {'nutrients': []}}
+        mock_get.return_value = mock_response
+
+        get_recipe_information(9801, include_nutrition=True)
+        assert get_recipe_information(9801, include_nutrition=False)['id'] == 9801
+        assert get_recipes_information_bulk([9801], include_nutrition=False)[9801]['id'] == 9801
+        assert mock_get.call_count == 1
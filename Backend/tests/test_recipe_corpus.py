@@ -0,0 +1,113 @@
+"""Tests para el corpus local de recetas (src/services/recipe_corpus.py)"""
+import json
+
+from src.services.recipe_corpus import RecipeCorpus
+
+
+def _info(rid, *names, title=None):
+    return {
+        'id': rid,
+        'title': title or f'Receta {rid}',
+        'image': f'https://img.example/{rid}.jpg',
+        'extendedIngredients': [{'id': i, 'name': n, 'original': n, 'amount': 1, 'unit': ''}
+                                for i, n in enumerate(names)],
+    }
+
+
+class TestRecipeCorpusIndex:
+    def test_add_and_find(self):
+        corpus = RecipeCorpus()
+        assert corpus.add_recipe(_info(1, 'Tomatoes', 'rice', 'onion'))
+        assert corpus.add_recipe(_info(2, 'tomato', 'rice'))
+        assert corpus.add_recipe(_info(3, 'chicken'))
+
+        found = corpus.find_by_ingredients(['tomato', 'rice'], number=5)
+        # ambas usan 2 ingredientes; la 2 no le falta ninguno
+        assert [r['id'] for r in found] == [2, 1]
+        assert found[1]['usedIngredientCount'] == 2
+        assert found[1]['missedIngredientCount'] == 1
+        assert [i['name'] for i in found[1]['missedIngredients']] == ['onion']
+        assert found[0]['source'] == 'local'
+
+    def test_number_and_min_used(self):
+        corpus = RecipeCorpus()
+        for rid in range(10):
+            corpus.add_recipe(_info(rid, 'egg', f'extra{rid}'))
+        assert len(corpus.find_by_ingredients(['egg'], number=3)) == 3
+        assert corpus.find_by_ingredients(['egg'], number=3, min_used=2) == []
+        assert corpus.find_by_ingredients(['lobster']) == []
+
+    def test_payloads_without_ingredients_are_ignored(self):
+        corpus = RecipeCorpus()
+        assert not corpus.add_recipe({'id': 1, 'title': 'Vacía'})
+        assert not corpus.add_recipe({'title': 'Sin id', 'extendedIngredients': [{'name': 'egg'}]})
+        assert not corpus.add_recipe(None)
+        assert len(corpus) == 0
+
+    def test_duplicate_ingredients_counted_once(self):
+        corpus = RecipeCorpus()
+        corpus.add_recipe(_info(1, 'egg', 'eggs', 'egg yolk', 'flour'))
+        found = corpus.find_by_ingredients(['egg'])
+        assert found[0]['usedIngredientCount'] == 1
+        assert found[0]['missedIngredientCount'] == 1
+
+    def test_max_recipes(self):
+        corpus = RecipeCorpus(max_recipes=2)
+        assert corpus.add_recipe(_info(1, 'egg'))
+        assert corpus.add_recipe(_info(2, 'egg'))
+        assert not corpus.add_recipe(_info(3, 'egg'))
+        # las existentes se pueden seguir actualizando
+        assert corpus.add_recipe(_info(2, 'egg', title='Nueva'))
+        assert corpus.stats()['rejected'] == 1
+
+
+class TestRecipeCorpusUpdates:
+    def test_update_with_same_ingredients_in_place(self):
+        corpus = RecipeCorpus()
+        corpus.add_recipe(_info(1, 'egg', title='Antigua'))
+        corpus.add_recipe(_info(1, 'egg', title='Nueva'))
+        assert corpus.find_by_ingredients(['egg'])[0]['title'] == 'Nueva'
+        assert corpus.stats()['postings'] == 1
+
+    def test_update_with_new_ingredients_reindexes(self):
+        corpus = RecipeCorpus()
+        corpus.add_recipe(_info(1, 'egg'))
+        corpus.add_recipe(_info(1, 'flour'))
+        assert corpus.find_by_ingredients(['egg']) == []
+        assert [r['id'] for r in corpus.find_by_ingredients(['flour'])] == [1]
+        assert len(corpus) == 1
+
+    def test_retired_postings_are_compacted(self):
+        corpus = RecipeCorpus()
+        for rid in range(4):
+            corpus.add_recipe(_info(rid, 'egg'))
+        for rid in range(4):
+            corpus.add_recipe(_info(rid, 'flour'))
+        stats = corpus.stats()
+        assert stats['recipes'] == 4
+        assert stats['retired'] < 4
+        assert stats['postings'] < 8
+
+    def test_clear(self):
+        corpus = RecipeCorpus()
+        corpus.add_recipe(_info(1, 'egg'))
+        corpus.clear()
+        assert len(corpus) == 0
+        assert 1 not in corpus
+        assert corpus.find_by_ingredients(['egg']) == []
+
+
+class TestRecipeCorpusImport:
+    def test_load_json_array(self, tmp_path):
+        path = tmp_path / 'corpus.json'
+        path.write_text(json.dumps([_info(1, 'egg'), _info(2, 'flour')]), encoding='utf-8')
+        corpus = RecipeCorpus()
+        assert corpus.load_file(str(path)) == 2
+        assert 1 in corpus and 2 in corpus
+
+    def test_load_json_lines(self, tmp_path):
+        path = tmp_path / 'corpus.jsonl'
+        path.write_text('\n'.join(json.dumps(p) for p in [_info(1, 'egg'), {'id': 2}]) + '\n\n',
+                        encoding='utf-8')
+        corpus = RecipeCorpus()
+        assert corpus.load_file(str(path)) == 1
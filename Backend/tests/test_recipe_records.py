@@ -0,0 +1,53 @@
+"""Tests para los registros compactos de recetas (src/services/recipe_records.py)"""
+from src.services.recipe_records import IngredientRecord, RecipeRecord, canonical_name, search_ingredients
+
+
+class TestIngredientRecord:
+    def test_names_are_interned_and_canonical(self):
+        a = IngredientRecord.from_information({'id': 1, 'name': ''.join(['Tomat', 'oes'])})
+        b = IngredientRecord.from_information({'id': 2, 'name': 'Tomatoes'})
+        assert a.canonical == 'tomato'
+        assert a.name is b.name
+        assert a.canonical is b.canonical
+        assert canonical_name('Tomatoes') == ('Tomatoes', 'tomato')
+
+    def test_no_instance_dict(self):
+        ing = IngredientRecord(1, 'egg')
+        assert not hasattr(ing, '__dict__')
+
+    def test_name_fallbacks(self):
+        assert IngredientRecord.from_information({'originalName': 'eggs'}).name == 'eggs'
+        assert IngredientRecord.from_search({'original': '2 eggs'}).name == '2 eggs'
+        assert IngredientRecord.from_search({}).name == ''
+
+    def test_to_dict(self):
+        ing = IngredientRecord(1, 'egg', '2 eggs', 2, '')
+        assert ing.to_dict() == {'id': 1, 'name': 'egg', 'original': '2 eggs', 'amount': 2, 'unit': ''}
+        assert ing.to_dict(True)['available'] is True
+
+    def test_search_ingredients(self):
+        candidate = {'usedIngredients': [{'id': 1, 'name': 'egg'}, 'basura'],
+                     'missedIngredients': [{'id': 2, 'name': 'milk'}]}
+        flags = [(ing.name, available) for ing, available in search_ingredients(candidate)]
+        assert flags == [('egg', True), ('milk', False)]
+
+
+class TestRecipeRecord:
+    PAYLOAD = {
+        'id': 7, 'title': 'Tortilla', 'image': 'img', 'readyInMinutes': 20, 'servings': 2,
+        'summary': 's', 'dishTypes': ['lunch'], 'sourceUrl': None, 'spoonacularSourceUrl': 'spoon',
+        'analyzedInstructions': [{'steps': [{'number': 1, 'step': 'Batir'}]}],
+        'extendedIngredients': [{'id': 1, 'name': 'eggs'}, {'id': 2, 'name': 'egg'}, 'x', {'id': 3, 'name': 'potato'}],
+    }
+
+    def test_from_information(self):
+        record = RecipeRecord.from_information(self.PAYLOAD)
+        assert [ing.name for ing in record.ingredients] == ['eggs', 'egg', 'potato']
+        assert record.steps == [{'number': 1, 'step': 'Batir'}]
+        assert record.source_url == 'spoon'
+        assert record.canonical_names() == {'egg', 'potato'}
+
+    def test_without_details_distinct(self):
+        record = RecipeRecord.from_information(self.PAYLOAD, details=False, distinct=True)
+        assert [ing.name for ing in record.ingredients] == ['eggs', 'potato']
+        assert record.summary is None and record.nutrition is None
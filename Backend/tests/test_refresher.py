@@ -0,0 +1,50 @@
+"""Tests para el refresco en segundo plano (refresher.py)"""
+import threading
+
+from src.services.refresher import BackgroundRefresher
+
+
+class TestBackgroundRefresher:
+    """Tests de deduplicación y métricas del refresco"""
+
+    def test_runs_job_and_counts_success(self):
+        refresher = BackgroundRefresher()
+        done = []
+        assert refresher.schedule('information:1', lambda: done.append(1) or True) is True
+        assert refresher.wait_idle()
+        assert done == [1]
+        assert refresher.stats()['namespaces']['information']['succeeded'] == 1
+
+    def test_at_most_one_refresh_per_key(self):
+        refresher = BackgroundRefresher(max_workers=2)
+        gate = threading.Event()
+        calls = []
+
+        def job():
+            calls.append(1)
+            gate.wait(2)
+            return True
+
+        assert refresher.schedule('information:1', job) is True
+        assert refresher.schedule('information:1', job) is False
+        gate.set()
+        assert refresher.wait_idle()
+        assert len(calls) == 1
+        stats = refresher.stats()['namespaces']['information']
+        assert stats['scheduled'] == 1
+        assert stats['skipped'] == 1
+        # una vez terminado se puede volver a programar
+        assert refresher.schedule('information:1', lambda: True) is True
+        assert refresher.wait_idle()
+
+    def test_failures_are_counted(self):
+        refresher = BackgroundRefresher()
+
+        def boom():
+            raise RuntimeError('upstream down')
+
+        refresher.schedule('suggest:a', boom)
+        refresher.schedule('suggest:b', lambda: False)
+        assert refresher.wait_idle()
+        assert refresher.stats()['namespaces']['suggest']['failed'] == 2
+        assert refresher.stats()['pending'] == 0
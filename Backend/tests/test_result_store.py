@@ -0,0 +1,108 @@
+"""Tests para el almacén de resultados en disco (result_store.py)"""
+import threading
+
+import pytest
+
+from src.services.result_store import ResultStore
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / 'nested' / 'results.sqlite3')
+
+
+class TestResultStore:
+    def test_put_and_get_bytes(self, store_path, clock):
+        store = ResultStore(store_path, clock=clock)
+        assert store.put('suggest:a', b'[{"id":1}]', ttl=60)
+        body, created_at, tag, count = store.get('suggest:a')
+        assert body == b'[{"id":1}]'
+        assert created_at == 1000.0
+        assert tag is None and count is None
+        assert store.get('suggest:b') is None
+
+    def test_expired_entries_are_hidden_and_swept(self, store_path, clock):
+        store = ResultStore(store_path, clock=clock, sweep_interval=None)
+        store.put('suggest:a', b'1', ttl=10)
+        store.put('suggest:b', b'2', ttl=100)
+        clock.now += 50
+        assert store.get('suggest:a') is None
+        assert store.sweep() == 1
+        assert len(store) == 1
+        assert store.stats()['expirations'] == 1
+
+    def test_overwrite_keeps_byte_total(self, store_path, clock):
+        store = ResultStore(store_path, clock=clock)
+        store.put('suggest:a', b'x' * 100)
+        store.put('suggest:a', b'x' * 10)
+        store.delete('suggest:a')
+        store.put('suggest:b', b'x' * 7)
+        assert store.stats()['bytes'] == 7
+
+    def test_size_cap_evicts_oldest(self, store_path, clock):
+        store = ResultStore(store_path, max_bytes=250, clock=clock)
+        for i in range(5):
+            store.put(f'suggest:{i}', b'x' * 100)
+            clock.now += 1
+        assert store.stats()['bytes'] <= 250
+        assert store.get('suggest:4') is not None
+        assert store.get('suggest:0') is None
+        assert store.stats()['evictions'] == 3
+
+    def test_body_larger_than_cap_is_not_stored(self, store_path, clock):
+        store = ResultStore(store_path, max_bytes=10, clock=clock)
+        assert store.put('suggest:a', b'x' * 11) is False
+
+    def test_concurrent_writers(self, store_path):
+        """Varios hilos escribiendo a la vez no corrompen el contador ni las filas"""
+        store = ResultStore(store_path)
+
+        def write(n):
+            for i in range(50):
+                store.put(f'suggest:{n}:{i % 10}', b'x' * (n + 1))
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(store) == 40
+        assert store.stats()['bytes'] == sum(10 * (n + 1) for n in range(4))
+        assert store.stats()['errors'] == 0
+
+    def test_shared_between_instances(self, store_path):
+        ResultStore(store_path).put('suggest:a', b'shared', ttl=60)
+        assert ResultStore(store_path).get('suggest:a')[0] == b'shared'
+
+    def test_tag_round_trip(self, store_path, clock):
+        store = ResultStore(store_path, clock=clock)
+        store.put('suggest:a', b'1', tag=5, count=3)
+        assert store.get('suggest:a')[2:] == (5, 3)
+
+    def test_adds_tag_column_to_old_files(self, store_path):
+        """Un archivo creado sin la columna tag se migra al abrirlo"""
+        import os
+        import sqlite3
+        os.makedirs(os.path.dirname(store_path), exist_ok=True)
+        conn = sqlite3.connect(store_path)
+        conn.execute('CREATE TABLE results (key TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL, '
+                     'created_at REAL NOT NULL, expires_at REAL)')
+        conn.commit()
+        conn.close()
+        store = ResultStore(store_path)
+        assert store.put('suggest:a', b'1', tag=2, count=1)
+        assert store.get('suggest:a')[2:] == (2, 1)
@@ -44,9 +44,10 @@ class TestGetIngredientsFromRequest:
         data = json.loads(response.data)
         assert 'error' in data
     
+    @patch('src.routes.recipe_recomendation.get_recipes_information_bulk', return_value={})
     @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
     @patch('src.routes.recipe_recomendation.get_recipe_information')
-    def test_successful_recipe_request(self, mock_get_info, mock_get_recipes, client):
+    def test_successful_recipe_request(self, mock_get_info, mock_get_recipes, mock_bulk, client):
         """Test de solicitud exitosa de recetas"""
         # Mock de respuesta de get_recipes_by_ingredients
         mock_get_recipes.return_value = [
@@ -1,6 +1,7 @@
 """Tests avanzados para recipe_recomendation.py - Para aumentar cobertura a 80%"""
 import pytest
 from unittest.mock import Mock, patch, mock_open
+import gzip
 import json
 import os
 import tempfile
@@ -10,7 +11,9 @@ import tempfile
 def app():
     """Fixture de Flask app"""
     from flask import Flask
+    from src.services.json_codec import FastJSONProvider
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.config['TESTING'] = True
     app.config['SPOONACULAR_API_KEY'] = 'test_key'
     
@@ -26,6 +29,13 @@ def client(app):
     return app.test_client()
 
 
+@pytest.fixture
+def isolated_cache_dir(tmp_path):
+    """Caché de archivos aislada por test"""
+    with patch.dict(os.environ, {'EP_RECIPE_CACHE_DIR': str(tmp_path)}):
+        yield tmp_path
+
+
 class TestCacheFileOperations:
     """Tests para operaciones de caché en archivos"""
     
@@ -68,9 +78,10 @@ class TestCacheFileOperations:
                                       json={'ingredients': ['chicken']})
                 assert response.status_code == 200
     
+    @patch('src.routes.recipe_recomendation.get_recipes_information_bulk', return_value={})
     @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
     @patch('src.routes.recipe_recomendation.get_recipe_information')
-    def test_enrichment_with_nutrition(self, mock_get_info, mock_get_recipes, client):
+    def test_enrichment_with_nutrition(self, mock_get_info, mock_get_recipes, mock_bulk, client):
         """Test de enriquecimiento con información nutricional"""
         mock_get_recipes.return_value = [
             {
@@ -250,9 +261,10 @@ class TestEdgeCases:
         # Solo debe incluir la receta con ID válido
         assert len(data) >= 1
     
+    @patch('src.routes.recipe_recomendation.get_recipes_information_bulk', return_value={})
     @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
     @patch('src.routes.recipe_recomendation.get_recipe_information')
-    def test_get_recipe_info_exception(self, mock_get_info, mock_get_recipes, client):
+    def test_get_recipe_info_exception(self, mock_get_info, mock_get_recipes, mock_bulk, client):
         """Test cuando get_recipe_information lanza excepción"""
         mock_get_recipes.return_value = [
             {'id': 1, 'title': 'Recipe', 'usedIngredientCount': 1}
@@ -279,3 +291,534 @@ class TestEdgeCases:
             
             # Debe funcionar aunque falle el cache
             assert response.status_code == 200
+
+
+@pytest.mark.usefixtures('isolated_cache_dir')
+class TestConcurrentPrefetch:
+    """Tests para el prefetch concurrente de información de recetas"""
+
+    @patch('src.routes.recipe_recomendation.get_recipes_information_bulk', return_value={})
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    @patch('src.routes.recipe_recomendation.get_recipe_information')
+    def test_prefetch_keeps_ranking_order(self, mock_get_info, mock_get_recipes, mock_bulk, app, client):
+        """El orden del resultado no depende del orden en que terminan las llamadas"""
+        import time as _time
+        app.config['RECIPE_PREFETCH_CONCURRENCY'] = 4
+        mock_get_recipes.return_value = [
+            {'id': i, 'title': f'Recipe {i}', 'usedIngredientCount': 10 - i} for i in range(1, 5)
+        ]
+
+        def slow_info(rid, include_nutrition=True, **kwargs):
+            # las primeras recetas tardan más en responder
+            _time.sleep(0.02 * (5 - rid))
+            return {'id': rid, 'title': f'Info {rid}'}
+
+        mock_get_info.side_effect = slow_info
+
+        response = client.post('/recipes/suggest',
+                              json={'ingredients': ['chicken'], 'prefetch': 4})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [r['id'] for r in data] == [1, 2, 3, 4]
+        assert [r['name'] for r in data] == ['Info 1', 'Info 2', 'Info 3', 'Info 4']
+
+    @patch('src.routes.recipe_recomendation.get_recipes_information_bulk', return_value={})
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    @patch('src.routes.recipe_recomendation.get_recipe_information')
+    def test_prefetch_failure_falls_back_to_lightweight(self, mock_get_info, mock_get_recipes, mock_bulk, client):
+        """Un fallo en el prefetch produce el objeto ligero con el error"""
+        mock_get_recipes.return_value = [
+            {'id': 1, 'title': 'Ok', 'usedIngredientCount': 2},
+            {'id': 2, 'title': 'Broken', 'usedIngredientCount': 1,
+             'usedIngredients': [{'name': 'chicken'}]}
+        ]
+
+        def info(rid, include_nutrition=True, **kwargs):
+            if rid == 2:
+                raise Exception('timeout')
+            return {'id': rid, 'title': 'Ok'}
+
+        mock_get_info.side_effect = info
+
+        response = client.post('/recipes/suggest',
+                              json={'ingredients': ['chicken'], 'prefetch': 2})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data[0]['name'] == 'Ok'
+        assert 'error' in data[1]
+        assert data[1]['ingredients'][0]['available'] is True
+
+    @patch('src.routes.recipe_recomendation.get_recipe_information')
+    def test_prefetch_helper_respects_concurrency_limit(self, mock_get_info, app):
+        """No se superan RECIPE_PREFETCH_CONCURRENCY llamadas simultáneas"""
+        import threading
+        import time as _time
+        from src.routes.recipe_recomendation import prefetch_recipe_information
+
+        lock = threading.Lock()
+        state = {'active': 0, 'peak': 0}
+
+        def info(rid, include_nutrition=True, **kwargs):
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            _time.sleep(0.01)
+            with lock:
+                state['active'] -= 1
+            return {'id': rid}
+
+        mock_get_info.side_effect = info
+
+        with app.app_context():
+            results = prefetch_recipe_information(list(range(10)), max_workers=3)
+
+        assert [r['id'] for r in results] == list(range(10))
+        assert state['peak'] <= 3
+
+
+class TestRecipeMetrics:
+    """Tests para el endpoint de métricas"""
+
+    def test_metrics_exposes_cache_stats(self, client):
+        response = client.get('/recipes/metrics')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert 'cache' in data
+        assert 'namespaces' in data['cache']
+
+
+@pytest.mark.usefixtures('isolated_cache_dir')
+class TestBulkPrefetch:
+    """Tests para el prefetch mediante informationBulk"""
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    @patch('src.routes.recipe_recomendation.get_recipe_information')
+    @patch('src.routes.recipe_recomendation.get_recipes_information_bulk')
+    def test_prefetch_uses_single_bulk_call(self, mock_bulk, mock_get_info, mock_get_recipes, client):
+        """Los candidatos prefetch se piden en una sola llamada bulk"""
+        mock_get_recipes.return_value = [
+            {'id': i, 'title': f'Recipe {i}', 'usedIngredientCount': 10 - i} for i in range(1, 6)
+        ]
+        mock_bulk.return_value = {i: {'id': i, 'title': f'Bulk {i}'} for i in range(1, 6)}
+
+        response = client.post('/recipes/suggest',
+                              json={'ingredients': ['chicken'], 'prefetch': 5})
+
+        assert response.status_code == 200
+        assert mock_bulk.call_count == 1
+        assert mock_bulk.call_args[0][0] == [1, 2, 3, 4, 5]
+        assert not mock_get_info.called
+        assert [r['name'] for r in response.get_json()] == [f'Bulk {i}' for i in range(1, 6)]
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    @patch('src.routes.recipe_recomendation.get_recipe_information')
+    @patch('src.routes.recipe_recomendation.get_recipes_information_bulk')
+    def test_bulk_server_errors_fall_back_to_single_lookups(self, mock_bulk, mock_get_info, mock_get_recipes, client):
+        """Solo los ids con fallo 5xx en bulk se piden individualmente"""
+        mock_get_recipes.return_value = [
+            {'id': 1, 'title': 'A', 'usedIngredientCount': 3},
+            {'id': 2, 'title': 'B', 'usedIngredientCount': 2},
+            {'id': 3, 'title': 'C', 'usedIngredientCount': 1},
+        ]
+        mock_bulk.return_value = {
+            1: {'id': 1, 'title': 'Bulk A'},
+            2: ({'error': 'Request failed'}, 502),
+            3: ({'error': 'Recipe not found'}, 404),
+        }
+        mock_get_info.return_value = {'id': 2, 'title': 'Single B'}
+
+        response = client.post('/recipes/suggest',
+                              json={'ingredients': ['chicken'], 'prefetch': 3})
+
+        data = response.get_json()
+        assert mock_get_info.call_count == 1
+        assert mock_get_info.call_args[0][0] == 2
+        assert data[0]['name'] == 'Bulk A'
+        assert data[1]['name'] == 'Single B'
+        assert 'error' in data[2]
+
+
+def _age_stored_results(cache_dir, seconds):
+    """Envejece todas las entradas del result store"""
+    import sqlite3
+    conn = sqlite3.connect(str(cache_dir / 'suggest_results.sqlite3'))
+    with conn:
+        conn.execute('UPDATE results SET created_at = created_at - ?', (seconds,))
+    conn.close()
+
+
+@pytest.mark.usefixtures('isolated_cache_dir')
+class TestStaleFileCache:
+    """Tests para el modo stale-while-revalidate de la caché en disco"""
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_stale_file_is_served_then_rebuilt(self, mock_get_recipes, client, isolated_cache_dir):
+        from src.controllers.recipe_controller import _refresher
+        mock_get_recipes.return_value = [{'id': 1, 'title': 'Old', 'usedIngredientCount': 1}]
+        body = {'ingredients': ['chicken'], 'prefetch': 0}
+
+        with patch.dict(os.environ, {'EP_RECIPE_CACHE_TTL': '3600', 'EP_RECIPE_CACHE_SOFT_TTL': '60'}):
+            assert client.post('/recipes/suggest', json=body).get_json()[0]['name'] == 'Old'
+
+            # envejecer la entrada más allá del soft TTL pero dentro del hard TTL
+            _age_stored_results(isolated_cache_dir, 600)
+            mock_get_recipes.return_value = [{'id': 2, 'title': 'New', 'usedIngredientCount': 1}]
+
+            response = client.post('/recipes/suggest', json=body)
+            assert response.get_json()[0]['name'] == 'Old'
+            assert _refresher.wait_idle()
+
+            assert client.post('/recipes/suggest', json=body).get_json()[0]['name'] == 'New'
+
+        metrics = client.get('/recipes/metrics').get_json()
+        assert metrics['suggest_cache']['stale_serves'] >= 1
+        assert metrics['refresh']['namespaces']['suggest']['succeeded'] >= 1
+
+
+@pytest.mark.usefixtures('isolated_cache_dir')
+class TestResultStoreCache:
+    """Tests para la caché de /suggest en el result store"""
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_hit_serves_stored_bytes(self, mock_get_recipes, client):
+        mock_get_recipes.return_value = [{'id': 1, 'title': 'Stored', 'usedIngredientCount': 1}]
+        body = {'ingredients': ['Chicken', 'rice'], 'prefetch': 0}
+
+        first = client.post('/recipes/suggest', json=body)
+        second = client.post('/recipes/suggest', json={'ingredients': ['rice', 'chicken'], 'prefetch': 0})
+
+        assert mock_get_recipes.call_count == 1
+        assert second.data == first.data
+        assert second.mimetype == 'application/json'
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_results_without_ingredients_are_not_stored(self, mock_get_recipes, client):
+        mock_get_recipes.return_value = []
+
+        client.post('/recipes/suggest', json={'ingredients': ['nothing']})
+        client.post('/recipes/suggest', json={'ingredients': ['nothing']})
+
+        assert mock_get_recipes.call_count == 2
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_single_store_file(self, mock_get_recipes, client, isolated_cache_dir):
+        """No se crean archivos por clave en el directorio de caché"""
+        mock_get_recipes.return_value = [{'id': 1, 'title': 'R', 'usedIngredientCount': 1}]
+        for ing in ('a', 'b', 'c'):
+            client.post('/recipes/suggest', json={'ingredients': [ing], 'prefetch': 0})
+
+        assert not list(isolated_cache_dir.glob('recipes_*.json'))
+        metrics = client.get('/recipes/metrics').get_json()
+        assert metrics['suggest_cache']['store']['entries'] == 3
+
+
+@pytest.mark.usefixtures('isolated_cache_dir')
+class TestCanonicalSuggestCache:
+    """Tests para la clave canónica de la caché de /suggest"""
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_spellings_and_smaller_prefetch_hit(self, mock_get_recipes, client):
+        mock_get_recipes.return_value = [{'id': 1, 'title': 'R', 'usedIngredientCount': 1}]
+
+        client.post('/recipes/suggest', json={'ingredients': ['Tomatoes', 'rice'], 'prefetch': 0})
+        client.post('/recipes/suggest', json={'ingredients': ['rice', 'roma tomato '], 'prefetch': 0})
+        assert mock_get_recipes.call_count == 1
+
+    @patch('src.routes.recipe_recomendation.get_recipes_information_bulk', return_value={})
+    @patch('src.routes.recipe_recomendation.get_recipe_information')
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_larger_prefetch_rebuilds(self, mock_get_recipes, mock_get_info, mock_bulk, client):
+        mock_get_recipes.return_value = [{'id': 1, 'title': 'R', 'usedIngredientCount': 1}]
+        mock_get_info.return_value = {'id': 1, 'title': 'R', 'extendedIngredients': [{'name': 'Tomatoes'}]}
+
+        client.post('/recipes/suggest', json={'ingredients': ['tomato'], 'prefetch': 0})
+        data = client.post('/recipes/suggest', json={'ingredients': ['tomato'], 'prefetch': 1}).get_json()
+        assert mock_get_recipes.call_count == 2
+        # el resultado con más detalle sirve también a peticiones con menos prefetch
+        client.post('/recipes/suggest', json={'ingredients': ['tomato'], 'prefetch': 0})
+        assert mock_get_recipes.call_count == 2
+        # "Tomatoes" del detalle cuenta como disponible para "tomato" de la nevera
+        assert data[0]['ingredients'][0]['available'] is True
+
+
+class TestLocalCorpusSuggest:
+    """Tests para /suggest respondido desde el corpus local"""
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_local_corpus_answers_without_upstream(self, mock_get_recipes, client):
+        import src.controllers.recipe_controller as rc
+        rc._corpus.add_recipe({'id': 77, 'title': 'Arroz con tomate',
+                               'extendedIngredients': [{'name': 'rice'}, {'name': 'tomatoes'}]})
+
+        resp = client.post('/recipes/suggest', json={'ingredients': ['tomato'], 'number': 1, 'prefetch': 0})
+        data = resp.get_json()
+        assert resp.status_code == 200
+        assert data[0]['id'] == 77
+        assert data[0]['name'] == 'Arroz con tomate'
+        mock_get_recipes.assert_not_called()
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_falls_back_to_spoonacular(self, mock_get_recipes, client):
+        mock_get_recipes.return_value = [{'id': 1, 'title': 'R', 'usedIngredientCount': 1}]
+        client.post('/recipes/suggest', json={'ingredients': ['quince'], 'prefetch': 0})
+        assert mock_get_recipes.call_count == 1
+
+
+class TestSuggestRanking:
+    """Tests para el ranking configurable de /suggest"""
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_expiring_items_change_the_order(self, mock_get_recipes, app, client, isolated_cache_dir):
+        mock_get_recipes.return_value = [
+            {'id': 1, 'title': 'Arroz', 'usedIngredientCount': 1, 'usedIngredients': [{'name': 'rice'}]},
+            {'id': 2, 'title': 'Tomate', 'usedIngredientCount': 1, 'usedIngredients': [{'name': 'tomato'}]},
+        ]
+        app.config['RECIPE_RANKING_WEIGHTS'] = 'used=2,used_ratio=1,expiring=5'
+        body = {'ingredients': ['rice', 'tomato'], 'prefetch': 0}
+        data = client.post('/recipes/suggest', json=body).get_json()
+        assert [r['id'] for r in data] == [1, 2]
+
+        data = client.post('/recipes/suggest', json=dict(body, expiring={'Tomatoes': 1})).get_json()
+        assert [r['id'] for r in data] == [2, 1]
+        # `expiring` forma parte de la clave de caché
+        assert mock_get_recipes.call_count == 2
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_invalid_weights_fall_back_to_default(self, mock_get_recipes, app, client, isolated_cache_dir):
+        mock_get_recipes.return_value = [
+            {'id': 1, 'title': 'A', 'usedIngredientCount': 1, 'missedIngredientCount': 3},
+            {'id': 2, 'title': 'B', 'usedIngredientCount': 2, 'missedIngredientCount': 5},
+        ]
+        app.config['RECIPE_RANKING_WEIGHTS'] = 'popularity=3'
+        data = client.post('/recipes/suggest', json={'ingredients': ['x'], 'prefetch': 0}).get_json()
+        assert [r['id'] for r in data] == [2, 1]
+
+
+def _ndjson(resp):
+    return [json.loads(line) for line in resp.get_data(as_text=True).splitlines() if line]
+
+
+class TestStreamingSuggest:
+    """Tests para el modo streaming (NDJSON/SSE) de /suggest"""
+
+    @patch('src.routes.recipe_recomendation.get_recipes_information_bulk', return_value={})
+    @patch('src.routes.recipe_recomendation.get_recipe_information')
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_ndjson_candidates_then_details(self, mock_get_recipes, mock_get_info, mock_bulk, client,
+                                            isolated_cache_dir):
+        mock_get_recipes.return_value = [
+            {'id': 1, 'title': 'A', 'usedIngredientCount': 2},
+            {'id': 2, 'title': 'B', 'usedIngredientCount': 1},
+        ]
+        mock_get_info.side_effect = lambda rid, include_nutrition=True, **kwargs: {
+            'id': rid, 'title': f'Detalle {rid}', 'readyInMinutes': 15, 'extendedIngredients': [{'name': 'egg'}]}
+
+        resp = client.post('/recipes/suggest', json={'ingredients': ['egg'], 'prefetch': 1, 'stream': 'ndjson'})
+        assert resp.mimetype == 'application/x-ndjson'
+        events = _ndjson(resp)
+        assert [e['event'] for e in events] == ['candidates', 'recipe', 'done']
+        assert [r['id'] for r in events[0]['data']] == [1, 2]
+        assert all(r['lightweight'] for r in events[0]['data'])
+        assert events[1]['data']['index'] == 0
+        assert events[1]['data']['recipe']['name'] == 'Detalle 1'
+        assert events[2]['data'] == {'count': 2}
+
+        # el resultado completo queda guardado y coincide con la respuesta normal
+        data = client.post('/recipes/suggest', json={'ingredients': ['egg'], 'prefetch': 1}).get_json()
+        assert mock_get_recipes.call_count == 1
+        assert data[0]['name'] == 'Detalle 1'
+        assert data[1]['lightweight'] is True
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_sse_from_accept_header_and_cache(self, mock_get_recipes, client, isolated_cache_dir):
+        mock_get_recipes.return_value = [{'id': 1, 'title': 'A', 'usedIngredientCount': 1}]
+        body = {'ingredients': ['egg'], 'prefetch': 0}
+        client.post('/recipes/suggest', json=body)
+
+        from src.services import json_codec
+        with patch.object(json_codec, 'loads', wraps=json_codec.loads) as loads:
+            resp = client.post('/recipes/suggest', json=body, headers={'Accept': 'text/event-stream'})
+            assert resp.mimetype == 'text/event-stream'
+            text = resp.get_data(as_text=True)
+            # the stored array and its stored count are sent without decoding the body
+            # (the only decode is the request's JSON object)
+            decoded = [c.args[0] for c in loads.call_args_list]
+            assert not any(bytes(d if isinstance(d, bytes) else d.encode()).startswith(b'[') for d in decoded)
+        assert text.startswith('event: candidates\ndata: [')
+        assert 'event: done\ndata: {"count":1,"cached":true}\n\n' in text
+        assert mock_get_recipes.call_count == 1
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_search_error_is_not_streamed(self, mock_get_recipes, client, isolated_cache_dir):
+        mock_get_recipes.return_value = ({'error': 'upstream'}, 503)
+        resp = client.post('/recipes/suggest', json={'ingredients': ['egg'], 'stream': 'sse'})
+        assert resp.status_code == 503
+        assert resp.get_json() == {'error': 'upstream'}
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_json_by_default(self, mock_get_recipes, client, isolated_cache_dir):
+        mock_get_recipes.return_value = [{'id': 1, 'title': 'A', 'usedIngredientCount': 1}]
+        resp = client.post('/recipes/suggest', json={'ingredients': ['egg'], 'prefetch': 0},
+                           headers={'Accept': '*/*'})
+        assert resp.mimetype == 'application/json'
+
+
+class TestPaginatedSuggest:
+    """Tests para la paginación con cursor de /suggest"""
+
+    @patch('src.routes.recipe_recomendation.get_recipes_information_bulk', return_value={})
+    @patch('src.routes.recipe_recomendation.get_recipe_information')
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_pages_share_one_search(self, mock_get_recipes, mock_get_info, mock_bulk, client, isolated_cache_dir):
+        mock_get_recipes.return_value = [{'id': i, 'title': f'R{i}', 'usedIngredientCount': 10 - i}
+                                         for i in range(1, 6)]
+        mock_get_info.side_effect = lambda rid, include_nutrition=True, **kwargs: {'id': rid, 'title': f'D{rid}'}
+
+        first = client.post('/recipes/suggest', json={'ingredients': ['egg'], 'page_size': 2, 'prefetch': 1}).get_json()
+        assert [r['id'] for r in first['results']] == [1, 2]
+        assert first['results'][0]['name'] == 'D1'
+        assert first['results'][1]['lightweight'] is True
+        assert first['total'] == 5
+        # sin `number` se pide el máximo permitido al buscar
+        assert mock_get_recipes.call_args[1]['number'] == 50
+
+        second = client.post('/recipes/suggest', json={'cursor': first['next_cursor']}).get_json()
+        third = client.post('/recipes/suggest', json={'cursor': second['next_cursor']}).get_json()
+        assert [r['id'] for r in second['results']] == [3, 4]
+        assert second['results'][0]['name'] == 'D3'
+        assert [r['id'] for r in third['results']] == [5]
+        assert third['next_cursor'] is None
+        assert mock_get_recipes.call_count == 1
+        # solo se piden detalles de la primera de cada página
+        assert sorted(c.args[0] for c in mock_get_info.call_args_list) == [1, 3, 5]
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_new_first_page_reuses_candidates(self, mock_get_recipes, client, isolated_cache_dir):
+        mock_get_recipes.return_value = [{'id': 1, 'title': 'R', 'usedIngredientCount': 1}]
+        body = {'ingredients': ['Eggs'], 'page_size': 1, 'prefetch': 0}
+        client.post('/recipes/suggest', json=body)
+        client.post('/recipes/suggest', json=dict(body, ingredients=['egg']))
+        assert mock_get_recipes.call_count == 1
+
+    def test_invalid_cursor(self, client, isolated_cache_dir):
+        resp = client.post('/recipes/suggest', json={'cursor': 'not-a-cursor'})
+        assert resp.status_code == 400
+
+    def test_expired_cursor(self, client, isolated_cache_dir):
+        from src.routes.recipe_recomendation import _encode_cursor
+        resp = client.post('/recipes/suggest', json={'cursor': _encode_cursor('0' * 40, 2, 2, 0)})
+        assert resp.status_code == 410
+
+    def test_invalid_page_size(self, client, isolated_cache_dir):
+        resp = client.post('/recipes/suggest', json={'ingredients': ['egg'], 'page_size': 'big'})
+        assert resp.status_code == 400
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_search_error(self, mock_get_recipes, client, isolated_cache_dir):
+        mock_get_recipes.return_value = ({'error': 'quota'}, 429)
+        resp = client.post('/recipes/suggest', json={'ingredients': ['egg'], 'page_size': 2})
+        assert resp.status_code == 429
+
+
+class TestFieldProjection:
+    """Tests para el parámetro fields= de /suggest y /information"""
+
+    @patch('src.routes.recipe_recomendation.get_recipe_information')
+    def test_information_projection_skips_nutrition(self, mock_get_info, client):
+        mock_get_info.return_value = {'id': 1, 'title': 'T', 'summary': 'x' * 1000,
+                                      'extendedIngredients': [{'name': 'egg', 'amount': 2}]}
+        resp = client.get('/recipes/1/information?fields=id,title,extendedIngredients.name')
+        assert resp.get_json() == {'id': 1, 'title': 'T', 'extendedIngredients': [{'name': 'egg'}]}
+        assert mock_get_info.call_args[1]['include_nutrition'] is False
+
+    @patch('src.routes.recipe_recomendation.get_recipe_information')
+    def test_information_keeps_nutrition_when_asked(self, mock_get_info, client):
+        mock_get_info.return_value = {'id': 1, 'nutrition': {'nutrients': []}}
+        data = client.get('/recipes/1/information?fields=nutrition').get_json()
+        assert data == {'nutrition': {'nutrients': []}}
+        assert mock_get_info.call_args[1]['include_nutrition'] is True
+        client.get('/recipes/1/information')
+        assert mock_get_info.call_args[1]['include_nutrition'] is True
+
+    @patch('src.routes.recipe_recomendation.get_recipes_information_bulk')
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_suggest_projection(self, mock_get_recipes, mock_bulk, client, isolated_cache_dir):
+        mock_get_recipes.return_value = [{'id': 1, 'title': 'A', 'usedIngredientCount': 1},
+                                         {'id': 2, 'title': 'B', 'usedIngredientCount': 1}]
+        mock_bulk.return_value = {1: {'id': 1, 'title': 'A', 'extendedIngredients': [{'name': 'egg'}]}}
+        body = {'ingredients': ['egg'], 'prefetch': 1, 'fields': ['id', 'name', 'ingredients.available']}
+        data = client.post('/recipes/suggest', json=body).get_json()
+        assert data == [{'id': 1, 'name': 'A', 'ingredients': [{'available': True}]},
+                        {'id': 2, 'name': 'B', 'ingredients': []}]
+        assert mock_bulk.call_args[1]['include_nutrition'] is False
+
+        # la proyección forma parte de la clave de caché
+        full = client.post('/recipes/suggest', json=dict(body, fields=None)).get_json()
+        assert 'summary' in full[0]
+        assert mock_get_recipes.call_count == 2
+
+    def test_invalid_fields(self, client, isolated_cache_dir):
+        resp = client.post('/recipes/suggest', json={'ingredients': ['egg'], 'fields': 3})
+        assert resp.status_code == 400
+
+
+class TestEncodedResponses:
+    """Tests para ETag/304 y compresión de /suggest y /information"""
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_suggest_etag_and_304(self, mock_get_recipes, client, isolated_cache_dir):
+        mock_get_recipes.return_value = [{'id': 1, 'title': 'R', 'usedIngredientCount': 1}]
+        body = {'ingredients': ['egg'], 'prefetch': 0}
+        first = client.post('/recipes/suggest', json=body)
+        etag = first.headers['ETag']
+        hit = client.post('/recipes/suggest', json=body)
+        assert hit.headers['ETag'] == etag
+        assert hit.get_data() == first.get_data()
+
+        resp = client.post('/recipes/suggest', json=body, headers={'If-None-Match': etag})
+        assert resp.status_code == 304
+        assert resp.get_data() == b''
+
+    @patch('src.routes.recipe_recomendation.get_recipes_by_ingredients')
+    def test_suggest_gzip(self, mock_get_recipes, client, isolated_cache_dir):
+        mock_get_recipes.return_value = [{'id': i, 'title': f'Receta {i}', 'usedIngredientCount': 1}
+                                         for i in range(1, 20)]
+        body = {'ingredients': ['egg'], 'prefetch': 0}
+        plain = client.post('/recipes/suggest', json=body)
+        resp = client.post('/recipes/suggest', json=body, headers={'Accept-Encoding': 'gzip'})
+        assert resp.headers['Content-Encoding'] == 'gzip'
+        assert resp.headers['Vary'] == 'Accept-Encoding'
+        assert gzip.decompress(resp.get_data()) == plain.get_data()
+        assert 'Content-Encoding' not in plain.headers
+
+    @patch('src.routes.recipe_recomendation.information_stamp', return_value=1)
+    @patch('src.routes.recipe_recomendation.get_recipe_information')
+    def test_information_reuses_encoding(self, mock_get_info, mock_stamp, client):
+        payload = {'id': 5, 'title': 'T', 'summary': 's' * 2000}
+        mock_get_info.return_value = payload
+        from src.services import json_codec
+        with patch.object(json_codec, 'dumps', wraps=json_codec.dumps) as dumps:
+            first = client.get('/recipes/5/information')
+            second = client.get('/recipes/5/information', headers={'If-None-Match': first.headers['ETag']})
+            assert dumps.call_count == 1
+        assert first.get_json() == payload
+        assert second.status_code == 304
+
+        # un payload nuevo del controlador (nuevo stamp) se vuelve a codificar
+        mock_get_info.return_value = dict(payload, title='Nuevo')
+        mock_stamp.return_value = 2
+        third = client.get('/recipes/5/information', headers={'If-None-Match': first.headers['ETag']})
+        assert third.status_code == 200
+        assert third.get_json()['title'] == 'Nuevo'
+
+    @patch('src.routes.recipe_recomendation.information_stamp', return_value=None)
+    @patch('src.routes.recipe_recomendation.get_recipe_information')
+    def test_uncached_information_is_not_retained(self, mock_get_info, mock_stamp, client):
+        from src.routes import recipe_recomendation as routes
+        mock_get_info.return_value = {'id': 6, 'title': 'T'}
+        resp = client.get('/recipes/6/information')
+        assert resp.get_json()['title'] == 'T'
+        assert 'ETag' in resp.headers
+        assert len(routes._encoded_bodies) == 0
@@ -0,0 +1,108 @@
+"""Tests para el backend de caché compartido entre procesos (shared_cache.py)"""
+import multiprocessing
+
+import pytest
+
+from src.services.recipe_cache import RecipeCache
+from src.services.shared_cache import SQLiteCacheBackend, make_cache_backend
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'shared.sqlite3')
+
+
+def _writer(path):
+    backend = SQLiteCacheBackend(path)
+    cache = RecipeCache(backend=backend)
+    cache.set('information:55', {'id': 55, 'title': 'From worker'}, ttl=3600)
+
+
+class TestSQLiteCacheBackend:
+    """Tests del almacén SQLite"""
+
+    def test_set_get_roundtrip(self, db_path):
+        backend = SQLiteCacheBackend(db_path)
+        backend.set('information:1', {'id': 1}, expires_at=2000.0, stale_at=1500.0)
+        assert backend.get('information:1', now=1000.0) == ({'id': 1}, 2000.0, 1500.0)
+        assert backend.get('information:1', now=2001.0) is None
+        assert backend.get('information:2', now=1000.0) is None
+
+    def test_uses_wal_journal(self, db_path):
+        backend = SQLiteCacheBackend(db_path)
+        mode = backend._conn().execute('PRAGMA journal_mode').fetchone()[0]
+        assert mode.lower() == 'wal'
+
+    def test_sweep_and_clear(self, db_path):
+        backend = SQLiteCacheBackend(db_path)
+        backend.set('a:1', 1, expires_at=10.0)
+        backend.set('a:2', 2, expires_at=100.0)
+        assert backend.sweep(now=50.0) == 1
+        assert backend.stats()['entries'] == 1
+        backend.clear()
+        assert backend.stats()['entries'] == 0
+
+    def test_make_cache_backend(self, db_path):
+        assert make_cache_backend('') is None
+        assert isinstance(make_cache_backend('sqlite', db_path), SQLiteCacheBackend)
+        with pytest.raises(ValueError):
+            make_cache_backend('redis')
+
+
+class TestRecipeCacheWithSharedBackend:
+    """Tests de la caché L1 con backend compartido como L2"""
+
+    def test_l1_miss_is_served_from_shared_store(self, db_path):
+        clock = FakeClock()
+        worker1 = RecipeCache(clock=clock, backend=SQLiteCacheBackend(db_path))
+        worker2 = RecipeCache(clock=clock, backend=SQLiteCacheBackend(db_path))
+
+        worker1.set('information:1', {'id': 1}, ttl=100, stale_ttl=10)
+        assert worker2.lookup('information:1') == ({'id': 1}, False)
+        # se promueve a L1 conservando los tiempos de expiración
+        assert len(worker2) == 1
+        clock.now += 20
+        assert worker2.lookup('information:1') == ({'id': 1}, True)
+        ns = worker2.stats()['namespaces']['information']
+        assert ns['shared_hits'] == 1
+        assert ns['misses'] == 0
+
+    def test_clear_only_empties_l1(self, db_path):
+        cache = RecipeCache(backend=SQLiteCacheBackend(db_path))
+        cache.set('information:1', {'id': 1})
+        cache.clear()
+        assert cache.get('information:1') == {'id': 1}
+
+    def test_delete_removes_from_both_levels(self, db_path):
+        cache = RecipeCache(backend=SQLiteCacheBackend(db_path))
+        cache.set('information:1', {'id': 1})
+        cache.delete('information:1')
+        assert cache.get('information:1') is None
+
+    def test_entries_written_by_another_process_are_visible(self, db_path):
+        proc = multiprocessing.get_context('spawn').Process(target=_writer, args=(db_path,))
+        proc.start()
+        proc.join(30)
+        assert proc.exitcode == 0
+        cache = RecipeCache(backend=SQLiteCacheBackend(db_path))
+        assert cache.get('information:55')['title'] == 'From worker'
+
+
+class TestSharedCacheStaleIfError:
+    def test_grace_period_through_backend(self, db_path):
+        """Otro proceso ve la entrada expirada solo como stale-if-error"""
+        clock = FakeClock()
+        writer = RecipeCache(clock=clock, backend=SQLiteCacheBackend(db_path), stale_if_error=100)
+        reader = RecipeCache(clock=clock, backend=SQLiteCacheBackend(db_path), stale_if_error=100)
+        writer.set('information:7', {'id': 7}, ttl=10)
+        clock.now += 50
+        assert reader.lookup('information:7') is None
+        assert reader.lookup_expired('information:7') == {'id': 7}
@@ -0,0 +1,79 @@
+"""Tests para la deduplicación de peticiones en vuelo (singleflight.py)"""
+import threading
+import time
+
+from src.services.singleflight import SingleFlight
+
+
+def _run_concurrently(n, target):
+    results = [None] * n
+    errors = [None] * n
+    barrier = threading.Barrier(n)
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+class TestSingleFlight:
+    """Tests de coalescencia de llamadas concurrentes"""
+
+    def test_concurrent_callers_share_one_execution(self):
+        sf = SingleFlight()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            time.sleep(0.05)
+            return {'id': 1}
+
+        results, errors = _run_concurrently(8, lambda: sf.do('information:1', fn))
+
+        assert len(calls) == 1
+        assert all(r == {'id': 1} for r in results)
+        stats = sf.stats()
+        assert stats['executions'] == 1
+        assert stats['coalesced'] == 7
+        assert stats['in_flight'] == 0
+
+    def test_error_results_are_shared(self):
+        sf = SingleFlight()
+
+        def fn():
+            time.sleep(0.05)
+            return {'error': 'Failed'}, 502
+
+        results, _ = _run_concurrently(4, lambda: sf.do('k', fn))
+        assert all(r == ({'error': 'Failed'}, 502) for r in results)
+
+    def test_exceptions_are_raised_in_every_caller(self):
+        sf = SingleFlight()
+
+        def fn():
+            time.sleep(0.05)
+            raise RuntimeError('boom')
+
+        _, errors = _run_concurrently(4, lambda: sf.do('k', fn))
+        assert all(isinstance(e, RuntimeError) for e in errors)
+
+    def test_sequential_calls_are_not_coalesced(self):
+        sf = SingleFlight()
+        assert sf.do('k', lambda: 1) == 1
+        assert sf.do('k', lambda: 2) == 2
+        assert sf.stats()['coalesced'] == 0
+
+    def test_different_keys_run_independently(self):
+        sf = SingleFlight()
+        assert sf.do('a', lambda: 'a') == 'a'
+        assert sf.do('b', lambda: 'b') == 'b'
+        assert sf.stats()['executions'] == 2